@@ -0,0 +1,31 @@
+"""Add assessment user timestamp index to rating history
+
+Revision ID: bf350ff28d00
+Revises: f7181efe2f2a
+Create Date: 2026-10-17 00:26:19.054678
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bf350ff28d00'
+down_revision: Union[str, None] = 'f7181efe2f2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_rating_history_assessment_user_timestamp',
+        'rating_history',
+        ['capability_assessment_id', 'user_id', sa.text('change_timestamp DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rating_history_assessment_user_timestamp', table_name='rating_history')
@@ -0,0 +1,12 @@
+"""
+This module defines the constants shared by the routers and the CRUD operations.
+"""
+
+# Numeric value of each rating label, Not Applicable ratings are left out of averages
+RATING_MAPPING = {
+    "Stable": 4,
+    "Acceptable": 3,
+    "Low impact": 2,
+    "Critical Concern": 1,
+    "Not Applicable": 0
+}
@@ -2,9 +2,10 @@
 This module contains the CRUD (Create, Read, Update, Delete) operations related to acc_models table.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 from app import schemas, models
+from app.response_cache import bump_table_versions
 
 
 def get_acc_model(db_session: Session, acc_model_id: int):
@@ -59,6 +60,81 @@ def get_acc_models(db_session: Session, limit: int = 100):
     return db_session.query(models.ACCModel).limit(limit).all()
 
 
+def get_acc_model_matrix(db_session: Session, acc_model_id: int):
+    """
+    Retrieves everything needed to build the ratings matrix of an ACC model:
+    its components with their capabilities, all attributes and the capability
+    assessment IDs for every capability and attribute pair.
+
+    The number of queries is fixed and does not depend on the size of the model.
+
+    Args:
+        db_session (Session): The database session to use for the query.
+        acc_model_id (int): The ID of the ACCModel to retrieve the matrix for.
+
+    Returns:
+        dict: A dictionary with the acc_model, components, attributes and
+        capability_assessments, or None if the ACCModel was not found.
+    """
+
+    acc_model = get_acc_model(db_session, acc_model_id=acc_model_id)
+    if acc_model is None:
+        return None
+
+    components = (
+        db_session.query(models.Component)
+        .options(selectinload(models.Component.capabilities))
+        .filter(models.Component.acc_model_id == acc_model_id)
+        .order_by(models.Component.id)
+        .all()
+    )
+
+    attributes = db_session.query(models.Attribute).order_by(models.Attribute.id).all()
+
+    assessments = (
+        db_session.query(
+            models.CapabilityAssessment.id,
+            models.CapabilityAssessment.capability_id,
+            models.CapabilityAssessment.attribute_id,
+        )
+        .join(models.Capability, models.Capability.id == models.CapabilityAssessment.capability_id)
+        .join(models.Component, models.Component.id == models.Capability.component_id)
+        .filter(models.Component.acc_model_id == acc_model_id)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    )
+
+    return build_acc_model_matrix(acc_model, components, attributes, assessments)
+
+
+def build_acc_model_matrix(acc_model, components, attributes, assessments) -> dict:
+    """
+    Builds the matrix returned by get_acc_model_matrix from the rows it read.
+    """
+    return {
+        "acc_model": acc_model,
+        "components": [
+            {
+                "id": component.id,
+                "name": component.name,
+                "description": component.description,
+                "acc_model_id": component.acc_model_id,
+                "capabilities": sorted(component.capabilities, key=lambda cap: cap.id),
+            }
+            for component in components
+        ],
+        "attributes": attributes,
+        "capability_assessments": [
+            {
+                "capability_assessment_id": assessment.id,
+                "capability_id": assessment.capability_id,
+                "attribute_id": assessment.attribute_id,
+            }
+            for assessment in assessments
+        ],
+    }
+
+
 def create_acc_model(db_session: Session, acc_model: schemas.ACCModelCreate):
     """
     Creates a new ACCModel instance in the database.
@@ -83,6 +159,7 @@ def create_acc_model(db_session: Session, acc_model: schemas.ACCModelCreate):
 
     db_session.add(db_acc_model)
     db_session.commit()
+    bump_table_versions("acc_models")
     db_session.refresh(db_acc_model)
     return db_acc_model
 
@@ -109,6 +186,7 @@ def update_acc_model(db_session: Session, acc_model_id: int, acc_model: schemas.
         for key, value in acc_model.model_dump().items():
             setattr(db_acc_model, key, value)
         db_session.commit()
+        bump_table_versions("acc_models")
         db_session.refresh(db_acc_model)
     return db_acc_model
 
@@ -133,4 +211,6 @@ def delete_acc_model(db_session: Session, acc_model_id: int):
     if db_acc_model:
         db_session.delete(db_acc_model)
         db_session.commit()
+        # The components and capabilities of the model are deleted along with it
+        bump_table_versions("acc_models", "components", "capabilities")
     return db_acc_model
@@ -0,0 +1,53 @@
+"""
+This module contains the async version of the ACC model matrix query used by the
+async routers. The matrix is built like in app.crud.acc_models.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app import models
+from app.crud.acc_models import build_acc_model_matrix
+
+
+async def get_acc_model_matrix(db_session: AsyncSession, acc_model_id: int):
+    """
+    Retrieves everything needed to build the ratings matrix of an ACC model,
+    like acc_models.get_acc_model_matrix.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        acc_model_id (int): The ID of the ACCModel to retrieve the matrix for.
+
+    Returns:
+        dict: A dictionary with the acc_model, components, attributes and
+        capability_assessments, or None if the ACCModel was not found.
+    """
+    acc_model = await db_session.get(models.ACCModel, acc_model_id)
+    if acc_model is None:
+        return None
+
+    components = (await db_session.scalars(
+        select(models.Component)
+        .options(selectinload(models.Component.capabilities))
+        .where(models.Component.acc_model_id == acc_model_id)
+        .order_by(models.Component.id)
+    )).all()
+
+    attributes = (await db_session.scalars(
+        select(models.Attribute).order_by(models.Attribute.id)
+    )).all()
+
+    assessments = (await db_session.execute(
+        select(
+            models.CapabilityAssessment.id,
+            models.CapabilityAssessment.capability_id,
+            models.CapabilityAssessment.attribute_id,
+        )
+        .join(models.Capability, models.Capability.id == models.CapabilityAssessment.capability_id)
+        .join(models.Component, models.Component.id == models.Capability.component_id)
+        .where(models.Component.acc_model_id == acc_model_id)
+        .order_by(models.CapabilityAssessment.id)
+    )).all()
+
+    return build_acc_model_matrix(acc_model, components, attributes, assessments)
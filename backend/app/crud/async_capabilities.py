@@ -0,0 +1,50 @@
+"""
+This module contains the async versions of the capability assessment lookups
+used by the async routers.
+"""
+
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+
+
+async def get_capability_assessment(
+                db_session: AsyncSession, capability_assessment_id: int
+) -> schemas.CapabilityAssessmentRead:
+    """
+    Retrieves a capability assessment by its ID.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        capability_assessment_id (int): The ID of the capability assessment to retrieve.
+
+    Returns:
+        schemas.CapabilityAssessmentRead: The retrieved capability assessment, or None if not found.
+    """
+    capability_assessment = await db_session.get(
+        models.CapabilityAssessment, capability_assessment_id)
+
+    if capability_assessment:
+        return schemas.CapabilityAssessmentRead.model_validate(capability_assessment)
+    return None
+
+
+async def get_capability_assessments_by_ids(
+                db_session: AsyncSession, ids: List[int]
+) -> List[schemas.CapabilityAssessmentRead]:
+    """
+    Retrieves multiple capability assessments by their IDs.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        ids (List[int]): List of IDs of the capability assessments to retrieve.
+
+    Returns:
+        List[schemas.CapabilityAssessmentRead]: List of retrieved capability assessments.
+    """
+    capability_assessments = (await db_session.scalars(
+        select(models.CapabilityAssessment).where(models.CapabilityAssessment.id.in_(ids))
+    )).all()
+
+    return [schemas.CapabilityAssessmentRead.model_validate(ca) for ca in capability_assessments]
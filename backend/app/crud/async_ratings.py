@@ -0,0 +1,130 @@
+"""
+This module contains the async versions of the hot operations on the ratings table,
+used by the async routers. The queries and the planning of the writes are shared
+with app.crud.ratings.
+"""
+
+import logging
+from typing import Dict, List
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, models
+from app.crud import ratings as rating_crud
+
+logger = logging.getLogger(__name__)
+
+
+async def upsert_ratings_for_user(
+    db_session: AsyncSession, ratings: List[schemas.RatingCreate], user_id: int
+) -> List[schemas.RatingRead]:
+    """
+    Creates or updates the ratings of a user for several capability assessments
+    in a single transaction, like rating_crud.upsert_ratings_for_user.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        ratings (List[schemas.RatingCreate]): The ratings to create or update.
+        user_id (int): The ID of the user submitting the ratings.
+
+    Returns:
+        List[schemas.RatingRead]: The created or updated ratings, in request order.
+    """
+    for attempt in range(1, rating_crud.RATING_UPSERT_ATTEMPTS + 1):
+        try:
+            upserted_ratings = await _write_ratings_for_user(db_session, ratings, user_id)
+            await db_session.commit()
+            return upserted_ratings
+        except IntegrityError:
+            await db_session.rollback()
+            if attempt == rating_crud.RATING_UPSERT_ATTEMPTS:
+                raise
+            logger.warning(
+                "Ratings of user %s were created concurrently, retrying upsert (attempt %d)",
+                user_id, attempt,
+            )
+        except Exception:
+            await db_session.rollback()
+            raise
+    return []
+
+
+async def _write_ratings_for_user(
+    db_session: AsyncSession, ratings: List[schemas.RatingCreate], user_id: int
+) -> List[schemas.RatingRead]:
+    """
+    Writes the statements for upsert_ratings_for_user without committing them.
+    """
+    existing_ratings = (await db_session.scalars(rating_crud.select_ratings_for_update(
+        user_id, [rating.capability_assessment_id for rating in ratings]))).all()
+    current_ratings, new_ratings, updated_ratings, history_rows, rating_changes = (
+        rating_crud.plan_rating_upsert(existing_ratings, ratings, user_id)
+    )
+
+    if new_ratings:
+        inserted = await db_session.execute(
+            insert(models.Rating).returning(
+                models.Rating.id, models.Rating.capability_assessment_id
+            ),
+            new_ratings,
+        )
+        for rating_id, assessment_id in inserted:
+            current_ratings[assessment_id]["id"] = rating_id
+    if updated_ratings:
+        await db_session.execute(update(models.Rating), updated_ratings)
+    if history_rows:
+        await db_session.execute(insert(models.RatingHistory), history_rows)
+    stats_statement = rating_crud.build_rating_stats_statement(
+        db_session.get_bind().dialect.name, rating_changes)
+    if stats_statement is not None:
+        await db_session.execute(stats_statement)
+
+    return [
+        schemas.RatingRead.model_validate(current_ratings[rating.capability_assessment_id])
+        for rating in ratings
+    ]
+
+
+async def get_rating_stats_for_capability_assessments(
+    db_session: AsyncSession, capability_assessment_ids: List[int]
+) -> Dict[int, dict]:
+    """
+    Reads the rating count and average numeric rating of a list of capability
+    assessments, like rating_crud.get_rating_stats_for_capability_assessments.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+
+    Returns:
+        Dict[int, dict]: A dictionary keyed by capability assessment ID with the
+        rating_count and average_rating for every assessment that has ratings.
+    """
+    if not capability_assessment_ids:
+        return {}
+
+    rating_stats = (await db_session.scalars(
+        rating_crud.select_rating_stats(capability_assessment_ids))).all()
+    return rating_crud.summarize_rating_stats(rating_stats)
+
+
+async def get_ratings_for_user_and_capability_assessments(
+    db_session: AsyncSession, user_id: int, capability_assessment_ids: List[int]
+) -> List[models.Rating]:
+    """
+    Retrieves all ratings for a specific user across multiple capability assessments.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        user_id (int): The ID of the user.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+
+    Returns:
+        List[Rating]: A list of ratings for the given user and capability assessments.
+    """
+    return (await db_session.scalars(
+        select(models.Rating).where(
+            models.Rating.user_id == user_id,
+            models.Rating.capability_assessment_id.in_(capability_assessment_ids),
+        )
+    )).all()
@@ -0,0 +1,24 @@
+"""
+This module contains the async versions of the user lookups used to authenticate
+requests to the async routers.
+"""
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+
+
+async def get_user_by_username(db_session: AsyncSession, username: str):
+    """
+    Retrieves a user from the database based on the provided username.
+
+    Args:
+        db_session (AsyncSession): The async database session.
+        username (str): The username of the user to retrieve.
+
+    Returns:
+        User: The user corresponding to the provided username, or None if not found.
+    """
+    return (await db_session.scalars(
+        select(models.User).where(func.lower(models.User.username) == username.lower())
+    )).first()
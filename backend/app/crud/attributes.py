@@ -5,6 +5,7 @@ This module contains the CRUD (Create, Read, Update, Delete) operations related
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app import schemas, models
+from app.response_cache import bump_table_versions
 
 
 def get_attribute(db_session: Session, attribute_id: int):
@@ -81,6 +82,7 @@ def create_attribute(db_session: Session, attribute: schemas.AttributeCreate):
     db_attribute = models.Attribute(name=attribute.name.strip(), description=attribute.description)
     db_session.add(db_attribute)
     db_session.commit()
+    bump_table_versions("attributes")
     db_session.refresh(db_attribute)
     return db_attribute
 
@@ -105,6 +107,7 @@ def update_attribute(db_session: Session, attribute_id: int, attribute: schemas.
         for key, value in attribute.model_dump().items():
             setattr(db_attribute, key, value)
         db_session.commit()
+        bump_table_versions("attributes")
         db_session.refresh(db_attribute)
     return db_attribute
 
@@ -127,4 +130,5 @@ def delete_attribute(db_session: Session, attribute_id: int):
     if db_attribute:
         db_session.delete(db_attribute)
         db_session.commit()
+        bump_table_versions("attributes")
     return db_attribute
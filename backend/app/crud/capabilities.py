@@ -5,10 +5,11 @@ operations related to capabilities table.
 
 from typing import List
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from fastapi import HTTPException
 from app import models, schemas
+from app.response_cache import bump_table_versions
 
 def get_capability(db_session: Session, capability_id: int):
     """
@@ -89,26 +90,20 @@ def get_capability_by_component(
 
     capabilities = (
         db_session.query(models.Capability)
+        .options(joinedload(models.Capability.component))
         .filter(models.Capability.component_id == component_id)
         .all()
     )
-    capability_details = []
-    for capability in capabilities:
-        component = (
-            db_session.query(models.Component)
-            .filter(models.Component.id == capability.component_id)
-            .first()
-        )
-        capability_details.append(
-            {
-                "id": capability.id,
-                "name": capability.name,
-                "description": capability.description,
-                "component_id": capability.component_id,
-                "component_name": component.name if component else None,
-            }
-        )
-    return capability_details
+    return [
+        {
+            "id": capability.id,
+            "name": capability.name,
+            "description": capability.description,
+            "component_id": capability.component_id,
+            "component_name": capability.component.name if capability.component else None,
+        }
+        for capability in capabilities
+    ]
 
 
 def create_capability(db_session: Session, capability: schemas.CapabilityCreate):
@@ -150,6 +145,7 @@ def create_capability(db_session: Session, capability: schemas.CapabilityCreate)
     )
     db_session.add(db_capability)
     db_session.commit()
+    bump_table_versions("capabilities")
     db_session.refresh(db_capability)
     return db_capability
 
@@ -200,6 +196,7 @@ def update_capability(
         setattr(db_capability, key, value)
 
     db_session.commit()
+    bump_table_versions("capabilities")
     db_session.refresh(db_capability)
     return db_capability
 
@@ -224,6 +221,7 @@ def delete_capability(db_session: Session, capability_id: int):
     if db_capability:
         db_session.delete(db_capability)
         db_session.commit()
+        bump_table_versions("capabilities")
     return db_capability
 
 
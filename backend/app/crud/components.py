@@ -2,11 +2,12 @@
 This module contains the CRUD (Create, Read, Update, Delete) operations related to components table.
 """
 from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from fastapi import HTTPException
 from app import schemas, models
 from app.crud import acc_models
+from app.response_cache import bump_table_versions
 
 def get_component(db_session: Session, component_id: int):
     """
@@ -22,20 +23,18 @@ def get_component(db_session: Session, component_id: int):
     """
 
     component = (
-        db_session.query(models.Component).filter(models.Component.id == component_id).first()
+        db_session.query(models.Component)
+        .options(joinedload(models.Component.acc_model))
+        .filter(models.Component.id == component_id)
+        .first()
     )
     if component:
-        acc_model = (
-            db_session.query(models.ACCModel)
-            .filter(models.ACCModel.id == component.acc_model_id)
-            .first()
-        )
         component_details = {
             "id": component.id,
             "name": component.name,
             "description": component.description,
             "acc_model_id": component.acc_model_id,
-            "acc_model_name": acc_model.name if acc_model else None,
+            "acc_model_name": component.acc_model.name if component.acc_model else None,
         }
         return component_details
     return None
@@ -53,24 +52,22 @@ def get_all_components(db_session: Session, limit: int = 100) -> List[dict]:
         List[dict]: A list of dictionaries containing the component's details.
     """
 
-    components = db_session.query(models.Component).limit(limit).all()
-    component_details = []
-    for component in components:
-        acc_model = (
-            db_session.query(models.ACCModel)
-            .filter(models.ACCModel.id == component.acc_model_id)
-            .first()
-        )
-        component_details.append(
-            {
-                "id": component.id,
-                "name": component.name,
-                "description": component.description,
-                "acc_model_id": component.acc_model_id,
-                "acc_model_name": acc_model.name if acc_model else None,
-            }
-        )
-    return component_details
+    components = (
+        db_session.query(models.Component)
+        .options(joinedload(models.Component.acc_model))
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": component.id,
+            "name": component.name,
+            "description": component.description,
+            "acc_model_id": component.acc_model_id,
+            "acc_model_name": component.acc_model.name if component.acc_model else None,
+        }
+        for component in components
+    ]
 
 
 def get_components_by_acc_model(
@@ -90,27 +87,21 @@ def get_components_by_acc_model(
 
     components = (
         db_session.query(models.Component)
+        .options(joinedload(models.Component.acc_model))
         .filter(models.Component.acc_model_id == acc_model_id)
         .limit(limit)
         .all()
     )
-    component_details = []
-    for component in components:
-        acc_model = (
-            db_session.query(models.ACCModel)
-            .filter(models.ACCModel.id == component.acc_model_id)
-            .first()
-        )
-        component_details.append(
-            {
-                "id": component.id,
-                "name": component.name,
-                "description": component.description,
-                "acc_model_id": component.acc_model_id,
-                "acc_model_name": acc_model.name if acc_model else None,
-            }
-        )
-    return component_details
+    return [
+        {
+            "id": component.id,
+            "name": component.name,
+            "description": component.description,
+            "acc_model_id": component.acc_model_id,
+            "acc_model_name": component.acc_model.name if component.acc_model else None,
+        }
+        for component in components
+    ]
 
 
 def get_component_by_name_and_acc_model_id(db_session: Session, name: str, acc_model_id: int):
@@ -175,6 +166,7 @@ def create_component(db_session: Session, component: schemas.ComponentCreate):
     )
     db_session.add(db_component)
     db_session.commit()
+    bump_table_versions("components")
     db_session.refresh(db_component)
     return db_component
 
@@ -216,6 +208,7 @@ def update_component(db_session: Session, component_id: int, component: schemas.
         setattr(existing_component, key, value)
 
     db_session.commit()
+    bump_table_versions("components")
     db_session.refresh(existing_component)
     return existing_component
 
@@ -230,22 +223,22 @@ def delete_component(db_session: Session, component_id: int) -> dict:
     """
 
     db_component = (
-        db_session.query(models.Component).filter(models.Component.id == component_id).first()
+        db_session.query(models.Component)
+        .options(joinedload(models.Component.acc_model))
+        .filter(models.Component.id == component_id)
+        .first()
     )
     if db_component:
-        acc_model = (
-            db_session.query(models.ACCModel)
-            .filter(models.ACCModel.id == db_component.acc_model_id)
-            .first()
-        )
         component_details = {
             "id": db_component.id,
             "name": db_component.name,
             "description": db_component.description,
             "acc_model_id": db_component.acc_model_id,
-            "acc_model_name": acc_model.name if acc_model else None,
+            "acc_model_name": db_component.acc_model.name if db_component.acc_model else None,
         }
         db_session.delete(db_component)
         db_session.commit()
+        # The capabilities of the component are deleted along with it
+        bump_table_versions("components", "capabilities")
         return component_details
     return None
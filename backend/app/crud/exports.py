@@ -0,0 +1,112 @@
+"""
+This module contains the queries exporting the ratings and the rating history of
+an ACC model, one row per rating or change along with the names of its component,
+capability, attribute and user.
+
+The rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+(stream_results on PostgreSQL), so an export of any size is held in memory one
+batch at a time.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Result, Select, select
+from sqlalchemy.orm import Session
+from app import models
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+RATING_EXPORT_COLUMNS = (
+    "rating_id", "component", "capability", "attribute", "username",
+    "rating", "comments", "timestamp",
+)
+RATING_HISTORY_EXPORT_COLUMNS = (
+    "history_id", "component", "capability", "attribute", "username",
+    "rating", "comments", "change_timestamp",
+)
+
+
+def _select_export(model, id_label: str, timestamp_column, acc_model_id: int,  # pylint: disable=too-many-arguments
+                   start_date: Optional[datetime], end_date: Optional[datetime]) -> Select:
+    "Builds the export query of the ratings or rating history entries of an ACC model"
+    statement = (
+        select(
+            model.id.label(id_label),
+            models.Component.name.label("component"),
+            models.Capability.name.label("capability"),
+            models.Attribute.name.label("attribute"),
+            models.User.username.label("username"),
+            model.rating,
+            model.comments,
+            timestamp_column,
+        )
+        .join(models.CapabilityAssessment,
+              models.CapabilityAssessment.id == model.capability_assessment_id)
+        .join(models.Capability, models.Capability.id == models.CapabilityAssessment.capability_id)
+        .join(models.Component, models.Component.id == models.Capability.component_id)
+        .join(models.Attribute, models.Attribute.id == models.CapabilityAssessment.attribute_id)
+        .join(models.User, models.User.id == model.user_id)
+        .where(models.Component.acc_model_id == acc_model_id)
+        .order_by(model.id)
+    )
+    if start_date is not None:
+        statement = statement.where(timestamp_column >= start_date)
+    if end_date is not None:
+        statement = statement.where(timestamp_column < end_date)
+    return statement
+
+
+def select_rating_export(acc_model_id: int, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None) -> Select:
+    """
+    Builds the query exporting the current ratings of an ACC model, in the order
+    of RATING_EXPORT_COLUMNS.
+
+    Args:
+        acc_model_id (int): The ID of the ACC model.
+        start_date (Optional[datetime]): Only the ratings last changed from this moment on.
+        end_date (Optional[datetime]): Only the ratings last changed before this moment.
+
+    Returns:
+        Select: The export query.
+    """
+    return _select_export(models.Rating, "rating_id", models.Rating.timestamp,
+                          acc_model_id, start_date, end_date)
+
+
+def select_rating_history_export(acc_model_id: int, start_date: Optional[datetime] = None,
+                                 end_date: Optional[datetime] = None) -> Select:
+    """
+    Builds the query exporting every rating change of an ACC model, in the order
+    of RATING_HISTORY_EXPORT_COLUMNS.
+
+    Args:
+        acc_model_id (int): The ID of the ACC model.
+        start_date (Optional[datetime]): Only the changes made from this moment on.
+        end_date (Optional[datetime]): Only the changes made before this moment.
+
+    Returns:
+        Select: The export query.
+    """
+    return _select_export(models.RatingHistory, "history_id",
+                          models.RatingHistory.change_timestamp,
+                          acc_model_id, start_date, end_date)
+
+
+def execute_export(db_session: Session, statement: Select) -> Result:
+    """
+    Runs an export query, whose rows are then fetched from a server-side cursor
+    in batches of EXPORT_BATCH_SIZE as they are iterated.
+
+    Args:
+        db_session (Session): The database session, which must stay open until
+            the rows are consumed.
+        statement (Select): The export query.
+
+    Returns:
+        Result: The rows of the export.
+    """
+    return db_session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
@@ -3,15 +3,30 @@ This module contains the CRUD (Create, Read, Update, Delete) operations related
 """
 
 import logging
-from datetime import datetime
-from typing import List
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func, and_
+from sqlalchemy import (
+    DateTime, Integer, Row, cast, insert, literal, null, select, true, union_all, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func, and_, case
 from fastapi import HTTPException
 from app import schemas, models
+from app.constants import RATING_MAPPING
 
 logger = logging.getLogger(__name__)
 
+RATING_LABEL_COUNT_COLUMNS = {
+    "Stable": "stable_count",
+    "Acceptable": "acceptable_count",
+    "Low impact": "low_impact_count",
+    "Critical Concern": "critical_concern_count",
+    "Not Applicable": "not_applicable_count",
+}
+RATING_STATS_COLUMNS = ["rating_count", "rating_sum", *RATING_LABEL_COUNT_COLUMNS.values()]
+
 
 def create_rating(db_session: Session, rating: schemas.RatingCreate, user_id: int):
     """
@@ -45,6 +60,7 @@ def create_rating(db_session: Session, rating: schemas.RatingCreate, user_id: in
     )
 
     db_session.add(rating_history)
+    update_rating_stats(db_session, [(db_rating.capability_assessment_id, None, db_rating.rating)])
 
     db_session.commit()
     db_session.refresh(db_rating)
@@ -104,6 +120,8 @@ def delete_rating(db_session: Session, rating_id: int):
     db_rating = get_rating(db_session, rating_id=rating_id)
     if db_rating:
         db_session.delete(db_rating)
+        update_rating_stats(
+            db_session, [(db_rating.capability_assessment_id, db_rating.rating, None)])
         db_session.commit()
     return db_rating
 
@@ -131,19 +149,281 @@ def update_rating(
         change_timestamp=db_rating.timestamp,
     )
     db_session.add(rating_history)
+    previous_rating = db_rating.rating
 
     if rating.rating is not None:
         db_rating.rating = rating.rating
     if rating.comments is not None:
         db_rating.comments = rating.comments
-    if rating.timestamp is not None:
-        db_rating.timestamp = rating.timestamp
+    # The history entry keeps the previous timestamp, so the update needs its own
+    db_rating.timestamp = rating.timestamp or datetime.now()
 
+    update_rating_stats(
+        db_session, [(db_rating.capability_assessment_id, previous_rating, db_rating.rating)])
     db_session.commit()
     db_session.refresh(db_rating)
     return db_rating
 
 
+def update_rating_stats(
+    db_session: Session, rating_changes: List[Tuple[int, Optional[str], Optional[str]]]
+):
+    """
+    Applies rating changes to the AssessmentRatingStats table without committing them,
+    so the stats are written in the same transaction as the ratings.
+
+    Args:
+        db_session (Session): The database session.
+        rating_changes (List[Tuple[int, Optional[str], Optional[str]]]): The capability
+            assessment ID, the previous rating and the new rating of every changed rating.
+            The previous rating is None for a new rating and the new rating is None for
+            a deleted one.
+    """
+    statement = build_rating_stats_statement(
+        db_session.get_bind().dialect.name, rating_changes)
+    if statement is not None:
+        db_session.execute(statement)
+
+
+def build_rating_stats_statement(
+    dialect_name: str, rating_changes: List[Tuple[int, Optional[str], Optional[str]]]
+):
+    """
+    Builds the statement that applies rating changes to the AssessmentRatingStats table.
+
+    The changes are turned into count deltas per capability assessment and added to
+    the existing rows with a single INSERT ... ON CONFLICT DO UPDATE statement, which
+    is safe against concurrent writers.
+
+    Args:
+        dialect_name (str): The name of the database dialect, e.g. "postgresql".
+        rating_changes (List[Tuple[int, Optional[str], Optional[str]]]): The changed
+            ratings, as described in update_rating_stats.
+
+    Returns:
+        Insert: The statement, or None if the changes do not alter any count.
+    """
+    deltas = {}
+    for capability_assessment_id, previous_rating, new_rating in rating_changes:
+        if previous_rating == new_rating:
+            continue
+        delta = deltas.setdefault(
+            capability_assessment_id,
+            {"capability_assessment_id": capability_assessment_id,
+             **{column: 0 for column in RATING_STATS_COLUMNS}},
+        )
+        for rating, sign in ((previous_rating, -1), (new_rating, 1)):
+            if rating is None:
+                continue
+            delta["rating_count"] += sign
+            delta["rating_sum"] += sign * RATING_MAPPING.get(rating, 0)
+            if rating in RATING_LABEL_COUNT_COLUMNS:
+                delta[RATING_LABEL_COUNT_COLUMNS[rating]] += sign
+
+    rows = [
+        delta for _, delta in sorted(deltas.items())
+        if any(delta[column] for column in RATING_STATS_COLUMNS)
+    ]
+    if not rows:
+        return None
+
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(models.AssessmentRatingStats).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[models.AssessmentRatingStats.capability_assessment_id],
+        set_={
+            column: getattr(models.AssessmentRatingStats, column)
+            + getattr(statement.excluded, column)
+            for column in RATING_STATS_COLUMNS
+        },
+    )
+
+
+RATING_UPSERT_ATTEMPTS = 3
+
+
+def upsert_ratings_for_user(
+    db_session: Session, ratings: List[schemas.RatingCreate], user_id: int
+) -> List[schemas.RatingRead]:
+    """
+    Creates or updates the ratings of a user for several capability assessments
+    in a single transaction.
+
+    Existing ratings are fetched and locked with one query. New ratings, updated
+    ratings and their RatingHistory entries are each written with a single multi-row
+    statement, and the session is committed once. The history entries match those
+    written by create_rating (the new values) and update_rating (the previous values).
+
+    If a concurrent request creates one of the ratings first, the unique index on
+    (user_id, capability_assessment_id) rejects the insert and the upsert is retried,
+    this time updating the rating created by the other request.
+
+    Args:
+        db_session (Session): The database session.
+        ratings (List[schemas.RatingCreate]): The ratings to create or update.
+        user_id (int): The ID of the user submitting the ratings.
+
+    Returns:
+        List[schemas.RatingRead]: The created or updated ratings, in request order.
+    """
+    for attempt in range(1, RATING_UPSERT_ATTEMPTS + 1):
+        try:
+            upserted_ratings = _write_ratings_for_user(db_session, ratings, user_id)
+            db_session.commit()
+            return upserted_ratings
+        except IntegrityError:
+            db_session.rollback()
+            if attempt == RATING_UPSERT_ATTEMPTS:
+                raise
+            logger.warning(
+                "Ratings of user %s were created concurrently, retrying upsert (attempt %d)",
+                user_id, attempt,
+            )
+        except Exception:
+            db_session.rollback()
+            raise
+    return []
+
+
+def _get_ratings_for_update(
+    db_session: Session, user_id: int, capability_assessment_ids: List[int]
+) -> List[models.Rating]:
+    """
+    Retrieves the ratings of a user for the given capability assessments and locks
+    them until the end of the transaction.
+    """
+    return db_session.scalars(
+        select_ratings_for_update(user_id, capability_assessment_ids)).all()
+
+
+def select_ratings_for_update(user_id: int, capability_assessment_ids: List[int]):
+    """
+    Builds the query that retrieves and locks the ratings of a user for the given
+    capability assessments.
+    """
+    return (
+        select(models.Rating)
+        .where(
+            models.Rating.user_id == user_id,
+            models.Rating.capability_assessment_id.in_(capability_assessment_ids),
+        )
+        .with_for_update()
+    )
+
+
+def _write_ratings_for_user(
+    db_session: Session, ratings: List[schemas.RatingCreate], user_id: int
+) -> List[schemas.RatingRead]:
+    """
+    Writes the statements for upsert_ratings_for_user without committing them.
+    """
+    existing_ratings = _get_ratings_for_update(
+        db_session, user_id, [rating.capability_assessment_id for rating in ratings]
+    )
+    current_ratings, new_ratings, updated_ratings, history_rows, rating_changes = (
+        plan_rating_upsert(existing_ratings, ratings, user_id)
+    )
+
+    if new_ratings:
+        inserted = db_session.execute(
+            insert(models.Rating).returning(
+                models.Rating.id, models.Rating.capability_assessment_id
+            ),
+            new_ratings,
+        )
+        for rating_id, assessment_id in inserted:
+            current_ratings[assessment_id]["id"] = rating_id
+    if updated_ratings:
+        db_session.execute(update(models.Rating), updated_ratings)
+    if history_rows:
+        db_session.execute(insert(models.RatingHistory), history_rows)
+    update_rating_stats(db_session, rating_changes)
+
+    return [
+        schemas.RatingRead.model_validate(current_ratings[rating.capability_assessment_id])
+        for rating in ratings
+    ]
+
+
+def plan_rating_upsert(
+    existing_ratings: List[models.Rating], ratings: List[schemas.RatingCreate], user_id: int
+):
+    """
+    Works out the rows written by upsert_ratings_for_user from the existing ratings.
+
+    Args:
+        existing_ratings (List[models.Rating]): The existing ratings of the user for
+            the rated capability assessments.
+        ratings (List[schemas.RatingCreate]): The ratings to create or update.
+        user_id (int): The ID of the user submitting the ratings.
+
+    Returns:
+        tuple: The final values of every rating keyed by capability assessment ID, the
+        rows of the new ratings, the rows of the updated ratings, the RatingHistory rows
+        and the rating changes for update_rating_stats.
+    """
+    current_ratings = {
+        db_rating.capability_assessment_id: {
+            "id": db_rating.id,
+            "rating": db_rating.rating,
+            "comments": db_rating.comments,
+            "user_id": db_rating.user_id,
+            "capability_assessment_id": db_rating.capability_assessment_id,
+            "timestamp": db_rating.timestamp,
+        }
+        for db_rating in existing_ratings
+    }
+    existing_assessment_ids = set(current_ratings)
+    previous_ratings = {
+        assessment_id: current_rating["rating"]
+        for assessment_id, current_rating in current_ratings.items()
+    }
+
+    # Ratings submitted without a timestamp are stamped with the time of the upsert
+    now = datetime.now()
+    history_rows = []
+    for rating in ratings:
+        current_rating = current_ratings.setdefault(
+            rating.capability_assessment_id,
+            {
+                "rating": rating.rating,
+                "comments": rating.comments,
+                "user_id": user_id,
+                "capability_assessment_id": rating.capability_assessment_id,
+                "timestamp": rating.timestamp or now,
+            },
+        )
+
+        # For a new rating this logs the new values, for an existing one the previous values
+        history_rows.append({
+            "rating": current_rating["rating"],
+            "comments": current_rating["comments"],
+            "user_id": user_id,
+            "capability_assessment_id": rating.capability_assessment_id,
+            "change_timestamp": current_rating["timestamp"],
+        })
+
+        if rating.rating is not None:
+            current_rating["rating"] = rating.rating
+        if rating.comments is not None:
+            current_rating["comments"] = rating.comments
+        current_rating["timestamp"] = rating.timestamp or now
+
+    new_ratings = [
+        current_rating for assessment_id, current_rating in current_ratings.items()
+        if assessment_id not in existing_assessment_ids
+    ]
+    updated_ratings = [
+        current_rating for assessment_id, current_rating in current_ratings.items()
+        if assessment_id in existing_assessment_ids
+    ]
+    rating_changes = [
+        (assessment_id, previous_ratings.get(assessment_id), current_rating["rating"])
+        for assessment_id, current_rating in current_ratings.items()
+    ]
+    return current_ratings, new_ratings, updated_ratings, history_rows, rating_changes
+
+
 def get_ratings_for_capability_assessment(
     db_session: Session, capability_assessment_id: int
 ) -> List[schemas.RatingRead]:
@@ -177,6 +457,148 @@ def get_ratings_for_capability_assessment(
         raise HTTPException(status_code=500, detail="Internal Server Error") from error
 
 
+def get_rating_stats_for_capability_assessments(
+    db_session: Session, capability_assessment_ids: List[int]
+) -> Dict[int, dict]:
+    """
+    Reads the rating count and average numeric rating of a list of capability
+    assessments from the AssessmentRatingStats table.
+
+    Ratings that map to zero (e.g. "Not Applicable") or are unknown are left out of
+    the average, but still count towards rating_count.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+
+    Returns:
+        Dict[int, dict]: A dictionary keyed by capability assessment ID with the
+        rating_count and average_rating for every assessment that has ratings.
+    """
+    if not capability_assessment_ids:
+        return {}
+
+    rating_stats = db_session.scalars(
+        select_rating_stats(capability_assessment_ids)).all()
+    return summarize_rating_stats(rating_stats)
+
+
+def select_rating_stats(capability_assessment_ids: List[int]):
+    """
+    Builds the query that retrieves the AssessmentRatingStats rows with ratings
+    for a list of capability assessments.
+    """
+    return select(models.AssessmentRatingStats).where(
+        models.AssessmentRatingStats.capability_assessment_id.in_(
+            set(capability_assessment_ids)),
+        models.AssessmentRatingStats.rating_count > 0,
+    )
+
+
+def summarize_rating_stats(rating_stats: List[models.AssessmentRatingStats]) -> Dict[int, dict]:
+    """
+    Computes the rating count and average numeric rating of AssessmentRatingStats rows,
+    in the format returned by get_rating_stats_for_capability_assessments.
+    """
+    results = {}
+    for stats in rating_stats:
+        numeric_count = sum(
+            getattr(stats, RATING_LABEL_COUNT_COLUMNS[label])
+            for label, value in RATING_MAPPING.items() if value > 0
+        )
+        results[stats.capability_assessment_id] = {
+            "rating_count": stats.rating_count,
+            "average_rating": stats.rating_sum / numeric_count if numeric_count else None,
+        }
+    return results
+
+
+def compute_rating_stats(db_session: Session):
+    """
+    Builds a query that computes the AssessmentRatingStats rows from the ratings table.
+
+    Args:
+        db_session (Session): The database session.
+
+    Returns:
+        Query: A query with one row per rated capability assessment and one column
+        per AssessmentRatingStats column.
+    """
+    return (
+        db_session.query(
+            models.Rating.capability_assessment_id,
+            func.count(models.Rating.id).label("rating_count"),
+            func.coalesce(func.sum(
+                case(RATING_MAPPING, value=models.Rating.rating, else_=0)), 0
+            ).label("rating_sum"),
+            *[
+                func.sum(case((models.Rating.rating == label, 1), else_=0)).label(column)
+                for label, column in RATING_LABEL_COUNT_COLUMNS.items()
+            ],
+        )
+        .group_by(models.Rating.capability_assessment_id)
+    )
+
+
+def rebuild_rating_stats(db_session: Session) -> int:
+    """
+    Replaces the contents of the AssessmentRatingStats table with stats computed
+    from the ratings table.
+
+    Args:
+        db_session (Session): The database session.
+
+    Returns:
+        int: The number of capability assessments with stats.
+    """
+    try:
+        db_session.query(models.AssessmentRatingStats).delete()
+        db_session.execute(
+            insert(models.AssessmentRatingStats).from_select(
+                ["capability_assessment_id", *RATING_STATS_COLUMNS],
+                compute_rating_stats(db_session).statement,
+            )
+        )
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return (
+        db_session.query(func.count(models.AssessmentRatingStats.capability_assessment_id))
+        .scalar()
+    )
+
+
+def verify_rating_stats(db_session: Session) -> List[int]:
+    """
+    Compares the AssessmentRatingStats table with stats computed from the ratings table.
+
+    Args:
+        db_session (Session): The database session.
+
+    Returns:
+        List[int]: The IDs of the capability assessments whose stats do not match.
+    """
+    expected_stats = {
+        row.capability_assessment_id: tuple(
+            getattr(row, column) for column in RATING_STATS_COLUMNS)
+        for row in compute_rating_stats(db_session).all()
+    }
+    stored_stats = {
+        stats.capability_assessment_id: tuple(
+            getattr(stats, column) for column in RATING_STATS_COLUMNS)
+        for stats in db_session.query(models.AssessmentRatingStats).all()
+    }
+    empty_stats = tuple(0 for _ in RATING_STATS_COLUMNS)
+
+    return sorted(
+        capability_assessment_id
+        for capability_assessment_id in set(expected_stats) | set(stored_stats)
+        if expected_stats.get(capability_assessment_id, empty_stats)
+        != stored_stats.get(capability_assessment_id, empty_stats)
+    )
+
+
 def get_ratings_for_user_and_capability(
     db_session: Session, user_id: int, capability_id: int
 ):
@@ -300,6 +722,10 @@ def get_ratings_history_for_date(
     Returns:
         List[RatingHistory]: A list of the latest rating history entries for the given date.
     """
+    # Half-open range over the whole day, so the index on change_timestamp can be used
+    day_start = datetime.combine(target_date.date(), time.min)
+    day_end = day_start + timedelta(days=1)
+
     subquery = (
         db_session.query(
             models.RatingHistory.user_id,
@@ -308,7 +734,8 @@ def get_ratings_history_for_date(
         )
         .filter(
             models.RatingHistory.capability_assessment_id.in_(capability_assessment_ids),
-            func.date(models.RatingHistory.change_timestamp) == target_date.date()
+            models.RatingHistory.change_timestamp >= day_start,
+            models.RatingHistory.change_timestamp < day_end,
         )
         .group_by(models.RatingHistory.user_id, models.RatingHistory.capability_assessment_id)
         .subquery()
@@ -327,3 +754,185 @@ def get_ratings_history_for_date(
         )
         .all()
     )
+
+
+def select_rating_changes(capability_assessment_ids: List[int], until: Optional[datetime] = None):
+    """
+    Builds the subquery listing every rating change of a list of capability
+    assessments: the rating history entries, which hold the values a rating had
+    before each update, and the current ratings, which hold the latest values.
+
+    Its columns are id, rating_id, rating, comments, user_id,
+    capability_assessment_id, change_timestamp and is_current, which is 1 for the
+    current ratings so that they come first among the changes made at the same
+    moment. The id is the RatingHistory ID, NULL for the current ratings, and the
+    rating_id is the Rating ID of the current ratings, NULL for the history entries.
+
+    Args:
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        until (Optional[datetime]): Only the changes made at or before this moment.
+    """
+    history = select(
+        models.RatingHistory.id,
+        cast(null(), Integer).label("rating_id"),
+        models.RatingHistory.rating,
+        models.RatingHistory.comments,
+        models.RatingHistory.user_id,
+        models.RatingHistory.capability_assessment_id,
+        models.RatingHistory.change_timestamp,
+        literal(0, Integer).label("is_current"),
+    ).where(models.RatingHistory.capability_assessment_id.in_(capability_assessment_ids))
+    current = select(
+        cast(null(), Integer).label("id"),
+        models.Rating.id.label("rating_id"),
+        models.Rating.rating,
+        models.Rating.comments,
+        models.Rating.user_id,
+        models.Rating.capability_assessment_id,
+        models.Rating.timestamp.label("change_timestamp"),
+        literal(1, Integer).label("is_current"),
+    ).where(models.Rating.capability_assessment_id.in_(capability_assessment_ids))
+    if until is not None:
+        history = history.where(models.RatingHistory.change_timestamp <= until)
+        current = current.where(models.Rating.timestamp <= until)
+    return union_all(history, current).subquery("rating_changes")
+
+
+def get_ratings_history_as_of(
+    db_session: Session, capability_assessment_ids: List[int], as_of: datetime
+) -> List[Row]:
+    """
+    Retrieves the latest rating of each user for a list of capability assessments
+    at or before a point in time, so the state of the ratings at that moment is
+    reconstructed with a single query.
+
+    The rating history only holds the values ratings had before being updated,
+    so the current ratings are candidates too, see select_rating_changes. On
+    Postgres this is a DISTINCT ON query; other databases rank the rows with a
+    window function instead.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        as_of (datetime): The point in time for which to fetch the ratings.
+
+    Returns:
+        List[Row]: The latest change of each user and capability assessment at the
+        given time, with the columns of select_rating_changes.
+    """
+    changes = select_rating_changes(capability_assessment_ids, until=as_of)
+    columns = [
+        changes.c.id, changes.c.rating_id, changes.c.rating, changes.c.comments,
+        changes.c.user_id, changes.c.capability_assessment_id, changes.c.change_timestamp,
+    ]
+    latest_first = (
+        changes.c.change_timestamp.desc(), changes.c.is_current.desc(), changes.c.id.desc())
+
+    if db_session.get_bind().dialect.name == "postgresql":
+        return db_session.execute(
+            select(*columns)
+            .ext(postgresql.distinct_on(changes.c.capability_assessment_id, changes.c.user_id))
+            .order_by(changes.c.capability_assessment_id, changes.c.user_id, *latest_first)
+        ).all()
+
+    ranked_changes = select(
+        *columns,
+        func.row_number().over(
+            partition_by=(changes.c.capability_assessment_id, changes.c.user_id),
+            order_by=latest_first,
+        ).label("row_number"),
+    ).subquery("ranked_changes")
+    return db_session.execute(
+        select(*[ranked_changes.c[column.name] for column in columns])
+        .where(ranked_changes.c.row_number == 1)
+    ).all()
+
+
+def get_ratings_time_series(
+    db_session: Session,
+    capability_assessment_ids: List[int],
+    dates: List[datetime],
+    rating_mapping: Dict[str, int],
+) -> Dict[Tuple[int, int], Optional[float]]:
+    """
+    Computes the average rating of several capability assessments as of each of the
+    given dates with a single query.
+
+    The users who rated each capability assessment by the last date are paired with
+    every date, and the latest change of each pair at or before its date is looked
+    up with a correlated subquery, which the indexes on (capability_assessment_id,
+    user_id) of the rating history and the ratings answer directly. The latest
+    ratings are then averaged per date and capability assessment, the same way
+    get_ratings_history_as_of reconstructs a single date, so the cost grows with
+    the dates times the users rather than with the dates times the history.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        dates (List[datetime]): The dates of the time series.
+        rating_mapping (Dict[str, int]): Maps a rating label to its numeric value.
+            Ratings missing from the mapping are not averaged.
+
+    Returns:
+        Dict[Tuple[int, int], Optional[float]]: The average rating keyed by the
+        position of the date in dates and the capability assessment ID.
+        Assessments without any rating at a date are missing.
+    """
+    if not capability_assessment_ids or not dates:
+        return {}
+
+    buckets = union_all(*[
+        select(
+            literal(position, Integer).label("position"),
+            literal(date, DateTime).label("bucket_date"),
+        )
+        for position, date in enumerate(dates)
+    ]).subquery("buckets")
+
+    rated = select_rating_changes(capability_assessment_ids, until=max(dates))
+    raters = (
+        select(rated.c.capability_assessment_id, rated.c.user_id)
+        .distinct()
+        .subquery("raters")
+    )
+
+    changes = select_rating_changes(capability_assessment_ids)
+    latest_rating = (
+        select(changes.c.rating)
+        .where(
+            changes.c.capability_assessment_id == raters.c.capability_assessment_id,
+            changes.c.user_id == raters.c.user_id,
+            changes.c.change_timestamp <= buckets.c.bucket_date,
+        )
+        .order_by(
+            changes.c.change_timestamp.desc(), changes.c.is_current.desc(), changes.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    latest_ratings = (
+        select(
+            buckets.c.position,
+            raters.c.capability_assessment_id,
+            latest_rating.label("rating"),
+        )
+        .join_from(buckets, raters, true())
+        .subquery("latest_ratings")
+    )
+
+    rating_value = case(rating_mapping, value=latest_ratings.c.rating, else_=None)
+    averages = db_session.execute(
+        select(
+            latest_ratings.c.position,
+            latest_ratings.c.capability_assessment_id,
+            func.avg(rating_value),
+        )
+        .where(latest_ratings.c.rating.is_not(None))
+        .group_by(latest_ratings.c.position, latest_ratings.c.capability_assessment_id)
+    ).all()
+
+    return {
+        (position, capability_assessment_id): (
+            float(average_rating) if average_rating is not None else None
+        )
+        for position, capability_assessment_id, average_rating in averages
+    }
@@ -0,0 +1,391 @@
+"""
+This module contains the operations related to the daily_assessment_snapshot table,
+which rolls up the rating history into one row per capability assessment and day.
+
+A snapshot holds both the average of the ratings changed on its day and the average
+of the latest rating of every user at the end of its day. The historical endpoints
+read the snapshots up to the first change of each capability assessment that is not
+rolled up yet, see get_unrolled_change_starts, and only the changes from there on
+from the rating history.
+"""
+
+import logging
+from bisect import bisect_right
+from datetime import date, datetime
+from itertools import groupby
+from statistics import mean
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import exists, insert, or_, select, union_all
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql import func
+from app import models
+from app.crud import ratings as rating_crud
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_ASSESSMENTS_PER_BATCH = 100
+
+
+def get_last_rolled_up_history_id(db_session: Session) -> int:
+    """
+    Retrieves the ID of the latest rating history entry included in the snapshots.
+
+    Args:
+        db_session (Session): The database session.
+
+    Returns:
+        int: The rating history ID, or 0 if nothing was rolled up yet.
+    """
+    return db_session.query(
+        func.coalesce(func.max(models.DailyAssessmentSnapshot.last_history_id), 0)
+    ).scalar()
+
+
+def _average(ratings: List[str], rating_mapping: Dict[str, int]) -> Optional[float]:
+    "Average the ratings found in rating_mapping, None if there are none"
+    values = [rating_mapping.get(rating) for rating in ratings]
+    values = [value for value in values if value is not None]
+    return float(mean(values)) if values else None
+
+
+def _build_snapshot_rows(
+    changes,
+    last_history_id: int,
+    rating_mapping: Dict[str, int],
+    get_rating_label: Callable[[Optional[float]], Optional[str]],
+) -> List[dict]:
+    """
+    Builds the snapshot rows of the rating changes of a few capability assessments,
+    ordered by assessment and then from the oldest to the latest change.
+    """
+    snapshot_rows = []
+    latest_ratings = {}
+    current_assessment_id = None
+    for (assessment_id, snapshot_date), day_changes in groupby(
+            changes, key=lambda change: (change.capability_assessment_id,
+                                         change.change_timestamp.date())):
+        if assessment_id != current_assessment_id:
+            current_assessment_id = assessment_id
+            latest_ratings = {}
+        # Latest history entries of each user on the day, ties included,
+        # as get_ratings_history_for_date returns them
+        day_history = {}
+        day_changes = list(day_changes)
+        for change in day_changes:
+            latest_ratings[change.user_id] = change.rating
+            if change.is_current:
+                continue
+            timestamp, ratings = day_history.get(change.user_id, (None, []))
+            if timestamp == change.change_timestamp:
+                ratings.append(change.rating)
+            else:
+                day_history[change.user_id] = (change.change_timestamp, [change.rating])
+
+        day_ratings = [rating for _, ratings in day_history.values() for rating in ratings]
+        average_rating = _average(day_ratings, rating_mapping)
+        snapshot_rows.append({
+            "snapshot_date": snapshot_date,
+            "capability_assessment_id": assessment_id,
+            "average_rating": average_rating,
+            "rating_label": get_rating_label(average_rating),
+            "rating_count": len(day_ratings),
+            "as_of_average_rating": _average(list(latest_ratings.values()), rating_mapping),
+            "as_of_rating_count": len(latest_ratings),
+            "first_change_timestamp": day_changes[0].change_timestamp,
+            "last_change_timestamp": day_changes[-1].change_timestamp,
+            "last_history_id": last_history_id,
+        })
+    return snapshot_rows
+
+
+def rollup_daily_assessment_snapshots(
+    db_session: Session,
+    rating_mapping: Dict[str, int],
+    get_rating_label: Callable[[Optional[float]], Optional[str]],
+) -> List[int]:
+    """
+    Rolls up the rating history into the daily_assessment_snapshot table.
+
+    Only the capability assessments with rating history entries added since the last
+    rollup are processed, and the snapshots of each of them are rebuilt as a whole
+    from its rating changes, see rating_crud.select_rating_changes. A snapshot holds
+    the same averages as the historical endpoints compute for its day: the latest
+    change of every user on that day, and the latest rating of every user at the end
+    of that day, averaged over the ratings found in rating_mapping.
+
+    Args:
+        db_session (Session): The database session.
+        rating_mapping (Dict[str, int]): Maps a rating label to its numeric value.
+        get_rating_label (Callable[[Optional[float]], Optional[str]]): Maps an
+            average rating to its label.
+
+    Returns:
+        List[int]: The IDs of the capability assessments that were rolled up.
+    """
+    last_history_id = db_session.query(func.max(models.RatingHistory.id)).scalar()
+    if last_history_id is None:
+        return []
+
+    assessment_ids = sorted(
+        assessment_id for assessment_id, in db_session.query(
+            models.RatingHistory.capability_assessment_id)
+        .filter(
+            models.RatingHistory.id > get_last_rolled_up_history_id(db_session),
+            models.RatingHistory.id <= last_history_id,
+        )
+        .distinct()
+    )
+
+    try:
+        for batch_start in range(0, len(assessment_ids), ROLLUP_ASSESSMENTS_PER_BATCH):
+            batch = assessment_ids[batch_start:batch_start + ROLLUP_ASSESSMENTS_PER_BATCH]
+            changes = rating_crud.select_rating_changes(batch)
+            # Ascending, so the latest change as ordered by get_ratings_history_as_of
+            # comes last
+            change_rows = db_session.execute(
+                select(
+                    changes.c.capability_assessment_id,
+                    changes.c.user_id,
+                    changes.c.rating,
+                    changes.c.change_timestamp,
+                    changes.c.is_current,
+                )
+                .where(or_(changes.c.is_current == 1, changes.c.id <= last_history_id))
+                .order_by(
+                    changes.c.capability_assessment_id,
+                    changes.c.change_timestamp,
+                    changes.c.is_current,
+                    changes.c.id,
+                )
+            )
+            snapshot_rows = _build_snapshot_rows(
+                change_rows, last_history_id, rating_mapping, get_rating_label)
+
+            db_session.query(models.DailyAssessmentSnapshot).filter(
+                models.DailyAssessmentSnapshot.capability_assessment_id.in_(batch)
+            ).delete(synchronize_session=False)
+            if snapshot_rows:
+                db_session.execute(insert(models.DailyAssessmentSnapshot), snapshot_rows)
+            logger.info("Rolled up %d snapshots of capability assessments %d to %d",
+                        len(snapshot_rows), batch[0], batch[-1])
+
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return assessment_ids
+
+
+def get_unrolled_change_starts(
+    db_session: Session, capability_assessment_ids: List[int]
+) -> Dict[int, datetime]:
+    """
+    Retrieves the earliest change of each capability assessment that the snapshots
+    do not include yet, with a single query.
+
+    A rating history entry added after the last rollup is not included, and neither
+    is the current rating of the same user, which an update moves to a new time.
+    The snapshots of an assessment are valid before that change only.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+
+    Returns:
+        Dict[int, datetime]: The timestamp of the earliest change not rolled up,
+        keyed by capability assessment ID. Assessments fully rolled up are missing.
+    """
+    if not capability_assessment_ids:
+        return {}
+
+    last_rolled_up_id = select(
+        func.coalesce(func.max(models.DailyAssessmentSnapshot.last_history_id), 0)
+    ).scalar_subquery()
+    new_history = aliased(models.RatingHistory)
+    unrolled_changes = union_all(
+        select(
+            models.RatingHistory.capability_assessment_id,
+            models.RatingHistory.change_timestamp,
+        ).where(
+            models.RatingHistory.capability_assessment_id.in_(capability_assessment_ids),
+            models.RatingHistory.id > last_rolled_up_id,
+        ),
+        select(
+            models.Rating.capability_assessment_id,
+            models.Rating.timestamp.label("change_timestamp"),
+        ).where(
+            models.Rating.capability_assessment_id.in_(capability_assessment_ids),
+            exists().where(
+                new_history.capability_assessment_id == models.Rating.capability_assessment_id,
+                new_history.user_id == models.Rating.user_id,
+                new_history.id > last_rolled_up_id,
+            ),
+        ),
+    ).subquery("unrolled_changes")
+
+    return dict(db_session.execute(
+        select(
+            unrolled_changes.c.capability_assessment_id,
+            func.min(unrolled_changes.c.change_timestamp),
+        ).group_by(unrolled_changes.c.capability_assessment_id)
+    ).all())
+
+
+def get_assessment_snapshots_between(
+    db_session: Session,
+    capability_assessment_ids: List[int],
+    first_day: date,
+    last_day: date,
+) -> Dict[int, List[models.DailyAssessmentSnapshot]]:
+    """
+    Retrieves the snapshots of a list of capability assessments from first_day to
+    last_day, along with the latest snapshot of each assessment before first_day.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        first_day (date): The first day of the range.
+        last_day (date): The last day of the range.
+
+    Returns:
+        Dict[int, List[models.DailyAssessmentSnapshot]]: The snapshots of each
+        capability assessment, oldest first.
+    """
+    earlier = aliased(models.DailyAssessmentSnapshot)
+    latest_before = (
+        select(func.max(earlier.snapshot_date))
+        .where(
+            earlier.capability_assessment_id
+            == models.DailyAssessmentSnapshot.capability_assessment_id,
+            earlier.snapshot_date < first_day,
+        )
+        .scalar_subquery()
+    )
+    snapshots = (
+        db_session.query(models.DailyAssessmentSnapshot)
+        .filter(
+            models.DailyAssessmentSnapshot.capability_assessment_id.in_(
+                capability_assessment_ids),
+            models.DailyAssessmentSnapshot.snapshot_date <= last_day,
+            models.DailyAssessmentSnapshot.snapshot_date
+            >= func.coalesce(latest_before, first_day),
+        )
+        .order_by(models.DailyAssessmentSnapshot.capability_assessment_id,
+                  models.DailyAssessmentSnapshot.snapshot_date)
+        .all()
+    )
+    snapshots_by_assessment = {}
+    for snapshot in snapshots:
+        snapshots_by_assessment.setdefault(snapshot.capability_assessment_id, []).append(snapshot)
+    return snapshots_by_assessment
+
+
+def get_snapshot_ratings_as_of(
+    db_session: Session,
+    capability_assessment_ids: List[int],
+    dates: List[datetime],
+    unrolled_change_starts: Dict[int, datetime],
+) -> Tuple[Dict[Tuple[int, int], Optional[float]], Set[Tuple[int, int]]]:
+    """
+    Computes the average of the latest rating of every user of several capability
+    assessments as of each of the given dates from the snapshots.
+
+    A date is answered by the latest snapshot of its day or before, unless the
+    changes of the assessment from that date on are not rolled up yet, or the date
+    falls between two changes of the snapshot day. Those dates are left to the
+    rating history.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        dates (List[datetime]): The dates to compute the averages at.
+        unrolled_change_starts (Dict[int, datetime]): The result of
+            get_unrolled_change_starts for the capability assessments.
+
+    Returns:
+        Tuple[Dict[Tuple[int, int], Optional[float]], Set[Tuple[int, int]]]: The
+        average ratings keyed by the position of the date in dates and the capability
+        assessment ID, missing for the assessments without any rating at a date, and
+        the (position, capability assessment ID) pairs to read from the rating history.
+    """
+    missing = set()
+    covered = []
+    for cap_id in capability_assessment_ids:
+        unrolled_start = unrolled_change_starts.get(cap_id)
+        for position, target_date in enumerate(dates):
+            if unrolled_start is not None and target_date >= unrolled_start:
+                missing.add((position, cap_id))
+            else:
+                covered.append((position, cap_id))
+    if not covered:
+        return {}, missing
+
+    covered_dates = [dates[position] for position, _ in covered]
+    snapshots_by_assessment = get_assessment_snapshots_between(
+        db_session,
+        sorted({cap_id for _, cap_id in covered}),
+        min(covered_dates).date(),
+        max(covered_dates).date(),
+    )
+
+    averages = {}
+    for position, cap_id in covered:
+        target_date = dates[position]
+        snapshots = snapshots_by_assessment.get(cap_id, [])
+        index = bisect_right(
+            [snapshot.snapshot_date for snapshot in snapshots], target_date.date()) - 1
+        if (index >= 0 and snapshots[index].snapshot_date == target_date.date()
+                and target_date < snapshots[index].last_change_timestamp):
+            if target_date >= snapshots[index].first_change_timestamp:
+                missing.add((position, cap_id))
+                continue
+            index -= 1
+        if index >= 0 and snapshots[index].as_of_rating_count > 0:
+            averages[(position, cap_id)] = snapshots[index].as_of_average_rating
+    return averages, missing
+
+
+def get_snapshot_ratings_for_day(
+    db_session: Session,
+    capability_assessment_ids: List[int],
+    target_date: datetime,
+    unrolled_change_starts: Dict[int, datetime],
+) -> Tuple[Dict[int, Optional[float]], List[int]]:
+    """
+    Retrieves the average of the ratings changed on the day of target_date from the
+    snapshots, for the capability assessments whose changes of that day are rolled up.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+        target_date (datetime): The date for which to fetch the averages.
+        unrolled_change_starts (Dict[int, datetime]): The result of
+            get_unrolled_change_starts for the capability assessments.
+
+    Returns:
+        Tuple[Dict[int, Optional[float]], List[int]]: The average ratings keyed by
+        capability assessment ID, missing for the assessments without any rating
+        changed on that day, and the IDs of the assessments to read from the rating
+        history.
+    """
+    missing = [
+        cap_id for cap_id in capability_assessment_ids
+        if cap_id in unrolled_change_starts
+        and unrolled_change_starts[cap_id].date() <= target_date.date()
+    ]
+    covered = [cap_id for cap_id in capability_assessment_ids if cap_id not in missing]
+    if not covered:
+        return {}, missing
+
+    snapshots = (
+        db_session.query(models.DailyAssessmentSnapshot)
+        .filter(
+            models.DailyAssessmentSnapshot.snapshot_date == target_date.date(),
+            models.DailyAssessmentSnapshot.capability_assessment_id.in_(covered),
+            models.DailyAssessmentSnapshot.rating_count > 0,
+        )
+        .all()
+    )
+    return {
+        snapshot.capability_assessment_id: snapshot.average_rating for snapshot in snapshots
+    }, missing
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from passlib.context import CryptContext
 from app import models, schemas
+from app.user_cache import USER_CACHE
 
 
 HASHER = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -136,6 +137,7 @@ def create_user(db_session: Session, user: schemas.UserCreate):
     db_session.add(db_user)
     db_session.commit()
     db_session.refresh(db_user)
+    USER_CACHE.invalidate(normalized_username)
     return db_user
 
 
@@ -156,6 +158,8 @@ def delete_user(db_session: Session, user_id: int):
             models.Rating.user_id == user_id
         ).update({"user_id": None})
         db_session.commit()
+        username = db_user.username
         db_session.delete(db_user)
         db_session.commit()
+        USER_CACHE.invalidate(username)
     return db_user
@@ -1,26 +1,327 @@
 """
 This module sets up the database connection and session for SQLAlchemy.
+
+The connection pool of Postgres engines is configured from the environment:
+DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 seconds), DB_POOL_RECYCLE
+(1800 seconds, -1 to disable), DB_POOL_PRE_PING (true) and DB_STATEMENT_TIMEOUT_MS
+(0, no timeout). Each worker process has its own pool, so a database serves up to
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+
+Setting DATABASE_READ_URL, e.g. to a streaming replica, sends the read-only
+endpoints using get_read_db to that database. A user who submitted ratings keeps
+reading from the primary for READ_YOUR_WRITES_SECONDS (10 by default) to see them.
+The window is tracked per worker process, so it should cover the replication lag
+when requests of a user are not routed to the same worker. Reads that go to the
+primary reuse the get_db session of the request, so that a request holds at most
+one connection of each pool.
+
+Setting ASYNC_DATABASE=true also creates an async engine, using asyncpg for
+Postgres (or aiosqlite for SQLite), for the endpoints served by the async routers.
+The async URL is derived from DATABASE_URL unless ASYNC_DATABASE_URL is set. With
+DATABASE_READ_URL set, an async engine on the read database serves the async
+read-only endpoints with the same routing, its URL derived from DATABASE_READ_URL
+unless ASYNC_DATABASE_READ_URL is set.
 """
 
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+POOL_WAIT_SAMPLES = 1000
+
+
+def get_engine_options(database_url: str) -> dict:
+    """
+    Returns the keyword arguments of create_engine for the pool settings.
+
+    SQLite engines keep the pool SQLAlchemy picks for them, as they do not use a
+    QueuePool and have no statement timeout.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+    if STATEMENT_TIMEOUT_MS > 0:
+        if url.get_dialect().is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+class PoolStats:
+    "Records how long sessions waited to check a connection out of the pool"
+
+    def __init__(self, samples: int = POOL_WAIT_SAMPLES):
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._recent_waits = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record(self, wait_seconds: float):
+        "Record the wait of a connection checkout"
+        with self._lock:
+            self.acquisitions += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self._recent_waits.append(wait_seconds)
+
+    def record_timeout(self):
+        "Record a checkout that gave up after the pool timeout"
+        with self._lock:
+            self.timeouts += 1
+
+    @contextmanager
+    def measure(self):
+        "Record the wait of the connection checkout run in the block"
+        started = time.perf_counter()
+        try:
+            yield
+        except PoolTimeoutError:
+            self.record_timeout()
+            raise
+        self.record(time.perf_counter() - started)
+
+    def summary(self) -> dict:
+        "Return the counters and the percentiles of the recent waits in milliseconds"
+        with self._lock:
+            recent_waits = sorted(self._recent_waits)
+            summary = {
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 3),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+        for name, quantile in (("wait_ms_p50", 0.5), ("wait_ms_p95", 0.95),
+                               ("wait_ms_p99", 0.99)):
+            summary[name] = None
+            if recent_waits:
+                index = min(len(recent_waits) - 1, int(len(recent_waits) * quantile))
+                summary[name] = round(recent_waits[index] * 1000, 3)
+        return summary
+
+
+def record_checkout_waits(database_engine, stats: PoolStats):
+    """
+    Records in stats how long every connection checkout of the engine's pool
+    waited, including the checkouts that timed out.
+
+    Sessions only check a connection out on their first query, so the wait is
+    timed in the pool itself: its class is swapped for a subclass timing _do_get,
+    the method pool classes implement to hand out a connection. Engine.dispose()
+    recreates the pool from its class, so the timing is kept.
+    """
+    pool = database_engine.pool
+    pool_class = type(pool)
+
+    def _do_get(self):
+        with stats.measure():
+            return pool_class._do_get(self)  # pylint: disable=protected-access
+
+    pool.__class__ = type(pool_class.__name__, (pool_class,), {"_do_get": _do_get})
+
+
+def get_pool_status(database_engine, stats: PoolStats) -> dict:
+    """
+    Returns the state of the pool of an engine along with its checkout waits.
+    """
+    pool = database_engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "max_overflow": POOL_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    status.update(stats.summary())
+    return status
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_engine_options(SQLALCHEMY_DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) # pylint: disable=invalid-name
 
+POOL_STATS = PoolStats()
+record_checkout_waits(engine, POOL_STATS)
+
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL")
+
+read_engine = create_engine( # pylint: disable=invalid-name
+    SQLALCHEMY_READ_DATABASE_URL, **get_engine_options(SQLALCHEMY_READ_DATABASE_URL)
+) if SQLALCHEMY_READ_DATABASE_URL else engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) # pylint: disable=invalid-name
+
+READ_POOL_STATS = PoolStats()
+if read_engine is not engine:
+    record_checkout_waits(read_engine, READ_POOL_STATS)
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+
+class RecentWriters:
+    "Remembers the users who wrote recently, whose reads must go to the primary"
+
+    def __init__(self, window_seconds: float, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._last_writes = {}
+        self._lock = threading.Lock()
+
+    def mark(self, username: str):
+        "Record that the user just wrote to the primary"
+        now = self._clock()
+        with self._lock:
+            self._last_writes[username.lower()] = now
+            if len(self._last_writes) > 1000:
+                self._last_writes = {
+                    name: written for name, written in self._last_writes.items()
+                    if written + self.window_seconds > now
+                }
+
+    def clear(self):
+        "Forget every recent write"
+        with self._lock:
+            self._last_writes.clear()
+
+    def wrote_recently(self, username: str) -> bool:
+        "Return whether the user wrote within the read-your-writes window"
+        with self._lock:
+            written = self._last_writes.get(username.lower())
+        return written is not None and written + self.window_seconds > self._clock()
+
+
+RECENT_WRITERS = RecentWriters(READ_YOUR_WRITES_SECONDS)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Returns the URL of the given database for its async driver.
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE = os.getenv("ASYNC_DATABASE", "false").lower() in ("1", "true", "yes")
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    get_async_database_url(SQLALCHEMY_DATABASE_URL) if SQLALCHEMY_DATABASE_URL else None
+)
+
+async_engine = create_async_engine( # pylint: disable=invalid-name
+    ASYNC_SQLALCHEMY_DATABASE_URL, **get_engine_options(ASYNC_SQLALCHEMY_DATABASE_URL)
+) if ASYNC_DATABASE else None
+
+AsyncSessionLocal = async_sessionmaker( # pylint: disable=invalid-name
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+ASYNC_POOL_STATS = PoolStats()
+if async_engine is not None:
+    record_checkout_waits(async_engine.sync_engine, ASYNC_POOL_STATS)
+
+ASYNC_SQLALCHEMY_READ_DATABASE_URL = os.getenv("ASYNC_DATABASE_READ_URL") or (
+    get_async_database_url(SQLALCHEMY_READ_DATABASE_URL) if SQLALCHEMY_READ_DATABASE_URL else None
+)
+
+async_read_engine = create_async_engine( # pylint: disable=invalid-name
+    ASYNC_SQLALCHEMY_READ_DATABASE_URL, **get_engine_options(ASYNC_SQLALCHEMY_READ_DATABASE_URL)
+) if ASYNC_DATABASE and SQLALCHEMY_READ_DATABASE_URL else async_engine
+
+AsyncReadSessionLocal = async_sessionmaker( # pylint: disable=invalid-name
+    bind=async_read_engine, autoflush=False, expire_on_commit=False
+)
+
+ASYNC_READ_POOL_STATS = PoolStats()
+if async_read_engine is not async_engine:
+    record_checkout_waits(async_read_engine.sync_engine, ASYNC_READ_POOL_STATS)
+
+
 def get_db():
     """
     Generator function that yields a SQLAlchemy SessionLocal instance.
+
+    The session checks a connection out on its first query, so requests that do
+    not query the database do not hold one.
     """
     database_session = SessionLocal()
     try:
         yield database_session
     finally:
         database_session.close()
+
+
+def reads_from_read_database(username: Optional[str] = None) -> bool:
+    """
+    Returns whether the reads of the user go to the read database, which is the
+    case when there is one and the user did not write recently.
+    """
+    return read_engine is not engine and not (
+        username and RECENT_WRITERS.wrote_recently(username))
+
+
+def get_read_session():
+    """
+    Generator function that yields a session on the read database.
+    """
+    database_session = ReadSessionLocal()
+    try:
+        yield database_session
+    finally:
+        database_session.close()
+
+
+async def get_async_db():
+    """
+    Async generator function that yields a SQLAlchemy AsyncSession instance.
+    """
+    async with AsyncSessionLocal() as database_session:
+        yield database_session
+
+
+def open_async_read_session() -> AsyncSession:
+    """
+    Returns a new async session on the read database, to be used as an async
+    context manager.
+    """
+    return AsyncReadSessionLocal()
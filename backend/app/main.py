@@ -10,17 +10,28 @@ import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import ValidationError
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
 from logging_config import setup_logging  # pylint: disable=wrong-import-position
+from app.database import ASYNC_DATABASE  # pylint: disable=wrong-import-position
+from app.metrics import MetricsMiddleware  # pylint: disable=wrong-import-position
+from app.middleware import (  # pylint: disable=wrong-import-position
+    ErrorMappingMiddleware,
+    RequestLoggingMiddleware,
+)
+from app.response_cache import ResponseCacheMiddleware  # pylint: disable=wrong-import-position
 from app.routers import (
     acc_models,
+    async_acc_models,
+    async_capabilities_assessments,
     attributes,
     capabilities,
     components,
+    exports,
+    internal,
+    metrics,
     users,
     security,
     ratings,
@@ -43,6 +54,8 @@ origins = [
     "https://acc-model-app.netlify.app",
 ]
 
+# Added before CORSMiddleware so that the cached responses get the CORS headers too
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -50,6 +63,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added after CORSMiddleware so that the cached responses and the CORS preflights are measured too
+app.add_middleware(MetricsMiddleware)
+# Wrapping the others, so that the errors escaping them are answered, and logged
+# and timed along with the other responses
+app.add_middleware(ErrorMappingMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
 
 
 @app.get("/")
@@ -60,32 +79,6 @@ async def root():
     return {"message": "This is an application for catpure ACC model for your projects"}
 
 
-@app.middleware("http")
-async def log_request_validation_error(request: Request, call_next):
-    """
-    Middleware to log validation errors and handle responses for invalid requests.
-    Args:
-        request (Request): The HTTP request object.
-        call_next (Callable): A function that takes the request as a parameter
-            and returns a response.
-
-    Returns:
-        JSONResponse: A response object, which may include validation error details 
-        or a general internal server error message.
-    """
-    try:
-        response = await call_next(request)
-        return response
-    except ValidationError as error:
-        logging.error("Validation error: %s", error.json())
-        return JSONResponse(status_code=422, content={"detail": error.errors()})
-    except Exception as error:
-        logging.error("Unexpected error: %s", str(error))
-        return JSONResponse(
-            status_code=500, content={"detail": "Internal server error"}
-        )
-
-
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception): # pylint: disable=unused-argument
     """
@@ -97,6 +90,10 @@ async def global_exception_handler(request: Request, exc: Exception): # pylint:
     )
 
 
+if ASYNC_DATABASE:
+    # Registered first so they take precedence over the sync versions of their endpoints
+    app.include_router(async_acc_models.router)
+    app.include_router(async_capabilities_assessments.router)
 app.include_router(acc_models.router)
 app.include_router(attributes.router)
 app.include_router(capabilities.router)
@@ -105,6 +102,9 @@ app.include_router(users.router)
 app.include_router(security.router)
 app.include_router(ratings.router)
 app.include_router(capabilities_assessments.router)
+app.include_router(exports.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
 
 logger.info("Starting the backend...")
 
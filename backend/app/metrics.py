@@ -0,0 +1,273 @@
+"""
+This module collects the request and database metrics of the worker process and
+renders them in the Prometheus text format served by GET /metrics.
+
+MetricsMiddleware counts the requests of every route template with their status
+code and latency, along with the requests in flight by method, as the route of a
+request is only known once the router picked it. The statements run through
+any SQLAlchemy engine while serving a request, sync or async, are counted and
+timed in the RequestDbStats bound to the request by a context variable, as the
+threadpool running the sync endpoints copies the context of the request.
+
+The database statements of a request are also checked for regressions:
+- DB_STATEMENT_WARNING_THRESHOLD (50): a warning is logged when a request runs
+  more statements than this
+- DB_REPEATED_STATEMENT_THRESHOLD (10): a warning is logged when a request runs
+  the same statement more often than this, the sign of a query per row (N+1)
+- DB_STATS_HEADER (false): the X-DB-Statements and X-DB-Time-Ms response headers
+  report the statements and database time of the request, up to the start of
+  the response
+
+The metrics live in the worker process, so Prometheus should scrape every worker,
+or the app should run a single worker as it does in the Dockerfile.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+UNMATCHED_ROUTE = "unmatched"
+
+DB_STATEMENT_WARNING_THRESHOLD = int(os.getenv("DB_STATEMENT_WARNING_THRESHOLD", "50"))
+DB_REPEATED_STATEMENT_THRESHOLD = int(os.getenv("DB_REPEATED_STATEMENT_THRESHOLD", "10"))
+DB_STATS_HEADER = os.getenv("DB_STATS_HEADER", "false").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+
+class RequestDbStats:
+    "Statements run and seconds spent in the database for a request"
+
+    __slots__ = ("statements", "seconds", "statement_counts")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.statement_counts: Dict[str, int] = {}
+
+    def most_repeated_statement(self) -> Tuple[Optional[str], int]:
+        "Return the statement run the most times and its count"
+        if not self.statement_counts:
+            return None, 0
+        statement = max(self.statement_counts, key=self.statement_counts.get)
+        return statement, self.statement_counts[statement]
+
+
+REQUEST_DB_STATS: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany): # pylint: disable=too-many-arguments,unused-argument
+    if REQUEST_DB_STATS.get() is not None and context is not None:
+        context.request_statement_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany): # pylint: disable=too-many-arguments,unused-argument
+    stats = REQUEST_DB_STATS.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.statement_counts[statement] = stats.statement_counts.get(statement, 0) + 1
+    started = getattr(context, "request_statement_started", None)
+    if started is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+class Histogram:
+    "Cumulative bucket counts, sum and count of observations per label values"
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        "Record an observation, the caller holding the lock of the registry"
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def escape_label_value(value) -> str:
+    "Escape the backslashes, double quotes and line feeds of a label value"
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    """
+    Returns the label set of a sample, escaping the values as Prometheus requires.
+    """
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_bound(bound: float) -> str:
+    "Return the le label value of a bucket bound"
+    return str(int(bound)) if float(bound).is_integer() else repr(bound)
+
+
+class RequestMetrics:
+    "Request counters, latency and database histograms and in flight gauges"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests_total: Dict[tuple, int] = {}
+        self.in_flight: Dict[tuple, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_statements = Histogram(DB_STATEMENT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+
+    def start_request(self, method: str):
+        "Count a request as in flight"
+        with self._lock:
+            self.in_flight[method] = self.in_flight.get(method, 0) + 1
+
+    def finish_request(self, method: str, route: str, status_code: int, # pylint: disable=too-many-arguments
+                       seconds: float, db_stats: RequestDbStats):
+        "Record a served request and take it out of the requests in flight"
+        with self._lock:
+            self.in_flight[method] -= 1
+            key = (method, route, str(status_code))
+            self.requests_total[key] = self.requests_total.get(key, 0) + 1
+            self.latency.observe((method, route), seconds)
+            self.db_statements.observe((method, route), db_stats.statements)
+            self.db_seconds.observe((method, route), db_stats.seconds)
+
+    def clear(self):
+        "Forget every recorded request, keeping the requests in flight"
+        with self._lock:
+            self.requests_total.clear()
+            self.latency.series.clear()
+            self.db_statements.series.clear()
+            self.db_seconds.series.clear()
+
+    def render(self) -> str:
+        "Return the metrics in the Prometheus text exposition format"
+        route_labels = ("method", "route")
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_total Requests served by method, route template and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            lines += [
+                f"http_requests_total{format_labels(route_labels + ('status',), key)} {count}"
+                for key, count in sorted(self.requests_total.items())
+            ]
+            lines += [
+                "# HELP http_requests_in_flight Requests being served by method.",
+                "# TYPE http_requests_in_flight gauge",
+            ]
+            lines += [
+                f"http_requests_in_flight{format_labels(('method',), (method,))} {count}"
+                for method, count in sorted(self.in_flight.items())
+            ]
+            for name, help_text, histogram in (
+                    ("http_request_duration_seconds",
+                     "Time spent serving requests by method and route template.", self.latency),
+                    ("http_request_db_statements",
+                     "Database statements run per request by method and route template.",
+                     self.db_statements),
+                    ("http_request_db_duration_seconds",
+                     "Time spent in database statements per request by method and route template.",
+                     self.db_seconds),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, series in sorted(histogram.series.items()):
+                    for bound, count in zip(histogram.buckets, series):
+                        bucket_labels = format_labels(
+                            route_labels, labels, f'le="{format_bound(bound)}"')
+                        lines.append(f"{name}_bucket{bucket_labels} {count}")
+                    inf_labels = format_labels(route_labels, labels, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{inf_labels} {series[-1]}")
+                    lines.append(f"{name}_sum{format_labels(route_labels, labels)} {series[-2]}")
+                    lines.append(f"{name}_count{format_labels(route_labels, labels)} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+REQUEST_METRICS = RequestMetrics()
+
+
+def check_db_stats(method: str, route: str, db_stats: RequestDbStats):
+    """
+    Logs a warning when a request ran more statements than
+    DB_STATEMENT_WARNING_THRESHOLD or repeated one more than
+    DB_REPEATED_STATEMENT_THRESHOLD times.
+    """
+    if db_stats.statements > DB_STATEMENT_WARNING_THRESHOLD:
+        logger.warning("%s %s ran %d statements in %.1f ms, over the threshold of %d",
+                       method, route, db_stats.statements, db_stats.seconds * 1000,
+                       DB_STATEMENT_WARNING_THRESHOLD)
+    statement, count = db_stats.most_repeated_statement()
+    if count > DB_REPEATED_STATEMENT_THRESHOLD:
+        logger.warning("%s %s ran the same statement %d times, possibly once per row (N+1): %s",
+                       method, route, count, " ".join(statement.split())[:500])
+
+
+def get_route_template(scope) -> str:
+    """
+    Returns the path template of the route the router picked for a request, e.g.
+    /capability-assessments/{capability_assessment_id}/aggregate, so that the
+    metrics have one series per endpoint instead of one per ID. The responses
+    served by ResponseCacheMiddleware carry their template in scope["cached_route"].
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("cached_route") or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the requests and their database statements in
+    REQUEST_METRICS and warning about the requests running too many statements.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = REQUEST_METRICS):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        response = {"status": 500}
+
+        db_stats = RequestDbStats()
+
+        async def send_and_record_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if DB_STATS_HEADER:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-statements", str(db_stats.statements).encode("latin-1")),
+                        (b"x-db-time-ms", f"{db_stats.seconds * 1000:.3f}".encode("latin-1")),
+                    ]
+            await send(message)
+
+        token = REQUEST_DB_STATS.set(db_stats)
+        self.metrics.start_request(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            REQUEST_DB_STATS.reset(token)
+            route = get_route_template(scope)
+            self.metrics.finish_request(
+                method, route, response["status"], time.perf_counter() - started, db_stats)
+            check_db_stats(method, route, db_stats)
@@ -0,0 +1,105 @@
+"""
+This module holds the ASGI middlewares wrapping every request of the app:
+
+- RequestLoggingMiddleware logs the method, path, status code and duration of
+  every request, as a warning when it took longer than SLOW_REQUEST_THRESHOLD_MS
+  (1000), and reports the time to the response headers in a Server-Timing header
+- ErrorMappingMiddleware turns the exceptions escaping the endpoints into JSON
+  responses: a pydantic ValidationError into a 422 listing its errors, anything
+  else into a 500
+
+They are pure ASGI middlewares rather than functions registered with
+@app.middleware("http"), which run on Starlette's BaseHTTPMiddleware: the
+messages of the response are passed straight through instead of going through a
+task and a memory stream per request, so streaming responses are sent to the
+client as they are produced.
+"""
+
+import logging
+import os
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLoggingMiddleware:
+    """
+    ASGI middleware logging every request with its status code and duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response = {"status": 500}
+        started = time.perf_counter()
+
+        async def send_with_server_timing(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                duration_ms = (time.perf_counter() - started) * 1000
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", f"app;dur={duration_ms:.1f}".encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            level = logging.WARNING if duration_ms > SLOW_REQUEST_THRESHOLD_MS else logging.INFO
+            logger.log(level, "%s %s %d %.1f ms", scope["method"], scope["path"],
+                       response["status"], duration_ms)
+
+
+class ErrorMappingMiddleware:
+    """
+    ASGI middleware answering the requests whose endpoint raised an exception
+    with a JSON error response. An exception raised once the response started
+    is logged and raised again, as the status code was already sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_and_track_start(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_track_start)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            if response_started:
+                logger.error("Error after the response to %s %s started: %s",
+                             scope["method"], scope["path"], error)
+                raise
+            if isinstance(error, ValidationError):
+                logger.error("Validation error: %s", error.json())
+                response = JSONResponse(
+                    status_code=422,
+                    content={"detail": jsonable_encoder(error.errors(include_url=False))},
+                )
+            else:
+                logger.exception("Unexpected error: %s", error)
+                response = JSONResponse(
+                    status_code=500, content={"detail": "Internal server error"}
+                )
+            await response(scope, receive, send)
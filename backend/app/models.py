@@ -6,7 +6,7 @@ define the structure of the tables in the database.
 # pylint: disable=too-few-public-methods, invalid-name
 
 from datetime import datetime
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, String, Text, desc
 from sqlalchemy.orm import relationship
 from sqlalchemy import DateTime
 from sqlalchemy.ext.declarative import declarative_base
@@ -87,6 +87,10 @@ class CapabilityAssessment(Base):
     )
     rating_history = relationship("RatingHistory", back_populates="capability_assessment",
         cascade="all, delete-orphan")
+    rating_stats = relationship("AssessmentRatingStats", back_populates="capability_assessment",
+        cascade="all, delete-orphan", uselist=False)
+    daily_snapshots = relationship("DailyAssessmentSnapshot",
+        back_populates="capability_assessment", cascade="all, delete-orphan")
 
 
 class User(Base):
@@ -106,13 +110,21 @@ class User(Base):
 class Rating(Base):
     """Model representing a rating in the database."""
     __tablename__ = "ratings"
+    __table_args__ = (
+        Index(
+            "ix_ratings_user_id_capability_assessment_id",
+            "user_id",
+            "capability_assessment_id",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rating = Column(String, nullable=False)
     comments = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     capability_assessment_id = Column(
-        Integer, ForeignKey("capability_assessments.id"), nullable=False
+        Integer, ForeignKey("capability_assessments.id"), nullable=False, index=True
     )
     timestamp = Column(DateTime, default=datetime.now, nullable=False)
 
@@ -124,6 +136,14 @@ class Rating(Base):
 class RatingHistory(Base):
     """Model representing the history of ratings."""
     __tablename__ = "rating_history"
+    __table_args__ = (
+        Index(
+            "ix_rating_history_assessment_user_timestamp",
+            "capability_assessment_id",
+            "user_id",
+            desc("change_timestamp"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rating = Column(String, nullable=False)
@@ -138,3 +158,56 @@ class RatingHistory(Base):
 
     user = relationship("User", back_populates="rating_history")
     capability_assessment = relationship("CapabilityAssessment", back_populates="rating_history")
+
+
+class AssessmentRatingStats(Base):
+    """
+    Model representing the rating counts of a capability assessment.
+    The row is updated together with every rating change, so aggregates can be read
+    without going through the ratings table.
+    """
+    __tablename__ = "assessment_rating_stats"
+
+    capability_assessment_id = Column(
+        Integer, ForeignKey("capability_assessments.id", ondelete="CASCADE"), primary_key=True
+    )
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    stable_count = Column(Integer, nullable=False, default=0)
+    acceptable_count = Column(Integer, nullable=False, default=0)
+    low_impact_count = Column(Integer, nullable=False, default=0)
+    critical_concern_count = Column(Integer, nullable=False, default=0)
+    not_applicable_count = Column(Integer, nullable=False, default=0)
+
+    capability_assessment = relationship("CapabilityAssessment", back_populates="rating_stats")
+
+
+class DailyAssessmentSnapshot(Base):
+    """
+    Model representing the rating changes of a capability assessment on one day,
+    rolled up from the rating history, along with the state of its ratings at the
+    end of that day.
+    """
+    __tablename__ = "daily_assessment_snapshot"
+    __table_args__ = (
+        Index(
+            "ix_daily_assessment_snapshot_assessment_date",
+            "capability_assessment_id",
+            "snapshot_date",
+        ),
+    )
+
+    snapshot_date = Column(Date, primary_key=True)
+    capability_assessment_id = Column(
+        Integer, ForeignKey("capability_assessments.id", ondelete="CASCADE"), primary_key=True
+    )
+    average_rating = Column(Float, nullable=True)
+    rating_label = Column(String, nullable=True)
+    rating_count = Column(Integer, nullable=False)
+    as_of_average_rating = Column(Float, nullable=True)
+    as_of_rating_count = Column(Integer, nullable=False, default=0)
+    first_change_timestamp = Column(DateTime, nullable=False)
+    last_change_timestamp = Column(DateTime, nullable=False)
+    last_history_id = Column(Integer, nullable=False, index=True)
+
+    capability_assessment = relationship("CapabilityAssessment", back_populates="daily_snapshots")
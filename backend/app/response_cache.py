@@ -0,0 +1,226 @@
+"""
+This module caches the responses of the taxonomy endpoints, which are fetched on
+every page load but rarely change.
+
+Every cached endpoint depends on a few tables, whose version counters are bumped by
+the create, update and delete functions of app.crud. The ETag of a response is
+derived from the request and the versions of its tables, so requests carrying a
+matching If-None-Match header get a 304 and others get the cached bytes, both
+without touching the database.
+
+The versions live in the worker process. Changes made by other processes, e.g.
+other uvicorn workers or scripts writing to the database, are not seen until the
+process restarts, so run a single worker or disable the cache with
+RESPONSE_CACHE_SIZE=0 when that is not acceptable.
+
+The versions are bumped when a change is committed to the primary, which a read
+replica (DATABASE_READ_URL) only receives after its replication lag. A response
+built from the replica right after a change could be stale and would then be
+served under the new ETag until the next change, so the cache misses set
+READ_FROM_PRIMARY in the request state and get_read_db serves them from the
+primary. The hits, which are most requests, still do not touch any database.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import compile_path
+
+# Changes with every start of the process, as the versions start again from zero
+CACHE_GENERATION = uuid.uuid4().hex
+
+# Request state set on the cache misses, which must read from the primary database
+READ_FROM_PRIMARY = "read_from_primary"
+
+# Route templates of the cached endpoints and the tables their responses depend on
+CACHED_ENDPOINTS = {
+    "/acc-models/": ("acc_models",),
+    "/attributes/": ("attributes",),
+    "/components/acc_model/{acc_model_id}": ("components",),
+    "/capabilities/component/{component_id}": ("capabilities",),
+    "/rating-options/": (),
+}
+
+CACHED_PATTERNS = [
+    (compile_path(route_path)[0], route_path, tables)
+    for route_path, tables in CACHED_ENDPOINTS.items()
+]
+
+_table_versions: Dict[str, int] = {}
+_table_versions_lock = threading.Lock()
+
+
+def bump_table_versions(*tables: str):
+    """
+    Marks the given tables as changed, invalidating the cached responses built
+    from them.
+    """
+    with _table_versions_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+def get_table_versions(tables: Tuple[str, ...]) -> Tuple[int, ...]:
+    """
+    Returns the current versions of the given tables.
+    """
+    with _table_versions_lock:
+        return tuple(_table_versions.get(table, 0) for table in tables)
+
+
+def get_cached_endpoint(path: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """
+    Returns the route template of a path and the tables its response depends on,
+    or None if it is not cached.
+    """
+    for pattern, route_path, tables in CACHED_PATTERNS:
+        if pattern.match(path):
+            return route_path, tables
+    return None
+
+
+class ResponseCache:
+    "LRU cache of response bodies keyed by request, stored along with their ETag"
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_etag(key: str, tables: Tuple[str, ...]) -> str:
+        "Return the strong ETag of a request given the versions of its tables"
+        versions = get_table_versions(tables)
+        digest = hashlib.sha1(f"{CACHE_GENERATION}:{key}:{versions}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, key: str, etag: str) -> Optional[Tuple[bytes, str]]:
+        "Return the cached body and content type of a request if its ETag still matches"
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def record_not_modified(self):
+        "Count a request answered with 304 Not Modified"
+        with self._lock:
+            self.not_modified += 1
+
+    def put(self, key: str, etag: str, body: bytes, content_type: str):
+        "Cache the body of a response, evicting the least recently used past max_size"
+        with self._lock:
+            self._responses[key] = (etag, body, content_type)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def clear(self):
+        "Forget every cached response and reset the counters"
+        with self._lock:
+            self._responses.clear()
+            self.hits = 0
+            self.not_modified = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        "Return the size of the cache and its counters"
+        with self._lock:
+            return {
+                "size": len(self._responses),
+                "hits": self.hits,
+                "not_modified": self.not_modified,
+                "misses": self.misses,
+            }
+
+
+RESPONSE_CACHE = ResponseCache(max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "256")))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Returns whether an If-None-Match header matches the ETag, using the weak
+    comparison required for that header.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class ResponseCacheMiddleware:
+    "ASGI middleware answering the cached endpoints from RESPONSE_CACHE"
+
+    def __init__(self, app, cache: ResponseCache = RESPONSE_CACHE):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        endpoint = None
+        if scope["type"] == "http" and scope["method"] == "GET" and self.cache.max_size > 0:
+            endpoint = get_cached_endpoint(scope["path"])
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_path, tables = endpoint
+
+        key = f"{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        etag = self.cache.get_etag(key, tables)
+        cache_headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"cache-control", b"no-cache"),
+        ]
+
+        if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            # Answered without reaching the router, which would set scope["route"]
+            scope["cached_route"] = route_path
+            self.cache.record_not_modified()
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cached = self.cache.get(key, etag)
+        if cached is not None:
+            scope["cached_route"] = route_path
+            body, content_type = cached
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": cache_headers + [
+                    (b"content-type", content_type.encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        scope.setdefault("state", {})[READ_FROM_PRIMARY] = True
+        response = {"status": None, "content_type": "", "chunks": []}
+
+        async def send_and_cache(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if message["status"] == 200:
+                    headers = MutableHeaders(scope=message)
+                    response["content_type"] = headers.get("content-type", "")
+                    headers["etag"] = etag
+                    headers["cache-control"] = "no-cache"
+            elif message["type"] == "http.response.body" and response["status"] == 200:
+                response["chunks"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    self.cache.put(
+                        key, etag, b"".join(response["chunks"]), response["content_type"])
+            await send(message)
+
+        await self.app(scope, receive, send_and_cache)
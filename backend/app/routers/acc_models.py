@@ -5,21 +5,31 @@ The endpoints are:
 - `POST /acc-models`: Creates a new ACCModel instance.
 - `GET /acc-models`: Retrieves a list of ACC models.
 - `GET /acc-models/{acc_model_id}`: Retrieves an ACC model by its ID.
+- `GET /acc-models/{acc_model_id}/matrix`:
+    Retrieves the components, capabilities, attributes and capability assessments
+    of an ACC model, optionally with aggregated ratings and the caller's ratings.
 - `PUT /acc-models/{acc_model_id}`: Updates an existing ACC model.
 - `DELETE /acc-models/{acc_model_id}`: Deletes an existing ACC model.
 
-The endpoints use the `get_db` dependency to get a database session.
+The read-only endpoints use the `get_read_db` dependency to get a session on
+the read database, the others use the `get_db` dependency.
 The endpoints use the `crud` module to perform the database operations.
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app import schemas
 from app.crud import acc_models as crud
+from app.crud import ratings as rating_crud
 from app.database import get_db
-from app.routers.security import get_current_user
+from app.routers.security import (
+    get_current_user,
+    get_optional_current_user,
+    get_read_db,
+)
+from app.routers.capabilities_assessments import get_ratings_aggregates
 
 router = APIRouter(
     prefix="/acc-models",
@@ -73,7 +83,7 @@ def create_acc_model(
                             detail=error_message) from error
 
 @router.get("/", response_model=List[schemas.ACCModelRead])
-def read_acc_models(limit: int = 100, db_session: Session = Depends(get_db)):
+def read_acc_models(limit: int = 100, db_session: Session = Depends(get_read_db)):
     """
     Retrieve a list of ACC models.
 
@@ -101,7 +111,7 @@ def read_acc_models(limit: int = 100, db_session: Session = Depends(get_db)):
 
 
 @router.get("/{acc_model_id}", response_model=schemas.ACCModelRead)
-def read_acc_model(acc_model_id: int, db_session: Session = Depends(get_db)):
+def read_acc_model(acc_model_id: int, db_session: Session = Depends(get_read_db)):
     """
     Retrieve an ACC model by its ID.
 
@@ -128,6 +138,63 @@ def read_acc_model(acc_model_id: int, db_session: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="An unexpected error occurred") from error
 
+@router.get("/{acc_model_id}/matrix", response_model=schemas.ACCModelMatrix)
+def read_acc_model_matrix(
+                acc_model_id: int,
+                include_aggregates: bool = False,
+                include_ratings: bool = False,
+                db_session: Session = Depends(get_read_db),
+                current_user: Optional[schemas.UserRead] = Depends(get_optional_current_user)
+):
+    """
+    Retrieve the full ratings matrix of an ACC model in a single request.
+
+    Args:
+        acc_model_id: The ID of the ACC model to retrieve the matrix for.
+        include_aggregates: Whether to include the aggregated ratings. Defaults to False.
+        include_ratings: Whether to include the ratings of the current user.
+            Requires authentication. Defaults to False.
+        db_session: The database session to use for the query.
+        current_user: The current user, if authenticated.
+
+    Returns:
+        The components, capabilities, attributes and capability assessments of the
+        ACC model, along with the requested aggregates and ratings.
+    """
+    try:
+        if include_ratings and current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        matrix = crud.get_acc_model_matrix(db_session, acc_model_id=acc_model_id)
+        if matrix is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="ACC model not found")
+
+        assessment_ids = [
+            assessment["capability_assessment_id"]
+            for assessment in matrix["capability_assessments"]
+        ]
+        if include_aggregates:
+            matrix["aggregates"] = get_ratings_aggregates(db_session, assessment_ids)
+        if include_ratings:
+            matrix["ratings"] = rating_crud.get_ratings_for_user_and_capability_assessments(
+                db_session, user_id=current_user.id, capability_assessment_ids=assessment_ids)
+
+        logger.info("Fetched matrix for ACC model with ID: %d", acc_model_id)
+        return matrix
+
+    except HTTPException as http_error:
+        logger.error("Client error: %s", http_error.detail)
+        raise http_error
+    except Exception as error:
+        logger.error("Error fetching matrix for ACC model with ID %d: %s", acc_model_id, error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred") from error
+
 @router.put("/{acc_model_id}", response_model=schemas.ACCModelRead)
 def update_acc_model(
                 acc_model_id: int,
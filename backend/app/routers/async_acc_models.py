@@ -0,0 +1,91 @@
+"""
+This module defines the async version of the ACC model matrix endpoint, served
+when the application runs with ASYNC_DATABASE=true.
+
+The endpoints are:
+- `GET /acc-models/{acc_model_id}/matrix`:
+    Retrieves the components, capabilities, attributes and capability assessments
+    of an ACC model, optionally with aggregated ratings and the caller's ratings.
+
+The endpoints use the `get_async_read_db` dependency to get an async session on
+the read database, routed like the `get_read_db` dependency of the sync routers.
+"""
+
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.crud import async_acc_models as crud
+from app.crud import async_ratings as rating_crud
+from app.routers.security import get_async_read_db, get_optional_current_user_async
+from app.routers.capabilities_assessments import build_ratings_aggregates
+
+router = APIRouter(
+    prefix="/acc-models",
+    tags=["acc_models"],
+    responses={404: {"description": "Not found"}},
+)
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/{acc_model_id}/matrix", response_model=schemas.ACCModelMatrix)
+async def read_acc_model_matrix(
+                acc_model_id: int,
+                include_aggregates: bool = False,
+                include_ratings: bool = False,
+                db_session: AsyncSession = Depends(get_async_read_db),
+                current_user: Optional[schemas.UserRead] = Depends(
+                    get_optional_current_user_async)
+):
+    """
+    Retrieve the full ratings matrix of an ACC model in a single request.
+
+    Args:
+        acc_model_id: The ID of the ACC model to retrieve the matrix for.
+        include_aggregates: Whether to include the aggregated ratings. Defaults to False.
+        include_ratings: Whether to include the ratings of the current user.
+            Requires authentication. Defaults to False.
+        db_session: The async database session to use for the query.
+        current_user: The current user, if authenticated.
+
+    Returns:
+        The components, capabilities, attributes and capability assessments of the
+        ACC model, along with the requested aggregates and ratings.
+    """
+    try:
+        if include_ratings and current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        matrix = await crud.get_acc_model_matrix(db_session, acc_model_id=acc_model_id)
+        if matrix is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="ACC model not found")
+
+        assessment_ids = [
+            assessment["capability_assessment_id"]
+            for assessment in matrix["capability_assessments"]
+        ]
+        if include_aggregates:
+            aggregates = await rating_crud.get_rating_stats_for_capability_assessments(
+                db_session, assessment_ids)
+            matrix["aggregates"] = build_ratings_aggregates(assessment_ids, aggregates)
+        if include_ratings:
+            matrix["ratings"] = await rating_crud.get_ratings_for_user_and_capability_assessments(
+                db_session, user_id=current_user.id, capability_assessment_ids=assessment_ids)
+
+        logger.info("Fetched matrix for ACC model with ID: %d", acc_model_id)
+        return matrix
+
+    except HTTPException as http_error:
+        logger.error("Client error: %s", http_error.detail)
+        raise http_error
+    except Exception as error:
+        logger.error("Error fetching matrix for ACC model with ID %d: %s", acc_model_id, error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred") from error
@@ -0,0 +1,185 @@
+"""
+This module defines the async versions of the busiest capability assessment
+endpoints, served when the application runs with ASYNC_DATABASE=true.
+
+The endpoints are:
+- POST /capability-assessments/batch/:
+    Creates or updates ratings for capability assessments in batch.
+- POST /capability-assessments/{capability_assessment_id}/:
+    Creates or updates a rating for a specific capability assessment.
+- GET /capability-assessments/{capability_assessment_id}/aggregate:
+   - Retrieves aggregated ratings for a specific capability assessment.
+- POST /capability-assessments/aggregates
+   - Retrieves aggregated ratings for a list of capability assessments.
+
+The rating endpoints use the `get_async_db` dependency to get an async database
+session, the aggregate endpoints use the `get_async_read_db` dependency to get an
+async session on the read database.
+"""
+
+import logging
+from typing import List, Dict, Union
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.crud import async_capabilities as crud
+from app.crud import async_ratings as rating_crud
+from app.database import RECENT_WRITERS, get_async_db
+from app.routers.security import get_async_read_db, get_current_user_async
+from app.routers.capabilities_assessments import build_ratings_aggregates
+
+router = APIRouter(
+    prefix="/capability-assessments",
+    tags=["capability-assessments"],
+    responses={404: {"description": "Not found"}},
+)
+
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/batch/",
+    response_model=Dict[str, Union[List[schemas.RatingRead], Dict[int, str], None]]
+)
+async def upsert_capability_assessment_ratings(
+        batch_request: schemas.BatchRatingRequest,
+        db_session: AsyncSession = Depends(get_async_db),
+        current_user: schemas.UserRead = Depends(get_current_user_async)
+):
+    """
+    Creates or updates ratings for capability assessments in batch.
+    """
+    ids = [rating.capability_assessment_id for rating in batch_request.ratings]
+    existing_assessments = {
+        ca.id for ca in await crud.get_capability_assessments_by_ids(db_session, ids)
+    }
+
+    logger.info("Found %s of the %s capability assessments to rate",
+                len(existing_assessments), len(ids))
+
+    errors = {}
+    ratings_to_upsert = []
+    for rating in batch_request.ratings:
+        if rating.capability_assessment_id not in existing_assessments:
+            errors[rating.capability_assessment_id] = "Capability Assessment not found"
+            continue
+        ratings_to_upsert.append(rating)
+
+    valid_ratings = await rating_crud.upsert_ratings_for_user(
+        db_session=db_session, ratings=ratings_to_upsert, user_id=current_user.id
+    )
+    RECENT_WRITERS.mark(current_user.username)
+
+    response = {
+        "ratings": valid_ratings,
+        "errors": errors if errors else None
+    }
+    return response
+
+
+@router.post("/{capability_assessment_id}/", response_model=schemas.RatingRead)
+async def upsert_capability_assessment_rating(
+        capability_assessment_id: int,
+        rating: schemas.RatingCreate,
+        db_session: AsyncSession = Depends(get_async_db),
+        current_user: schemas.UserRead = Depends(get_current_user_async)
+):
+    """
+    Creates or updates a rating for a capability assessment.
+
+    Args:
+        capability_assessment_id: The ID of the capability assessment.
+        rating: The rating to create or update.
+        db_session: The async database session.
+        current_user: The current user. Depends(get_current_user_async).
+
+    Returns:
+        The created or updated rating.
+    """
+    try:
+        logger.info("Received capability_assessment_id: %s from user: %s",
+                    capability_assessment_id, current_user.username)
+
+        existing_capability_assessment = await crud.get_capability_assessment(
+            db_session, capability_assessment_id=capability_assessment_id)
+        if existing_capability_assessment is None:
+            logger.error("Capability Assessment with ID %s not found",
+                         capability_assessment_id)
+            raise HTTPException(
+                status_code=404, detail="Capability Assessment not found")
+
+        rating = rating.model_copy(update={"capability_assessment_id": capability_assessment_id})
+        upserted_rating = (await rating_crud.upsert_ratings_for_user(
+            db_session=db_session, ratings=[rating], user_id=current_user.id))[0]
+        RECENT_WRITERS.mark(current_user.username)
+        logger.info("Upserted Rating for capability assessment: %s",
+                    capability_assessment_id)
+        return upserted_rating
+    except HTTPException as http_error:
+        logger.error("Client error: %s", http_error.detail)
+        raise http_error
+    except Exception as error:
+        logger.exception("Error creating or updating rating: %s", error)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred") from error
+
+
+@router.get("/{capability_assessment_id}/aggregate",
+            response_model=Dict[str, Union[int, float, None]])
+async def get_ratings_aggregate_for_capability_assessment(
+                capability_assessment_id: int,
+                db_session: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Retrieves aggregated ratings for a specific capability assessment.
+
+    Args:
+        capability_assessment_id: The ID of the capability assessment.
+        db_session: The async database session.
+
+    Returns:
+        A dictionary with the capability assessment ID and the average rating,
+        or None if no ratings are found.
+    """
+    try:
+        aggregate = (await rating_crud.get_rating_stats_for_capability_assessments(
+            db_session,
+            [capability_assessment_id]
+        )).get(capability_assessment_id)
+        return {
+            "capability_assessment_id": capability_assessment_id,
+            "average_rating": aggregate["average_rating"] if aggregate else None
+        }
+
+    except Exception as error:
+        logger.exception(
+            "Unexpected error retrieving aggregated ratings for capability assessment: %s", error
+        )
+        raise HTTPException(status_code=500, detail="Internal Server Error") from error
+
+
+@router.post("/aggregates", response_model=List[Dict[str, Union[int, float, str, None]]])
+async def get_bulk_ratings_aggregate(
+            capability_assessment_ids: List[int],
+            db_session: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Retrieves aggregated ratings for a list of capability assessments.
+
+    Args:
+        capability_assessment_ids: List of capability assessment IDs.
+        db_session: The async database session.
+
+    Returns:
+        A list of dictionaries with the capability assessment ID and the average rating.
+    """
+    logger.info("Received %s capability_assessment_ids", len(capability_assessment_ids))
+    try:
+        aggregates = await rating_crud.get_rating_stats_for_capability_assessments(
+            db_session, capability_assessment_ids)
+        return build_ratings_aggregates(capability_assessment_ids, aggregates)
+
+    except Exception as error:
+        logger.exception("Error retrieving bulk ratings: %s", error)
+        raise HTTPException(status_code=500, detail="Internal Server Error") from error
@@ -8,7 +8,8 @@ Endpoints:
 - PUT /attributes/{attribute_id} : Update a specific attribute by ID.
 - DELETE /attributes/{attribute_id} : Delete a specific attribute by ID.
 
-The endpoints use the `get_db` dependency to get a database session.
+The read-only endpoints use the `get_read_db` dependency to get a session on
+the read database, the others use the `get_db` dependency.
 The endpoints use the `crud` module to perform the database operations.
 """
 
@@ -20,7 +21,7 @@ from app import schemas
 from app.crud import attributes as crud
 from app.crud import capabilities as capability_crud
 from app.database import get_db
-from app.routers.security import get_current_user
+from app.routers.security import get_current_user, get_read_db
 
 router = APIRouter(
     prefix="/attributes",
@@ -79,7 +80,7 @@ def create_attribute(
         ) from error
 
 @router.get("/", response_model=List[schemas.AttributeRead])
-def read_attributes(limit: int = 100, db_session: Session = Depends(get_db)):
+def read_attributes(limit: int = 100, db_session: Session = Depends(get_read_db)):
     """
     Retrieves a list of Attribute instances.
 
@@ -106,7 +107,7 @@ def read_attributes(limit: int = 100, db_session: Session = Depends(get_db)):
         ) from error
 
 @router.get("/{attribute_id}", response_model=schemas.AttributeRead)
-def read_attribute(attribute_id: int, db_session: Session = Depends(get_db)):
+def read_attribute(attribute_id: int, db_session: Session = Depends(get_read_db)):
     """
     Retrieves an Attribute instance by its ID.
 
@@ -10,7 +10,8 @@ The endpoints are:
 - `GET /capabilities/component/{component_id}`:
     Retrieves a list of capabilities for a component by its ID.
 
-The endpoints use the `get_db` dependency to get a database session.
+The read-only endpoints use the `get_read_db` dependency to get a session on
+the read database, the others use the `get_db` dependency.
 The endpoints use the `crud` module to perform the database operations.
 """
 
@@ -21,7 +22,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.crud import capabilities as crud
 from app.database import get_db
-from app.routers.security import get_current_user
+from app.routers.security import get_current_user, get_read_db
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +83,7 @@ def create_capability(
 
 
 @router.get("/", response_model=List[schemas.CapabilityRead])
-def read_capabilities(limit: int = 100, db_session: Session = Depends(get_db)):
+def read_capabilities(limit: int = 100, db_session: Session = Depends(get_read_db)):
     """
     Retrieves a list of capabilities.
 
@@ -110,7 +111,7 @@ def read_capabilities(limit: int = 100, db_session: Session = Depends(get_db)):
 
 
 @router.get("/{capability_id}", response_model=schemas.CapabilityRead)
-def read_capability(capability_id: int, db_session: Session = Depends(get_db)):
+def read_capability(capability_id: int, db_session: Session = Depends(get_read_db)):
     """
     Retrieves a capability by its ID.
 
@@ -143,7 +144,7 @@ def read_capability(capability_id: int, db_session: Session = Depends(get_db)):
 def read_capabilities_by_component(
                 component_id: int,
                 limit: int = 100,
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves a list of capabilities belonging to a specific component by its ID.
@@ -151,7 +152,7 @@ def read_capabilities_by_component(
     Args:
         component_id: The ID of the component to retrieve capabilities for.
         limit : The maximum number of capabilities to return. Defaults to 100.
-        db_session : The database session. Defaults to Depends(get_db).
+        db_session : The database session. Defaults to Depends(get_read_db).
 
     Returns:
         A list of capabilities belonging to the specified component.
@@ -22,12 +22,15 @@ The endpoints are:
    - Retrieves aggregated ratings for a list of capability assessments.
 - POST /capability-assessments/ratings/batch/
    - Retrieves all ratings for multiple capability assessments provided by a user.
+- POST /capability-assessments/historical-time-series
+   - Retrieves the average ratings of capability assessments at several dates.
 
-The endpoints use the `get_db` dependency to get a database session.
+The read-only endpoints use the `get_read_db` dependency to get a session on
+the read database, the others use the `get_db` dependency.
 The endpoints use the `crud` module to perform the database operations.
 """
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Union, Any, Optional
 from statistics import mean
 from pydantic import BaseModel
@@ -35,12 +38,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import DatabaseError
 from app import schemas
+from app.constants import RATING_MAPPING
 from app.crud import capabilities as crud
 from app.crud import ratings as rating_crud
-from app.database import get_db
-from app.routers.security import get_current_user
+from app.crud import snapshots as snapshot_crud
+from app.database import RECENT_WRITERS, get_db
+from app.routers.security import get_current_user, get_read_db
 from app.crud.utils import get_full_capability_assessment_data
-from app.routers.ratings import RATING_MAPPING
+from app.serialization import model_list_response
 
 router = APIRouter(
     prefix="/capability-assessments",
@@ -51,14 +56,6 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 # Define mappings
-RATING_MAPPING = {
-    "Stable": 4,
-    "Acceptable": 3,
-    "Low impact": 2,
-    "Critical Concern": 1,
-    "Not Applicable": 0
-}
-
 THRESHOLD_RATING_MAPPING = {
     "Stable": [3.5, 4],
     "Acceptable": [2.5, 3.49],
@@ -67,7 +64,72 @@ THRESHOLD_RATING_MAPPING = {
     "Not Applicable": [0, 0]
 }
 
-@router.post("/batch/", response_model=Dict[str, Union[List[schemas.RatingRead], Dict[str, str]]])
+
+def get_rating_label(average_rating: Optional[float]) -> Optional[str]:
+    """
+    Maps an average rating to its label using THRESHOLD_RATING_MAPPING.
+    """
+    if average_rating is None:
+        return None
+    return next(
+        (label for label, (min_val, max_val) in THRESHOLD_RATING_MAPPING.items()
+         if min_val <= average_rating <= max_val),
+        None
+    )
+
+
+def get_ratings_aggregates(
+        db_session: Session,
+        capability_assessment_ids: List[int]
+) -> List[Dict[str, Any]]:
+    """
+    Builds the aggregated rating entries for a list of capability assessments.
+
+    Args:
+        db_session (Session): The database session.
+        capability_assessment_ids (List[int]): List of capability assessment IDs.
+
+    Returns:
+        List[Dict[str, Any]]: The capability assessment ID, average rating and
+        rating label for each of the given capability assessments.
+    """
+    aggregates = rating_crud.get_rating_stats_for_capability_assessments(
+        db_session, capability_assessment_ids
+    )
+    return build_ratings_aggregates(capability_assessment_ids, aggregates)
+
+
+def build_ratings_aggregates(
+        capability_assessment_ids: List[int],
+        aggregates: Dict[int, dict]
+) -> List[Dict[str, Any]]:
+    """
+    Builds the aggregated rating entries from the rating stats of the assessments.
+    """
+    results = []
+    for capability_assessment_id in capability_assessment_ids:
+        aggregate = aggregates.get(capability_assessment_id)
+        if aggregate is None:
+            results.append({
+                "capability_assessment_id": capability_assessment_id,
+                "average_rating": None
+            })
+            continue
+
+        average_rating = aggregate["average_rating"]
+        results.append({
+            "capability_assessment_id": capability_assessment_id,
+            "average_rating": average_rating,
+            "rating_label": get_rating_label(average_rating)
+        })
+
+    return results
+
+
+@router.post(
+    "/batch/",
+    response_model=Dict[str, Union[List[schemas.RatingRead], Dict[int, str], None]]
+)
 def upsert_capability_assessment_ratings(
         batch_request: schemas.BatchRatingRequest,
         db_session: Session = Depends(get_db),
@@ -79,30 +141,22 @@ def upsert_capability_assessment_ratings(
     ids = [rating.capability_assessment_id for rating in batch_request.ratings]
     existing_assessments = {ca.id for ca in crud.get_capability_assessments_by_ids(db_session, ids)}
 
-    logging.info("Existing assessments: %s", existing_assessments)
+    logger.info("Found %s of the %s capability assessments to rate",
+                len(existing_assessments), len(ids))
 
-    valid_ratings = []
     errors = {}
+    ratings_to_upsert = []
     for rating in batch_request.ratings:
         if rating.capability_assessment_id not in existing_assessments:
             errors[rating.capability_assessment_id] = "Capability Assessment not found"
             continue
+        ratings_to_upsert.append(rating)
 
-        existing_rating = crud.get_rating_by_user_and_assessment(
-            db_session, user_id=current_user.id,
-            capability_assessment_id=rating.capability_assessment_id
-        )
-
-        if existing_rating:
-            updated_rating = rating_crud.update_rating(
-                db_session=db_session, db_rating=existing_rating, rating=rating
-            )
-            valid_ratings.append(updated_rating)
-        else:
-            new_rating = rating_crud.create_rating(
-                db_session=db_session, rating=rating, user_id=current_user.id
-            )
-            valid_ratings.append(new_rating)
+    valid_ratings = rating_crud.upsert_ratings_for_user(
+        db_session=db_session, ratings=ratings_to_upsert, user_id=current_user.id
+    )
+    # Keep reading this user's ratings from the primary until the replicas caught up
+    RECENT_WRITERS.mark(current_user.username)
 
     response = {
         "ratings": valid_ratings,
@@ -113,14 +167,14 @@ def upsert_capability_assessment_ratings(
 @router.post("/bulk/ids", response_model=List[schemas.CapabilityAssessmentId])
 def get_bulk_capability_assessment_ids(
             request: schemas.CapabilityAssessmentBulkRequest,
-            db_session: Session = Depends(get_db)
+            db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves capability assessment IDs for the given capability IDs and attribute IDs.
 
     Args:
         request: A request object containing capability IDs and attribute IDs.
-        db_session: The database session. Defaults to Depends(get_db).
+        db_session: The database session. Defaults to Depends(get_read_db).
 
     Returns:
         A list of capability assessment IDs.
@@ -179,21 +233,15 @@ def upsert_capability_assessment_rating(
             raise HTTPException(
                 status_code=404, detail="Capability Assessment not found")
 
-        existing_rating = crud.get_rating_by_user_and_assessment(
-            db_session, user_id=current_user.id, capability_assessment_id=capability_assessment_id)
-
-        if existing_rating:
-            updated_rating = rating_crud.update_rating(
-                db_session=db_session, db_rating=existing_rating, rating=rating)
-            logger.info("Updated Rating for capability assessment: %s",
-                        capability_assessment_id)
-            return updated_rating
-
-        new_rating = rating_crud.create_rating(
-            db_session=db_session, rating=rating, user_id=current_user.id)
-        logger.info("Created New Rating for capability assessment: %s",
+        # The upsert retries on the unique (user, assessment) index, so concurrent
+        # submissions of the same rating update it instead of inserting a duplicate
+        rating = rating.model_copy(update={"capability_assessment_id": capability_assessment_id})
+        upserted_rating = rating_crud.upsert_ratings_for_user(
+            db_session=db_session, ratings=[rating], user_id=current_user.id)[0]
+        RECENT_WRITERS.mark(current_user.username)
+        logger.info("Upserted Rating for capability assessment: %s",
                     capability_assessment_id)
-        return new_rating
+        return upserted_rating
     except HTTPException as http_error:
         logger.error("Client error: %s", http_error.detail)
         raise http_error
@@ -236,6 +284,7 @@ def update_rating(
 
         db_session.commit()
         db_session.refresh(existing_rating)
+        RECENT_WRITERS.mark(current_user.username)
 
         logger.info("Updated Rating with ID: %s", rating_id)
         return existing_rating
@@ -255,7 +304,7 @@ def update_rating(
 def get_capability_assessment(
                 capability_id: int,
                 attribute_id: int,
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves a capability assessment for a specific capability and attribute.
@@ -263,7 +312,7 @@ def get_capability_assessment(
     Args:
         capability_id: The ID of the capability.
         attribute_id: The ID of the attribute.
-        db_session: The database session. Defaults to Depends(get_db).
+        db_session: The database session. Defaults to Depends(get_read_db).
 
     Returns:
         The retrieved capability assessment.
@@ -295,7 +344,7 @@ def get_capability_assessment(
 @router.get("/{capability_assessment_id}/", response_model=List[schemas.RatingRead])
 def get_ratings_for_capability_assessment(
                 capability_assessment_id: int,
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves all ratings associated with a specific capability assessment.
@@ -327,7 +376,7 @@ def get_ratings_for_capability_assessment(
 
         logger.info("Retrieved %s ratings for capability assessment ID %s", len(
             ratings), capability_assessment_id)
-        return ratings
+        return model_list_response(schemas.RatingRead, ratings)
 
     except HTTPException as http_ex:
         raise http_ex
@@ -341,7 +390,7 @@ def get_ratings_for_capability_assessment(
 def get_ratings_for_capability_assessment_by_user(
                 capability_assessment_id: int,
                 user_id: int,
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves all ratings associated for a capability assessment associated provided by a user.
@@ -363,7 +412,7 @@ def get_ratings_for_capability_assessment_by_user(
 
         logger.info("Retrieved %s ratings for user ID %s and capability assessment ID %s", len(
             user_ratings), user_id, capability_assessment_id)
-        return user_ratings or []
+        return model_list_response(schemas.RatingRead, user_ratings or [])
 
     except Exception as error:
         logger.exception(
@@ -374,7 +423,7 @@ def get_ratings_for_capability_assessment_by_user(
             response_model=Dict[str, Union[int, float, None]])
 def get_ratings_aggregate_for_capability_assessment(
                 capability_assessment_id: int,
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves aggregated ratings for a specific capability assessment.
@@ -388,35 +437,23 @@ def get_ratings_aggregate_for_capability_assessment(
         or None if no ratings are found.
     """
     try:
-        ratings = rating_crud.get_ratings_for_capability_assessment(
+        aggregate = rating_crud.get_rating_stats_for_capability_assessments(
             db_session,
-            capability_assessment_id
-        )
-        logger.info("Rating for the capability assessemnt %s", ratings)
-        if not ratings:
+            [capability_assessment_id]
+        ).get(capability_assessment_id)
+        logger.info("Rating stats for the capability assessment %s", aggregate)
+        if aggregate is None:
             logger.info("No ratings found for capability assessment")
             return {
                 "capability_assessment_id": capability_assessment_id,
                 "average_rating": None
             }
 
-        numeric_ratings = [
-            mapped_rating for rating in ratings
-            if (
-                mapped_rating := RATING_MAPPING.get(rating.rating)
-                ) is not None and mapped_rating > 0
-        ]
-
-        if not numeric_ratings:
+        if aggregate["average_rating"] is None:
             logger.info("No numeric ratings to calculate average")
-            return {
-                "capability_assessment_id": capability_assessment_id,
-                "average_rating": None
-            }
-        average_rating = mean(numeric_ratings)
         aggregated_rating = {
             "capability_assessment_id": capability_assessment_id,
-            "average_rating": average_rating
+            "average_rating": aggregate["average_rating"]
         }
 
         return aggregated_rating
@@ -434,7 +471,7 @@ def get_ratings_aggregate_for_capability_assessment(
 @router.post("/aggregates", response_model=List[Dict[str, Union[int, float, str, None]]])
 def get_bulk_ratings_aggregate(
             capability_assessment_ids: List[int],
-            db_session: Session = Depends(get_db)
+            db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves aggregated ratings for a list of capability assessments.
@@ -446,42 +483,9 @@ def get_bulk_ratings_aggregate(
     Returns:
         A list of dictionaries with the capability assessment ID and the average rating.
     """
-    logger.info("Received capability_assessment_ids: %s", capability_assessment_ids)
+    logger.info("Received %s capability_assessment_ids", len(capability_assessment_ids))
     try:
-        results = []
-        for capability_assessment_id in capability_assessment_ids:
-            ratings = rating_crud.get_ratings_for_capability_assessment(
-                db_session, capability_assessment_id
-            )
-            if not ratings:
-                results.append({
-                    "capability_assessment_id": capability_assessment_id,
-                    "average_rating": None
-                })
-                continue
-
-            numeric_ratings = [
-                mapped_rating for rating in ratings
-                if (
-                    mapped_rating := RATING_MAPPING.get(rating.rating)
-                    ) is not None and mapped_rating > 0
-            ]
-
-            average_rating = mean(numeric_ratings) if numeric_ratings else None
-
-            rating_label = None
-            if average_rating is not None:
-                for label, (min_val, max_val) in THRESHOLD_RATING_MAPPING.items():
-                    if min_val <= average_rating <= max_val:
-                        rating_label = label
-                        break
-
-            results.append({
-                "capability_assessment_id": capability_assessment_id,
-                "average_rating": average_rating,
-                "rating_label": rating_label
-            })
-
+        results = get_ratings_aggregates(db_session, capability_assessment_ids)
         return results
 
     except Exception as error:
@@ -493,7 +497,7 @@ def get_bulk_ratings_aggregate(
 def get_ratings_for_capability_assessments_by_user(
                 user_id: int,
                 capability_assessment_ids: List[int],
-                db_session: Session = Depends(get_db)
+                db_session: Session = Depends(get_read_db)
 ):
     """
     Retrieves all ratings associated for multiple capability assessments provided by a user.
@@ -513,10 +517,9 @@ def get_ratings_for_capability_assessments_by_user(
             capability_assessment_ids=capability_assessment_ids
         )
 
-        logger.info("Retrieved ratings for user ID %s and capability assessments IDs %s",
-                    user_id, capability_assessment_ids)
-        logger.info("The ratings are %s \n", user_ratings)
-        return user_ratings or []
+        logger.info("Retrieved %s ratings for user ID %s and %s capability assessments",
+                    len(user_ratings), user_id, len(capability_assessment_ids))
+        return model_list_response(schemas.RatingRead, user_ratings)
 
     except Exception as error:
         logger.exception(
@@ -527,7 +530,8 @@ def get_ratings_for_capability_assessments_by_user(
 def get_historical_ratings(
     capability_assessment_ids: List[int],
     target_date: datetime,
-    db_session: Session = Depends(get_db)
+    as_of: bool = False,
+    db_session: Session = Depends(get_read_db)
 ) -> List[schemas.RatingHistoryRead]:
     """
     Retrieves historical ratings for a list of capability assessments
@@ -536,6 +540,8 @@ def get_historical_ratings(
     Args:
         capability_assessment_ids (List[int]): List of capability assessment IDs.
         target_date (datetime): The date for which to retrieve historical ratings.
+        as_of (bool): If True, return the latest rating of each user at or before
+            target_date instead of only the ratings changed on that day.
         db_session (Session): The database session.
 
     Returns:
@@ -544,9 +550,14 @@ def get_historical_ratings(
     logger.info("Fetching historical ratings for target date: %s", target_date)
 
     try:
-        historical_ratings = rating_crud.get_ratings_history_for_date(
-            db_session, capability_assessment_ids, target_date
-        )
+        if as_of:
+            historical_ratings = rating_crud.get_ratings_history_as_of(
+                db_session, capability_assessment_ids, target_date
+            )
+        else:
+            historical_ratings = rating_crud.get_ratings_history_for_date(
+                db_session, capability_assessment_ids, target_date
+            )
 
         return historical_ratings
 
@@ -564,7 +575,8 @@ def get_historical_ratings(
 def get_ratings_for_target_date(
     db_session: Session,
     capability_assessment_ids: List[int],
-    target_date: datetime
+    target_date: datetime,
+    as_of: bool = False,
 ) -> List[schemas.RatingRead]:
     """
     Retrieves ratings for capability assessments based on the target date.
@@ -573,16 +585,25 @@ def get_ratings_for_target_date(
         db_session (Session): The database session.
         capability_assessment_ids (List[int]): List of capability assessment IDs.
         target_date (datetime): The date for which to fetch ratings.
+        as_of (bool): If True, fetch the latest ratings at or before target_date
+            instead of the ratings changed on that day.
 
     Returns:
         List[schemas.RatingRead]: List of rating entries.
     """
     try:
-        ratings_data = rating_crud.get_ratings_history_for_date(
-                    db_session,
-                    capability_assessment_ids,
-                    target_date
-                )
+        if as_of:
+            ratings_data = rating_crud.get_ratings_history_as_of(
+                        db_session,
+                        capability_assessment_ids,
+                        target_date
+                    )
+        else:
+            ratings_data = rating_crud.get_ratings_history_for_date(
+                        db_session,
+                        capability_assessment_ids,
+                        target_date
+                    )
 
         if not ratings_data:
             logger.info("No ratings found for the provided date.")
@@ -599,30 +620,82 @@ def get_ratings_for_target_date(
                             detail="Error fetching ratings for target date") from error
 
 
+def aggregate_ratings(ratings_data: List[Any]) -> Dict[int, Optional[float]]:
+    "Average the ratings of each capability assessment, None if none is in RATING_MAPPING"
+    ratings_by_assessment = {}
+    for entry in ratings_data:
+        cap_id = entry.capability_assessment_id
+        rating_value = RATING_MAPPING.get(entry.rating)
+        ratings_by_assessment.setdefault(cap_id, [])
+        if rating_value is not None:
+            ratings_by_assessment[cap_id].append(rating_value)
+    return {
+        cap_id: mean(ratings) if ratings else None
+        for cap_id, ratings in ratings_by_assessment.items()
+    }
+
+
 def get_historical_ratings_aggregate(
         db_session: Session,
         capability_assessment_ids: List[int],
         target_date: datetime,
+        as_of: bool = False,
+        unrolled_change_starts: Optional[Dict[int, datetime]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetches and aggregates historical ratings for a set of capability assessments on a target date.
 
+    The averages are read from the daily snapshots, and from the rating history
+    for the assessments whose changes around the target date are not rolled up yet.
+
     Args:
         db_session (Session): The database session.
         capability_assessment_ids (List[int]): List of capability assessment IDs.
         target_date (datetime): The date for which to fetch the ratings.
+        as_of (bool): If True, aggregate the latest ratings at or before target_date
+            instead of the ratings changed on that day.
+        unrolled_change_starts (Optional[Dict[int, datetime]]): The result of
+            snapshot_crud.get_unrolled_change_starts, fetched if not given.
 
     Returns:
         List[Dict[str, Any]]: Aggregated rating data with detailed information.
     """
     try:
-        ratings_data = get_ratings_for_target_date(
-                    db_session,
-                    capability_assessment_ids,
-                    target_date
-                )
-
-        if not ratings_data:
+        if unrolled_change_starts is None:
+            unrolled_change_starts = snapshot_crud.get_unrolled_change_starts(
+                        db_session,
+                        capability_assessment_ids
+                    )
+        if as_of:
+            snapshot_averages, missing = snapshot_crud.get_snapshot_ratings_as_of(
+                        db_session,
+                        capability_assessment_ids,
+                        [target_date],
+                        unrolled_change_starts
+                    )
+            average_ratings = {
+                cap_id: average_rating
+                for (_, cap_id), average_rating in snapshot_averages.items()
+            }
+            history_ids = sorted(cap_id for _, cap_id in missing)
+        else:
+            average_ratings, history_ids = snapshot_crud.get_snapshot_ratings_for_day(
+                        db_session,
+                        capability_assessment_ids,
+                        target_date,
+                        unrolled_change_starts
+                    )
+
+        if history_ids:
+            ratings_data = get_ratings_for_target_date(
+                        db_session,
+                        history_ids,
+                        target_date,
+                        as_of
+                    )
+            average_ratings.update(aggregate_ratings(ratings_data))
+
+        if not average_ratings:
             logger.info("No ratings found for the provided date.")
 
             return [
@@ -633,14 +706,6 @@ def get_historical_ratings_aggregate(
                 for cap_id in capability_assessment_ids
             ]
 
-        # Aggregate ratings
-        ratings_by_assessment = {}
-        for entry in ratings_data:
-            cap_id = entry.capability_assessment_id
-            rating_value = RATING_MAPPING.get(entry.rating)
-            if rating_value is not None:
-                ratings_by_assessment.setdefault(cap_id, []).append(rating_value)
-
         # Fetch detailed assessment data
         detailed_assessments = get_full_capability_assessment_data(
                     db_session,
@@ -651,21 +716,10 @@ def get_historical_ratings_aggregate(
                     for item in detailed_assessments
                 }
 
-        # Helper to map average rating to a label
-        def get_rating_label(average_rating: Optional[float]) -> Optional[str]:
-            if average_rating is None:
-                return None
-            return next(
-                (label for label, (min_val, max_val) in THRESHOLD_RATING_MAPPING.items()
-                 if min_val <= average_rating <= max_val),
-                None
-            )
-
         # Populate results with aggregated data and detailed information
         results = []
         for cap_id in capability_assessment_ids:
-            ratings = ratings_by_assessment.get(cap_id, [])
-            average_rating = mean(ratings) if ratings else None
+            average_rating = average_ratings.get(cap_id)
             rating_label = get_rating_label(average_rating)
             detailed_info = detailed_assessment_map.get(cap_id, {})
 
@@ -715,19 +769,27 @@ def get_historical_ratings_for_graph(
         capability_assessment_ids: List[int],
         start_date: datetime,
         end_date: datetime,
-        db_session: Session = Depends(get_db)
+        as_of: bool = False,
+        db_session: Session = Depends(get_read_db)
 ) -> HistoricalGraphData:
     """
     Retrieves historical ratings for a list of capability assessments 
     on two specific dates for comparison in graph form.
+
+    With as_of set, each date shows the state of the ratings at that moment
+    instead of only the ratings changed on that day.
     """
     try:
+        unrolled_change_starts = snapshot_crud.get_unrolled_change_starts(
+            db_session, capability_assessment_ids)
         results = {}
         for date_label, target_date in [("start_date", start_date), ("end_date", end_date)]:
             results[date_label] = get_historical_ratings_aggregate(
                 capability_assessment_ids=capability_assessment_ids,
                 target_date=target_date,
-                db_session=db_session
+                db_session=db_session,
+                as_of=as_of,
+                unrolled_change_starts=unrolled_change_starts
             )
 
         return HistoricalGraphData(**results)
@@ -741,3 +803,121 @@ def get_historical_ratings_for_graph(
     except Exception as error:
         logger.exception("Unexpected error in historical graph data retrieval: %s", error)
         raise HTTPException(status_code=500, detail="Internal Server Error") from error
+
+
+TIME_SERIES_STEPS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+MAX_TIME_SERIES_DATES = 366
+
+
+def get_time_series_dates(request: schemas.RatingTimeSeriesRequest) -> List[datetime]:
+    """
+    Returns the sorted dates of a time series request, either the given dates
+    or every step from start_date up to and including end_date.
+    """
+    if request.dates:
+        dates = sorted(set(request.dates))
+    elif request.start_date is None or request.end_date is None:
+        raise HTTPException(
+            status_code=400, detail="Either dates or start_date and end_date are required")
+    elif request.start_date > request.end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    else:
+        step = TIME_SERIES_STEPS[request.step]
+        number_of_dates = min(
+            (request.end_date - request.start_date) // step + 1, MAX_TIME_SERIES_DATES + 1)
+        dates = [request.start_date + step * position for position in range(number_of_dates)]
+
+    if len(dates) > MAX_TIME_SERIES_DATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A time series can have at most {MAX_TIME_SERIES_DATES} dates")
+    return dates
+
+
+@router.post("/historical-time-series", response_model=schemas.RatingTimeSeries)
+def get_historical_ratings_time_series(
+        request: schemas.RatingTimeSeriesRequest,
+        db_session: Session = Depends(get_read_db)
+) -> schemas.RatingTimeSeries:
+    """
+    Retrieves the average rating and rating label of a list of capability assessments
+    at every date of a time series, for trend charts.
+
+    Each date shows the latest rating of every user at or before that date, as the
+    as_of mode of /historical-graph-data does. The averages are read from the daily
+    snapshots, and the dates after the first change not rolled up yet of an assessment
+    from the rating history with one query. The names are fetched once.
+
+    Args:
+        request (schemas.RatingTimeSeriesRequest): The capability assessment IDs and
+            either a list of dates or a start date, end date and step.
+        db_session (Session): The database session.
+
+    Returns:
+        schemas.RatingTimeSeries: The names of the capability assessments and their
+        average ratings and labels as one list per assessment.
+    """
+    try:
+        dates = get_time_series_dates(request)
+
+        unrolled_change_starts = snapshot_crud.get_unrolled_change_starts(
+            db_session, request.capability_assessment_ids)
+        averages, missing = snapshot_crud.get_snapshot_ratings_as_of(
+            db_session, request.capability_assessment_ids, dates, unrolled_change_starts
+        )
+        if missing:
+            history_positions = sorted({position for position, _ in missing})
+            history_averages = rating_crud.get_ratings_time_series(
+                db_session,
+                sorted({cap_id for _, cap_id in missing}),
+                [dates[position] for position in history_positions],
+                RATING_MAPPING,
+            )
+            for (index, cap_id), average_rating in history_averages.items():
+                if (history_positions[index], cap_id) in missing:
+                    averages[(history_positions[index], cap_id)] = average_rating
+        detailed_assessment_map = {
+            item["capability_assessment_id"]: item
+            for item in get_full_capability_assessment_data(
+                db_session, request.capability_assessment_ids)
+        }
+
+        average_ratings = [
+            [averages.get((position, cap_id)) for position in range(len(dates))]
+            for cap_id in request.capability_assessment_ids
+        ]
+        return schemas.RatingTimeSeries(
+            dates=dates,
+            capability_assessment_ids=request.capability_assessment_ids,
+            capability_names=[
+                detailed_assessment_map.get(cap_id, {}).get("capability_name")
+                for cap_id in request.capability_assessment_ids
+            ],
+            attribute_names=[
+                detailed_assessment_map.get(cap_id, {}).get("attribute_name")
+                for cap_id in request.capability_assessment_ids
+            ],
+            component_names=[
+                detailed_assessment_map.get(cap_id, {}).get("component_name")
+                for cap_id in request.capability_assessment_ids
+            ],
+            acc_model_names=[
+                detailed_assessment_map.get(cap_id, {}).get("acc_model_name")
+                for cap_id in request.capability_assessment_ids
+            ],
+            average_ratings=average_ratings,
+            rating_labels=[
+                [get_rating_label(average_rating) for average_rating in assessment_ratings]
+                for assessment_ratings in average_ratings
+            ],
+        )
+
+    except HTTPException as http_error:
+        logger.error("Client error: %s", http_error.detail)
+        raise http_error
+    except Exception as error:
+        logger.exception("Unexpected error in historical time series retrieval: %s", error)
+        raise HTTPException(status_code=500, detail="Internal Server Error") from error
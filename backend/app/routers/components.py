@@ -10,7 +10,8 @@ The endpoints are:
 - `PUT /components/id/{component_id}`: Updates an existing component.
 - `DELETE /components/{component_id}`: Deletes an existing component.
 
-The endpoints use the `get_db` dependency to get a database session.
+The read-only endpoints use the `get_read_db` dependency to get a session on
+the read database, the others use the `get_db` dependency.
 The endpoints use the `crud` module to perform the database operations.
 """
 
@@ -21,7 +22,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.crud import components as crud
 from app.database import get_db
-from app.routers.security import get_current_user
+from app.routers.security import get_current_user, get_read_db
 
 router = APIRouter(
     prefix="/components",
@@ -76,7 +77,7 @@ def create_component(
 
 
 @router.get("/", response_model=List[schemas.ComponentRead])
-def read_all_components(limit: int = 100, db_session: Session = Depends(get_db)):
+def read_all_components(limit: int = 100, db_session: Session = Depends(get_read_db)):
     """
     Retrieves a list of all components.
 
@@ -106,7 +107,7 @@ def read_all_components(limit: int = 100, db_session: Session = Depends(get_db))
 def read_components_by_acc_model(
                 acc_model_id: int,
                 limit: int = 100,
-                db_session: Session = Depends(get_db)):
+                db_session: Session = Depends(get_read_db)):
     """
     Retrieves a list of components associated with a specific acc_model_id.
 
@@ -136,7 +137,7 @@ def read_components_by_acc_model(
 
 
 @router.get("/id/{component_id}", response_model=schemas.ComponentRead)
-def read_component(component_id: int, db_session: Session = Depends(get_db)):
+def read_component(component_id: int, db_session: Session = Depends(get_read_db)):
     """
     Retrieves a Component by its ID.
 
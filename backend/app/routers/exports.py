@@ -0,0 +1,218 @@
+"""
+This module defines the endpoints exporting the ratings of an ACC model for
+analysis outside of the app.
+
+The endpoints are:
+- `GET /exports/acc-models/{acc_model_id}/ratings`: Exports the current ratings
+    of an ACC model.
+- `GET /exports/acc-models/{acc_model_id}/rating-history`: Exports every rating
+    change of an ACC model.
+
+Both return one row per rating or change with the names of its component,
+capability, attribute and user, as CSV or as newline delimited JSON (NDJSON),
+optionally limited to a date range. The rows are streamed to the client as they
+are read from the database, so the size of an export does not affect the memory
+of the server. The endpoints require authentication and use the `get_read_db`
+dependency, whose session stays open while the rows are streamed since FastAPI
+0.118 closes yield dependencies after the response is sent.
+
+An export holds a database connection until the last row is sent, so a worker
+process runs up to EXPORT_MAX_CONCURRENT (2) exports at a time and answers the
+others with a 503 error. The user lookup returns its connection before the
+export starts, so the exports of a worker hold at most EXPORT_MAX_CONCURRENT
+connections of the primary pool, which should stay below DB_POOL_SIZE +
+DB_MAX_OVERFLOW.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+from app import schemas
+from app.crud import acc_models as acc_model_crud
+from app.crud import exports as crud
+from app.routers.security import get_current_user, get_read_db
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+# Rows written to the response at a time
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+
+EXPORT_SLOTS = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"],
+    responses={404: {"description": "Not found"}},
+)
+
+logger = logging.getLogger(__name__)
+
+
+def format_export_value(value):
+    "Return a value of an export row as written to the file, dates in ISO 8601"
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_csv(columns: Tuple[str, ...], rows: Iterable) -> Iterator[str]:
+    "Yields a header and the rows as CSV, EXPORT_CHUNK_ROWS rows at a time"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([format_export_value(value) for value in row])
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(columns: Tuple[str, ...], rows: Iterable) -> Iterator[str]:
+    "Yields the rows as JSON objects, one per line, EXPORT_CHUNK_ROWS rows at a time"
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, map(format_export_value, row)))))
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+EXPORT_WRITERS = {"csv": iter_csv, "ndjson": iter_ndjson}
+
+
+def stream_export(db_session: Session, acc_model_id: int, name: str,  # pylint: disable=too-many-arguments
+                  columns: Tuple[str, ...], statement: Select,
+                  export_format: str) -> StreamingResponse:
+    """
+    Runs an export query and streams its rows as an attachment in the requested
+    format, answering with a 404 if the ACC model does not exist.
+    """
+    if acc_model_crud.get_acc_model(db_session, acc_model_id=acc_model_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ACC model not found")
+    rows = crud.execute_export(db_session, statement)
+    filename = f"acc-model-{acc_model_id}-{name}.{export_format}"
+    return StreamingResponse(
+        EXPORT_WRITERS[export_format](columns, rows),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def reserve_export_slot():
+    """
+    Holds one of the EXPORT_MAX_CONCURRENT export slots of the worker process
+    until the export is streamed, answering with a 503 error if none is free.
+    """
+    if not EXPORT_SLOTS.acquire(blocking=False):
+        logger.warning("Export rejected, %d exports already running", EXPORT_MAX_CONCURRENT)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many exports running, retry later",
+                            headers={"Retry-After": "10"})
+    try:
+        yield
+    finally:
+        EXPORT_SLOTS.release()
+
+
+def check_date_range(start_date: Optional[datetime], end_date: Optional[datetime]):
+    "Raise a 400 error if the date range is empty"
+    if start_date is not None and end_date is not None and start_date >= end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="start_date must be before end_date")
+
+
+@router.get("/acc-models/{acc_model_id}/ratings", response_class=StreamingResponse,
+            dependencies=[Depends(reserve_export_slot)])
+def export_ratings(  # pylint: disable=too-many-arguments
+                acc_model_id: int,
+                export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+                start_date: Optional[datetime] = None,
+                end_date: Optional[datetime] = None,
+                db_session: Session = Depends(get_read_db),
+                current_user: schemas.UserRead = Depends(get_current_user)
+):
+    """
+    Export the current ratings of every user for an ACC model.
+
+    Args:
+        acc_model_id: The ID of the ACC model to export the ratings of.
+        export_format: csv (default) or ndjson.
+        start_date: Only export the ratings last changed from this moment on.
+        end_date: Only export the ratings last changed before this moment.
+        db_session: The database session to use for the query.
+        current_user: The current authenticated user.
+
+    Returns:
+        The ratings with their component, capability, attribute and user names,
+        streamed as a file attachment.
+    """
+    try:
+        check_date_range(start_date, end_date)
+        logger.info("User %s exporting the ratings of ACC model %d as %s",
+                    current_user.username, acc_model_id, export_format)
+        return stream_export(
+            db_session, acc_model_id, "ratings", crud.RATING_EXPORT_COLUMNS,
+            crud.select_rating_export(acc_model_id, start_date, end_date), export_format)
+    except HTTPException as http_error:
+        raise http_error
+    except Exception as error:
+        logger.error("Error exporting the ratings of ACC model %d: %s", acc_model_id, error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred") from error
+
+
+@router.get("/acc-models/{acc_model_id}/rating-history", response_class=StreamingResponse,
+            dependencies=[Depends(reserve_export_slot)])
+def export_rating_history(  # pylint: disable=too-many-arguments
+                acc_model_id: int,
+                export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+                start_date: Optional[datetime] = None,
+                end_date: Optional[datetime] = None,
+                db_session: Session = Depends(get_read_db),
+                current_user: schemas.UserRead = Depends(get_current_user)
+):
+    """
+    Export every rating change made for an ACC model, oldest first.
+
+    Args:
+        acc_model_id: The ID of the ACC model to export the rating history of.
+        export_format: csv (default) or ndjson.
+        start_date: Only export the changes made from this moment on.
+        end_date: Only export the changes made before this moment.
+        db_session: The database session to use for the query.
+        current_user: The current authenticated user.
+
+    Returns:
+        The rating changes with their component, capability, attribute and user
+        names, streamed as a file attachment.
+    """
+    try:
+        check_date_range(start_date, end_date)
+        logger.info("User %s exporting the rating history of ACC model %d as %s",
+                    current_user.username, acc_model_id, export_format)
+        return stream_export(
+            db_session, acc_model_id, "rating-history", crud.RATING_HISTORY_EXPORT_COLUMNS,
+            crud.select_rating_history_export(acc_model_id, start_date, end_date),
+            export_format)
+    except HTTPException as http_error:
+        raise http_error
+    except Exception as error:
+        logger.error("Error exporting the rating history of ACC model %d: %s",
+                     acc_model_id, error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="An unexpected error occurred") from error
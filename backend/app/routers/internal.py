@@ -0,0 +1,67 @@
+"""
+This module defines internal endpoints reporting the state of a worker process,
+used to size its connection pool and caches. They are left out of the API schema
+and require authentication.
+
+The endpoints are:
+- `GET /internal/pool`: Reports the state of the database connection pools and
+    how long requests waited for a connection.
+- `GET /internal/user-cache`: Reports the size and hit and miss counters of the
+    authenticated user cache.
+- `GET /internal/response-cache`: Reports the size and hit, not modified and miss
+    counters of the taxonomy response cache.
+"""
+
+import logging
+from fastapi import APIRouter, Depends
+from app import database
+from app.response_cache import RESPONSE_CACHE
+from app.routers.security import get_current_user
+from app.user_cache import USER_CACHE
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(get_current_user)],
+)
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/pool")
+def read_pool_status():
+    """
+    Reports the state of the connection pools of this worker process.
+
+    Returns:
+        The pool size, checked out connections, overflow and checkout wait
+        statistics of the sync engine, and of the read and async engines when enabled.
+    """
+    status = {"sync": database.get_pool_status(database.engine, database.POOL_STATS)}
+    if database.read_engine is not database.engine:
+        status["read"] = database.get_pool_status(
+            database.read_engine, database.READ_POOL_STATS)
+    if database.async_engine is not None:
+        status["async"] = database.get_pool_status(
+            database.async_engine.sync_engine, database.ASYNC_POOL_STATS)
+    if database.async_read_engine is not database.async_engine:
+        status["async_read"] = database.get_pool_status(
+            database.async_read_engine.sync_engine, database.ASYNC_READ_POOL_STATS)
+    return status
+
+
+@router.get("/user-cache")
+def read_user_cache_status():
+    """
+    Reports the size and hit and miss counters of the authenticated user cache.
+    """
+    return USER_CACHE.stats()
+
+
+@router.get("/response-cache")
+def read_response_cache_status():
+    """
+    Reports the size and hit, not modified and miss counters of the response cache.
+    """
+    return RESPONSE_CACHE.stats()
@@ -0,0 +1,27 @@
+"""
+This module defines the endpoint exposing the metrics of the worker process to
+Prometheus. It is left out of the API schema.
+
+The endpoints are:
+- `GET /metrics`: Returns the request counters, latency histograms, requests in
+    flight and database statements per request in the Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import REQUEST_METRICS
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(
+    tags=["metrics"],
+    include_in_schema=False,
+)
+
+
+@router.get("/metrics")
+def read_metrics():
+    """
+    Returns the metrics of this worker process in the Prometheus text format.
+    """
+    return PlainTextResponse(REQUEST_METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
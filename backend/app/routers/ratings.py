@@ -20,14 +20,6 @@ RATING_VALUES = [
     "Not Applicable"
 ]
 
-RATING_MAPPING = {
-    "Stable": 4,
-    "Acceptable": 3,
-    "Low impact": 2,
-    "Critical Concern": 1,
-    "Not Applicable": 0
-}
-
 
 @router.get("/rating-options/", response_model=List[str])
 def read_rating_values():
@@ -11,22 +11,35 @@ It also includes functions for:
 """
 
 import os
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Union, Annotated
+from typing import Union, Annotated, Optional
 
 from dotenv import load_dotenv
 import jwt
 from jwt.exceptions import InvalidTokenError
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import (
+    get_async_db,
+    get_db,
+    get_read_session,
+    open_async_read_session,
+    reads_from_read_database,
+)
 from app.schemas import TokenData
-from app import schemas
+from app import database, schemas
+from app.response_cache import READ_FROM_PRIMARY
 import app.crud.users as crud
+import app.crud.async_users as async_crud
+from app.user_cache import USER_CACHE
 
 
 router = APIRouter()
@@ -44,8 +57,18 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 300
 
 PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt takes a few hundred milliseconds of CPU per password, so it runs on its own
+# small pool instead of the event loop or the threadpool serving the sync endpoints
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+PASSWORD_HASH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl="token")
 
+OPTIONAL_OAUTH2_SCHEME = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
 
 def verify_password(plain_password, hashed_password):
     """
@@ -61,6 +84,22 @@ def verify_password(plain_password, hashed_password):
     return PWD_CONTEXT.verify(plain_password, hashed_password)
 
 
+async def verify_password_in_executor(plain_password, hashed_password):
+    """
+    Verify a password on the password hashing executor, without blocking the event loop.
+
+    Args:
+        plain_password (str): The plain password to be verified.
+        hashed_password (str): The hashed password to be compared against.
+
+    Returns:
+        bool: True if the plain password matches the hashed password, False otherwise.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        PASSWORD_HASH_EXECUTOR, verify_password, plain_password, hashed_password
+    )
+
+
 def get_password_hash(password):
     """
     Generates a hash of the provided password using the password hashing context.
@@ -74,10 +113,13 @@ def get_password_hash(password):
     return PWD_CONTEXT.hash(password)
 
 
-def authenticate_user(username: str, password: str, db_session: Session):
+async def authenticate_user(username: str, password: str, db_session: Session):
     """
     Authenticates a user based on the provided username and password.
 
+    The user lookup runs on the threadpool and the password verification on the
+    password hashing executor, so the event loop keeps serving other requests.
+
     Parameters:
         username (str): The username of the user to authenticate.
         password (str): The password of the user to authenticate.
@@ -88,13 +130,14 @@ def authenticate_user(username: str, password: str, db_session: Session):
     """
 
     try:
-        db_user = crud.get_user_by_username(db_session, username=username)
+        db_user = await run_in_threadpool(
+            crud.get_user_by_username, db_session, username=username)
 
         if db_user is None:
             logger.warning("No user found with username: %s", username)
             return None
         
-        if not verify_password(password, db_user.hashed_password):
+        if not await verify_password_in_executor(password, db_user.hashed_password):
             logger.warning(
                 "Password verification failed for user: %s", username)
             return False
@@ -164,30 +207,33 @@ def verify_refresh_token(token: str):
             detail="An unexpected error occurred while decoding the refresh token."
         ) from error
 
-async def get_current_user(
-                token: str = Depends(OAUTH2_SCHEME),
-                db_session: Session = Depends(get_db)):
+def credentials_exception() -> HTTPException:
     """
-    Retrieves the current user based on the provided JWT token.
+    Returns the error raised when the credentials of a token cannot be validated.
+    """
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_token_username(token: str) -> str:
+    """
+    Decodes a JWT token and returns the username it was issued for.
 
     Args:
         token (str): The JWT token for authentication.
-        db_session: The database session to query user information.
 
     Returns:
-        user: The authenticated user if the token is valid.
+        str: The username in the 'sub' field of the token.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             logger.warning("JWT payload missing 'sub' field.")
-            raise credentials_exception
+            raise credentials_exception()
         token_data = TokenData(username=username)
     except InvalidTokenError as error:
         logger.error("Invalid token: %s", error)
@@ -196,14 +242,158 @@ async def get_current_user(
             detail="Incorrect token",
             headers={"WWW-Authenticate": "Bearer"},
         ) from error
+    return token_data.username
+
 
-    user = crud.get_user_by_username(db_session, username=token_data.username)
+def get_optional_token_username(token: Optional[str]) -> Optional[str]:
+    """
+    Returns the username of a token, or None when there is no token or it is
+    invalid.
+    """
+    if token is None:
+        return None
+    try:
+        return get_token_username(token)
+    except HTTPException:
+        return None
+
+
+def get_current_user(token: str = Depends(OAUTH2_SCHEME)):
+    """
+    Retrieves the current user based on the provided JWT token.
+
+    Declared sync so that FastAPI runs it, and its query, on the threadpool. The
+    user is read from USER_CACHE when it was looked up recently. Otherwise it is
+    looked up in a session of its own, closed right away, so the lookup neither
+    keeps a connection while the endpoint runs, e.g. streams an export from the
+    read database, nor touches the session of the request.
+
+    Args:
+        token (str): The JWT token for authentication.
+
+    Returns:
+        user: The authenticated user if the token is valid.
+    """
+    username = get_token_username(token)
+    user = USER_CACHE.get(username)
+    if user is None:
+        with database.SessionLocal() as db_session:
+            db_user = crud.get_user_by_username(db_session, username=username)
+            if db_user is None:
+                logger.warning("User not found for username: %s", username)
+                raise credentials_exception()
+            user = USER_CACHE.put(username, schemas.UserRead.model_validate(db_user))
+    return user
+
+
+def get_optional_current_user(token: Optional[str] = Depends(OPTIONAL_OAUTH2_SCHEME)):
+    """
+    Retrieves the current user if a JWT token was provided with the request.
+
+    Args:
+        token (Optional[str]): The JWT token for authentication, if any.
+
+    Returns:
+        user: The authenticated user, or None if no token was provided.
+    """
+    if token is None:
+        return None
+    return get_current_user(token=token)
+
+
+def get_read_db(
+                request: Request,
+                token: Optional[str] = Depends(OPTIONAL_OAUTH2_SCHEME),
+                db_session: Session = Depends(get_db)):
+    """
+    Yields a session for the read-only endpoints, on the read database unless the
+    user of the token submitted ratings within the read-your-writes window, or
+    the response is built for the response cache (see app.response_cache).
+
+    Otherwise, and when there is no read database, it yields the get_db session
+    of the request, which FastAPI shares with the other dependencies using get_db,
+    so that the request holds one connection.
+
+    The token only identifies the user; an invalid one is ignored, since the
+    endpoints using this dependency do not require authentication.
+
+    Args:
+        request (Request): The request, whose state may require the primary.
+        token (Optional[str]): The JWT token for authentication, if any.
+        db_session: The primary database session of the request.
+    """
+    built_for_cache = getattr(request.state, READ_FROM_PRIMARY, False)
+    if built_for_cache or not reads_from_read_database(get_optional_token_username(token)):
+        yield db_session
+        return
+    yield from get_read_session()
+
+
+async def get_async_read_db(
+                request: Request,
+                token: Optional[str] = Depends(OPTIONAL_OAUTH2_SCHEME),
+                db_session: AsyncSession = Depends(get_async_db)):
+    """
+    Yields an async session for the async read-only endpoints, routed like
+    get_read_db: on the read database unless the user of the token submitted
+    ratings within the read-your-writes window, and otherwise on the get_async_db
+    session of the request.
+
+    Args:
+        request (Request): The request, whose state may require the primary.
+        token (Optional[str]): The JWT token for authentication, if any.
+        db_session: The primary async database session of the request.
+    """
+    built_for_cache = getattr(request.state, READ_FROM_PRIMARY, False)
+    if built_for_cache or not reads_from_read_database(get_optional_token_username(token)):
+        yield db_session
+        return
+    async with open_async_read_session() as database_session:
+        yield database_session
+
+
+async def get_current_user_async(
+                token: str = Depends(OAUTH2_SCHEME),
+                db_session: AsyncSession = Depends(get_async_db)):
+    """
+    Retrieves the current user based on the provided JWT token, for the async routers.
+
+    Args:
+        token (str): The JWT token for authentication.
+        db_session: The async database session to query user information.
+
+    Returns:
+        user: The authenticated user if the token is valid.
+    """
+    username = get_token_username(token)
+    user = USER_CACHE.get(username)
     if user is None:
-        logger.warning("User not found for username: %s", token_data.username)
-        raise credentials_exception
+        db_user = await async_crud.get_user_by_username(db_session, username=username)
+        if db_user is None:
+            logger.warning("User not found for username: %s", username)
+            raise credentials_exception()
+        user = USER_CACHE.put(username, schemas.UserRead.model_validate(db_user))
     return user
 
 
+async def get_optional_current_user_async(
+                token: Optional[str] = Depends(OPTIONAL_OAUTH2_SCHEME),
+                db_session: AsyncSession = Depends(get_async_db)):
+    """
+    Retrieves the current user if a JWT token was provided, for the async routers.
+
+    Args:
+        token (Optional[str]): The JWT token for authentication, if any.
+        db_session: The async database session to query user information.
+
+    Returns:
+        user: The authenticated user, or None if no token was provided.
+    """
+    if token is None:
+        return None
+    return await get_current_user_async(token=token, db_session=db_session)
+
+
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
                 form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -227,7 +417,7 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = authenticate_user(
+    user = await authenticate_user(
         form_data.username, form_data.password, db_session)
     
     if user is None:
@@ -255,7 +445,7 @@ async def login_for_access_token(
 
 
 @router.post("/refresh-token", response_model=schemas.Token)
-async def refresh_access_token(
+def refresh_access_token(
                 refresh_token: str,
                 db_session: Session = Depends(get_db)):
     """
@@ -4,7 +4,7 @@ define the structure of the data that the API will handle.
 """
 
 from datetime import datetime
-from typing import Optional, List, Union
+from typing import Optional, List, Literal, Union, Dict
 from pydantic import BaseModel, ConfigDict, Field
 
 class ACCModelBase(BaseModel):
@@ -158,6 +158,12 @@ class CapabilityAssessmentId(BaseModel):
     capability_id: int
     attribute_id: int
 
+class ComponentMatrixRead(ComponentRead):
+    """
+    Model for reading a Component along with its capabilities
+    """
+    capabilities: List[CapabilityRead]
+
 class UserBase(BaseModel):
     """
     Base model for User with common properties
@@ -227,6 +233,17 @@ class BatchRatingRequest(BaseModel):
     """
     ratings: List[RatingCreate]
 
+class ACCModelMatrix(BaseModel):
+    """
+    Model for reading the full ratings matrix of an ACCModel
+    """
+    acc_model: ACCModelRead
+    components: List[ComponentMatrixRead]
+    attributes: List[AttributeRead]
+    capability_assessments: List[CapabilityAssessmentId]
+    aggregates: Optional[List[Dict[str, Union[int, float, str, None]]]] = None
+    ratings: Optional[List[RatingRead]] = None
+
 class CommentBase(BaseModel):
     """
     Base model for a Comment with common properties
@@ -285,9 +302,11 @@ class RatingHistoryBase(BaseModel):
 
 class RatingHistoryRead(RatingHistoryBase):
     """
-    Model for reading a RatingHistory
+    Model for reading a RatingHistory, or a current Rating looked up as of a date,
+    which has no history ID and the ID of the rating instead
     """
-    id: int
+    id: Optional[int]
+    rating_id: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -295,4 +314,30 @@ class RatingHistoryCreate(RatingHistoryBase):
     """
     Model for creating a RatingHistory
     """
-    pass
\ No newline at end of file
+    pass
+
+class RatingTimeSeriesRequest(BaseModel):
+    """
+    Model for requesting the ratings of capability assessments over time,
+    either for a list of dates or for every step between a start and an end date
+    """
+    capability_assessment_ids: List[int]
+    dates: Optional[List[datetime]] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    step: Literal["daily", "weekly"] = "daily"
+
+class RatingTimeSeries(BaseModel):
+    """
+    Model for reading the ratings of capability assessments over time.
+    The per-assessment lists follow the order of capability_assessment_ids
+    and the inner lists follow the order of dates.
+    """
+    dates: List[datetime]
+    capability_assessment_ids: List[int]
+    capability_names: List[Optional[str]]
+    attribute_names: List[Optional[str]]
+    component_names: List[Optional[str]]
+    acc_model_names: List[Optional[str]]
+    average_ratings: List[List[Optional[float]]]
+    rating_labels: List[List[Optional[str]]]
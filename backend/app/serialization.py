@@ -0,0 +1,39 @@
+"""
+This module serializes the results of the large list endpoints in a single pass.
+
+For an endpoint with a response_model, FastAPI validates the returned content
+against it in the threadpool and then dumps the validated models to JSON. When the
+content is a list of schemas the crud functions already validated, or of ORM rows,
+model_list_response does both steps in one pydantic-core call instead: the rows
+are validated from their attributes and written to JSON bytes without building a
+second list of models. The endpoints keep their response_model for the API schema.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    Returns the TypeAdapter of a list of the given schema, built once per schema.
+    """
+    return TypeAdapter(List[schema])
+
+
+def model_list_response(schema: Type[BaseModel], rows: Iterable[Any]) -> Response:
+    """
+    Returns a JSON response of the rows serialized as a list of the given schema.
+
+    Args:
+        schema: The schema of the items, as used in the response_model of the endpoint.
+        rows: ORM rows or instances of the schema.
+
+    Returns:
+        The response holding the JSON bytes of the list.
+    """
+    adapter = get_list_adapter(schema)
+    items = adapter.validate_python(list(rows), from_attributes=True)
+    return Response(content=adapter.dump_json(items), media_type="application/json")
@@ -0,0 +1,78 @@
+"""
+This module holds the in-process cache of the users authenticated by their token.
+
+Every authenticated request used to look its user up by username. The cache keeps
+the users read by get_current_user for USER_CACHE_TTL_SECONDS (60 by default) and
+evicts the least recently used ones past USER_CACHE_SIZE entries (1024 by default).
+Creating or deleting a user invalidates its entry in this process; the TTL bounds
+how long other worker processes may keep serving a deleted user.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from app import schemas
+
+
+class UserCache:
+    "TTL and LRU cache of users keyed by the lowercased subject of their token"
+
+    def __init__(self, max_size: int, ttl_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[schemas.UserRead]:
+        "Return the cached user, or None if it is missing or expired"
+        key = username.lower()
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None or entry[0] <= self._clock():
+                self._users.pop(key, None)
+                self.misses += 1
+                return None
+            self._users.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, username: str, user: schemas.UserRead) -> schemas.UserRead:
+        "Cache a user, evicting the least recently used ones past max_size"
+        if self.max_size <= 0:
+            return user
+        key = username.lower()
+        with self._lock:
+            self._users[key] = (self._clock() + self.ttl_seconds, user)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+        return user
+
+    def invalidate(self, username: str):
+        "Forget the cached user with the given username"
+        with self._lock:
+            self._users.pop(username.lower(), None)
+
+    def clear(self):
+        "Forget every cached user and reset the counters"
+        with self._lock:
+            self._users.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        "Return the size of the cache and its hit and miss counters"
+        with self._lock:
+            return {"size": len(self._users), "hits": self.hits, "misses": self.misses}
+
+
+USER_CACHE = UserCache(
+    max_size=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+)
@@ -0,0 +1,207 @@
+"""
+Load benchmark comparing the sync and async stacks of the backend.
+
+Starts the app with uvicorn once with ASYNC_DATABASE=false and once with
+ASYNC_DATABASE=true against the database pointed to by DATABASE_URL, and drives it
+with concurrent clients that load the ACC model matrix, read the aggregates and
+submit rating batches. Run it from the backend folder after applying the migrations:
+
+    python benchmarks/async_load.py --seed
+    python benchmarks/async_load.py --clients 50 200 1000 --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import httpx
+from app import models
+from app.database import SessionLocal, engine
+from app.routers.security import create_access_token
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RATINGS = ["Stable", "Acceptable", "Low impact", "Critical Concern", "Not Applicable"]
+USERNAME_PREFIX = "load_user_"
+
+
+def seed(num_users, num_components, num_capabilities, num_attributes):
+    "Create an ACC model and the users submitting ratings during the benchmark"
+    models.Base.metadata.create_all(engine)
+    with SessionLocal() as db_session:
+        acc_model = models.ACCModel(
+            name=f"Load benchmark {datetime.now():%Y%m%d%H%M%S}",
+            description="Seeded by the async load benchmark",
+        )
+        attributes = [
+            models.Attribute(name=f"Load attribute {acc_model.name} {counter}")
+            for counter in range(num_attributes)
+        ]
+        db_session.add_all([acc_model, *attributes])
+        for component_counter in range(num_components):
+            component = models.Component(
+                name=f"Load component {component_counter}", acc_model=acc_model)
+            for capability_counter in range(num_capabilities):
+                capability = models.Capability(
+                    name=f"Load capability {component_counter}-{capability_counter}",
+                    component=component,
+                )
+                db_session.add_all(
+                    models.CapabilityAssessment(capability=capability, attribute=attribute)
+                    for attribute in attributes
+                )
+        existing_users = {
+            username for username, in db_session.query(models.User.username)
+            .filter(models.User.username.like(f"{USERNAME_PREFIX}%"))
+        }
+        db_session.add_all(
+            models.User(
+                username=f"{USERNAME_PREFIX}{counter}",
+                email=f"{USERNAME_PREFIX}{counter}@example.com",
+                hashed_password="not-a-real-hash",
+            )
+            for counter in range(num_users)
+            if f"{USERNAME_PREFIX}{counter}" not in existing_users
+        )
+        db_session.commit()
+        print(f"Seeded ACC model {acc_model.id} and {num_users} users")
+
+
+def get_benchmark_target():
+    "Return the latest ACC model, its capability assessment IDs and the user tokens"
+    with SessionLocal() as db_session:
+        acc_model = db_session.query(models.ACCModel).order_by(models.ACCModel.id.desc()).first()
+        if acc_model is None:
+            return None, [], []
+        assessment_ids = [
+            assessment_id for assessment_id, in db_session.query(models.CapabilityAssessment.id)
+            .join(models.Capability)
+            .join(models.Component)
+            .filter(models.Component.acc_model_id == acc_model.id)
+        ]
+        tokens = [
+            create_access_token(data={"sub": username})
+            for username, in db_session.query(models.User.username)
+            .filter(models.User.username.like(f"{USERNAME_PREFIX}%"))
+        ]
+        return acc_model.id, assessment_ids, tokens
+
+
+def start_server(async_database, port):
+    "Start uvicorn in a subprocess and wait until it answers"
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "ASYNC_DATABASE": "true" if async_database else "false"},
+    )
+    for _ in range(100):
+        if server.poll() is not None:
+            raise RuntimeError(f"The server exited with code {server.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1).raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("The server did not start")
+
+
+async def run_client(client, acc_model_id, assessment_ids, token, num_requests, results):
+    "Send a mix of matrix, aggregates and batch requests, recording their latencies"
+    headers = {"Authorization": f"Bearer {token}"}
+    for counter in range(num_requests):
+        kind = counter % 3
+        started = time.perf_counter()
+        try:
+            if kind == 0:
+                response = await client.get(
+                    f"/acc-models/{acc_model_id}/matrix",
+                    params={"include_aggregates": True, "include_ratings": True},
+                    headers=headers,
+                )
+            elif kind == 1:
+                response = await client.post(
+                    "/capability-assessments/aggregates", json=assessment_ids)
+            else:
+                response = await client.post(
+                    "/capability-assessments/batch/",
+                    json={"ratings": [
+                        {"capability_assessment_id": assessment_id,
+                         "rating": random.choice(RATINGS)}
+                        for assessment_id in random.sample(
+                            assessment_ids, min(10, len(assessment_ids)))
+                    ]},
+                    headers=headers,
+                )
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        results.append(((time.perf_counter() - started) * 1000, ok))
+
+
+async def run_load(port, clients, acc_model_id, assessment_ids, tokens, num_requests):
+    "Run the clients concurrently and return the results and the elapsed seconds"
+    results = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(client, acc_model_id, assessment_ids, tokens[counter % len(tokens)],
+                       num_requests, results)
+            for counter in range(clients)
+        ))
+        return results, time.perf_counter() - started
+
+
+def main():
+    "Parse the arguments, seed the database if asked and print the results of every run"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--seed", action="store_true", help="seed an ACC model and users first")
+    parser.add_argument("--users", type=int, default=200, help="users to seed")
+    parser.add_argument("--components", type=int, default=5, help="components to seed")
+    parser.add_argument("--capabilities", type=int, default=5,
+                        help="capabilities per component to seed")
+    parser.add_argument("--attributes", type=int, default=8, help="attributes to seed")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000],
+                        help="concurrent clients of every run")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--port", type=int, default=8100, help="port of the server")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.users, args.components, args.capabilities, args.attributes)
+    acc_model_id, assessment_ids, tokens = get_benchmark_target()
+    if not assessment_ids or not tokens:
+        parser.error("no ACC model or users to load, run the benchmark with --seed first")
+
+    print(f"{'stack':<6} {'clients':>7} {'requests':>8} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for async_database in (False, True):
+        server = start_server(async_database, args.port)
+        try:
+            for clients in args.clients:
+                results, elapsed = asyncio.run(run_load(
+                    args.port, clients, acc_model_id, assessment_ids, tokens, args.requests))
+                latencies = sorted(latency for latency, _ in results)
+                errors = sum(1 for _, ok in results if not ok)
+                print(f"{'async' if async_database else 'sync':<6} {clients:>7} "
+                      f"{len(results):>8} {len(results) / elapsed:>8.1f} "
+                      f"{statistics.median(latencies):>8.1f} "
+                      f"{latencies[max(0, int(len(latencies) * 0.95) - 1)]:>8.1f} {errors:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+In-process benchmark suite for the hot endpoints of the backend.
+
+Seeds a SQLite database per dataset size with scripts/generate_data.py, then drives
+the app of app/main.py through an ASGI client with concurrent requests to:
+- POST /capability-assessments/aggregates
+- POST /capability-assessments/ratings/batch/
+- POST /capability-assessments/batch/ (rating upserts)
+- POST /capability-assessments/historical-graph-data
+- GET /components/acc_model/{id} and /capabilities/component/{id}
+- POST /token
+
+and reports the p50/p95/p99 latencies and the throughput of every scenario. The
+results can be saved as a JSON baseline and later runs compared with it. The
+response cache is disabled unless --response-cache is given, so the listings
+measure the database path. Run it from the backend folder:
+
+    python benchmarks/endpoints.py --sizes small medium --save baseline.json
+    python benchmarks/endpoints.py --sizes small medium --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import httpx
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.database import get_db
+from app.main import app
+from app.response_cache import RESPONSE_CACHE
+from app.routers.security import create_access_token, get_read_db
+from app.user_cache import USER_CACHE
+from scripts.generate_data import generate
+
+DATASETS = {
+    "small": {"acc_models": 1, "components": 5, "capabilities": 5, "attributes": 5,
+              "users": 10, "density": 0.5, "edits": 3, "history_days": 30},
+    "medium": {"acc_models": 1, "components": 10, "capabilities": 10, "attributes": 10,
+               "users": 50, "density": 0.5, "edits": 5, "history_days": 90},
+    "large": {"acc_models": 1, "components": 20, "capabilities": 20, "attributes": 20,
+              "users": 100, "density": 0.5, "edits": 5, "history_days": 365},
+}
+SCENARIOS = ["aggregates", "ratings_batch", "batch_upsert", "historical_graph_data",
+             "component_listing", "capability_listing", "token"]
+PASSWORD = "benchmark-password"
+RATINGS = ["Stable", "Acceptable", "Low impact", "Critical Concern", "Not Applicable"]
+UPSERT_BATCH_SIZE = 50
+# Logins hash the password with bcrypt, so they are run fewer times
+TOKEN_REQUESTS = 20
+
+
+def seed_dataset(database_url, size):
+    "Create the tables and generate the dataset of the given size"
+    engine = create_engine(database_url)
+    models.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db_session:
+        generate(db_session, argparse.Namespace(
+            **DATASETS[size], password=PASSWORD, rollup=True, seed=1))
+    return engine, session_factory
+
+
+def get_targets(session_factory):
+    "Return the IDs and users the requests of the scenarios use"
+    with session_factory() as db_session:
+        acc_model = db_session.scalars(
+            select(models.ACCModel).order_by(models.ACCModel.id.desc())).first()
+        component_ids = [component.id for component in acc_model.components]
+        capability_ids = [
+            capability.id
+            for component in acc_model.components for capability in component.capabilities
+        ]
+        assessment_ids = list(db_session.scalars(
+            select(models.CapabilityAssessment.id)
+            .where(models.CapabilityAssessment.capability_id.in_(capability_ids))
+            .order_by(models.CapabilityAssessment.id)
+        ))
+        users = list(db_session.execute(
+            select(models.User.id, models.User.username).order_by(models.User.id)))
+    return {
+        "acc_model_id": acc_model.id,
+        "component_ids": component_ids,
+        "capability_ids": capability_ids,
+        "assessment_ids": assessment_ids,
+        "users": users,
+        "tokens": {username: create_access_token(data={"sub": username})
+                   for _, username in users},
+    }
+
+
+def build_scenarios(targets):
+    "Return the request factories of the scenarios, each taking a random generator"
+    assessment_ids = targets["assessment_ids"]
+    users = targets["users"]
+    now = datetime.now()
+
+    def auth(username):
+        return {"Authorization": f"Bearer {targets['tokens'][username]}"}
+
+    def aggregates(_):
+        return "POST", "/capability-assessments/aggregates", {"json": assessment_ids}
+
+    def ratings_batch(rng):
+        user_id, username = rng.choice(users)
+        return ("POST", f"/capability-assessments/ratings/batch/?user_id={user_id}",
+                {"json": assessment_ids, "headers": auth(username)})
+
+    def batch_upsert(rng):
+        _, username = rng.choice(users)
+        ratings = [
+            {"capability_assessment_id": assessment_id, "rating": rng.choice(RATINGS)}
+            for assessment_id in rng.sample(
+                assessment_ids, min(UPSERT_BATCH_SIZE, len(assessment_ids)))
+        ]
+        return ("POST", "/capability-assessments/batch/",
+                {"json": {"ratings": ratings}, "headers": auth(username)})
+
+    def historical_graph_data(_):
+        params = {"start_date": (now - timedelta(days=30)).isoformat(),
+                  "end_date": now.isoformat()}
+        return ("POST", "/capability-assessments/historical-graph-data",
+                {"json": assessment_ids, "params": params})
+
+    def component_listing(_):
+        return "GET", f"/components/acc_model/{targets['acc_model_id']}", {}
+
+    def capability_listing(rng):
+        return "GET", f"/capabilities/component/{rng.choice(targets['component_ids'])}", {}
+
+    def token(rng):
+        _, username = rng.choice(users)
+        return ("POST", "/token",
+                {"data": {"username": username, "password": PASSWORD}})
+
+    return {
+        "aggregates": aggregates,
+        "ratings_batch": ratings_batch,
+        "batch_upsert": batch_upsert,
+        "historical_graph_data": historical_graph_data,
+        "component_listing": component_listing,
+        "capability_listing": capability_listing,
+        "token": token,
+    }
+
+
+def percentile(sorted_values, quantile):
+    "Return the value at the given quantile of sorted values"
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * quantile))
+    return sorted_values[index]
+
+
+async def run_scenario(client, make_request, num_requests, concurrency, seed):
+    "Send the requests of a scenario with the given concurrency and summarize them"
+    rng = random.Random(seed)
+    requests = [make_request(rng) for _ in range(num_requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def send(method, url, kwargs):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    # Warm up the caches and the connection pool
+    await send(*requests[0])
+    latencies.clear()
+    errors = 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(*request) for request in requests))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": num_requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "throughput_rps": round(num_requests / elapsed, 1),
+    }
+
+
+async def run_dataset(session_factory, args):
+    "Run every selected scenario against a seeded dataset"
+    def get_session():
+        db_session = session_factory()
+        try:
+            yield db_session
+        finally:
+            db_session.close()
+
+    app.dependency_overrides[get_db] = get_session
+    app.dependency_overrides[get_read_db] = get_session
+    scenarios = build_scenarios(get_targets(session_factory))
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in args.scenarios:
+                USER_CACHE.clear()
+                RESPONSE_CACHE.clear()
+                num_requests = min(args.requests, TOKEN_REQUESTS) if name == "token" \
+                    else args.requests
+                results[name] = await run_scenario(
+                    client, scenarios[name], num_requests, args.concurrency, seed=1)
+                print_result(name, results[name])
+    finally:
+        app.dependency_overrides.clear()
+    return results
+
+
+def print_result(name, result, baseline=None):
+    "Print the summary of a scenario, with the change from its baseline if any"
+    line = (f"  {name:<24}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+            f"{result['p99_ms']:>9.1f}{result['throughput_rps']:>10.1f}{result['errors']:>8}")
+    if baseline:
+        changes = [
+            (result[key] - baseline[key]) / baseline[key] * 100 if baseline[key] else 0.0
+            for key in ("p50_ms", "p95_ms", "throughput_rps")
+        ]
+        line += "   p50 {:+.1f}%  p95 {:+.1f}%  rps {:+.1f}%".format(*changes) # pylint: disable=consider-using-f-string
+    print(line)
+
+
+def compare(results, baseline_path):
+    "Print every scenario next to its result in the baseline"
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    print(f"\nCompared with {baseline_path}:")
+    for size, scenarios in results.items():
+        print(f"{size}:")
+        for name, result in scenarios.items():
+            print_result(name, result, baseline.get(size, {}).get(name))
+
+
+def main():
+    "Seed the datasets, run the scenarios and save or compare the results"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(DATASETS), default=["small"],
+                        help="Dataset sizes to run the scenarios against")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS,
+                        help="Scenarios to run, all by default")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Requests in flight at the same time")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the response cache of the listings enabled")
+    parser.add_argument("--save", help="Save the results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Compare the results with this JSON baseline")
+    args = parser.parse_args()
+    # The app logs every request, which would be timed along with it
+    logging.disable(logging.INFO)
+    if not args.response_cache:
+        RESPONSE_CACHE.max_size = 0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(f"Seeding the {size} dataset")
+            engine, session_factory = seed_dataset(
+                f"sqlite:///{os.path.join(directory, size)}.db", size)
+            print(f"{size}:\n  {'scenario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                  f"{'req/s':>10}{'errors':>8}")
+            results[size] = asyncio.run(run_dataset(session_factory, args))
+            engine.dispose()
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as baseline_file:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "datasets": {size: DATASETS[size] for size in args.sizes},
+                "results": results,
+            }, baseline_file, indent=2)
+        print(f"Saved the results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
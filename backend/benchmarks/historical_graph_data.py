@@ -0,0 +1,164 @@
+"""
+Benchmark for the POST /capability-assessments/historical-graph-data endpoint.
+
+Seeds the database pointed to by DATABASE_URL with a large rating_history table and
+measures the latency of the endpoint in-process. Run it from the backend folder
+after applying the migrations:
+
+    python benchmarks/historical_graph_data.py --seed --rows 2000000
+    python benchmarks/historical_graph_data.py --requests 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert
+from app import models
+from app.database import SessionLocal, engine
+from app.main import app
+
+CHUNK_SIZE = 50000
+RATINGS = ["Stable", "Acceptable", "Low impact", "Critical Concern", "Not Applicable"]
+
+
+def seed(rows, num_users, num_capabilities, num_attributes, days):
+    "Create an ACC model, users and the given number of rating_history rows"
+    models.Base.metadata.create_all(engine)
+    with SessionLocal() as db_session:
+        acc_model = models.ACCModel(
+            name=f"Benchmark {datetime.now():%Y%m%d%H%M%S}",
+            description="Seeded by the historical graph data benchmark",
+        )
+        component = models.Component(name="Benchmark component", acc_model=acc_model)
+        attributes = [
+            models.Attribute(name=f"Benchmark attribute {acc_model.name} {counter}")
+            for counter in range(num_attributes)
+        ]
+        db_session.add_all([acc_model, component, *attributes])
+        for counter in range(num_capabilities):
+            capability = models.Capability(
+                name=f"Benchmark capability {counter}", component=component)
+            db_session.add(capability)
+            for attribute in attributes:
+                db_session.add(
+                    models.CapabilityAssessment(capability=capability, attribute=attribute))
+        users = [
+            models.User(
+                username=f"bench_{acc_model.name}_{counter}".replace(" ", "_"),
+                email=f"bench{counter}.{acc_model.name.split()[-1]}@example.com",
+                hashed_password="not-a-real-hash",
+            )
+            for counter in range(num_users)
+        ]
+        db_session.add_all(users)
+        db_session.commit()
+
+        assessment_ids = [
+            assessment.id
+            for capability in component.capabilities
+            for assessment in capability.assessments
+        ]
+        user_ids = [user.id for user in users]
+        first_day = datetime.now() - timedelta(days=days)
+        seconds = days * 24 * 60 * 60
+
+        for chunk_start in range(0, rows, CHUNK_SIZE):
+            db_session.execute(
+                insert(models.RatingHistory),
+                [
+                    {
+                        "rating": random.choice(RATINGS),
+                        "user_id": random.choice(user_ids),
+                        "capability_assessment_id": random.choice(assessment_ids),
+                        "change_timestamp": first_day
+                        + timedelta(seconds=random.randrange(seconds)),
+                    }
+                    for _ in range(min(CHUNK_SIZE, rows - chunk_start))
+                ],
+            )
+            db_session.commit()
+            print(f"Seeded {min(chunk_start + CHUNK_SIZE, rows)} of {rows} rows")
+    return assessment_ids
+
+
+def get_benchmark_assessment_ids(limit):
+    "Return the IDs of the capability assessments with the most rating history"
+    with SessionLocal() as db_session:
+        return [
+            assessment_id
+            for assessment_id, _ in db_session.query(
+                models.RatingHistory.capability_assessment_id,
+                func.count(models.RatingHistory.id),
+            )
+            .group_by(models.RatingHistory.capability_assessment_id)
+            .order_by(func.count(models.RatingHistory.id).desc())
+            .limit(limit)
+            .all()
+        ]
+
+
+def run_benchmark(assessment_ids, num_requests, days):
+    "Call the endpoint repeatedly and return the latencies in milliseconds"
+    latencies = []
+    with TestClient(app) as client:
+        for _ in range(num_requests):
+            start_date = datetime.now() - timedelta(days=random.randrange(1, days))
+            end_date = start_date + timedelta(days=random.randrange(1, 30))
+            started = time.perf_counter()
+            response = client.post(
+                "/capability-assessments/historical-graph-data",
+                params={"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+                json=assessment_ids,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def main():
+    "Parse the arguments, seed the database if asked and print the latencies"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--seed", action="store_true", help="seed rating_history first")
+    parser.add_argument("--rows", type=int, default=1000000, help="rows to seed")
+    parser.add_argument("--users", type=int, default=50, help="users to seed")
+    parser.add_argument("--capabilities", type=int, default=20, help="capabilities to seed")
+    parser.add_argument("--attributes", type=int, default=10, help="attributes to seed")
+    parser.add_argument("--days", type=int, default=365, help="days of history to seed")
+    parser.add_argument("--assessments", type=int, default=200,
+                        help="capability assessments per request")
+    parser.add_argument("--requests", type=int, default=20, help="requests to time")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.rows, args.users, args.capabilities, args.attributes, args.days)
+    # The routers log every request at INFO level, which would dominate the timings
+    logging.disable(logging.INFO)
+
+    assessment_ids = get_benchmark_assessment_ids(args.assessments)
+    if not assessment_ids:
+        parser.error("rating_history is empty, run the benchmark with --seed first")
+    with SessionLocal() as db_session:
+        history_rows = db_session.query(func.count(models.RatingHistory.id)).scalar()
+
+    latencies = sorted(run_benchmark(assessment_ids, args.requests, args.days))
+    print(f"rating_history rows: {history_rows}")
+    print(f"capability assessments per request: {len(assessment_ids)}")
+    print(f"requests: {len(latencies)}")
+    print(f"min: {latencies[0]:.1f} ms")
+    print(f"median: {statistics.median(latencies):.1f} ms")
+    print(f"p95: {latencies[max(0, int(len(latencies) * 0.95) - 1)]:.1f} ms")
+    print(f"max: {latencies[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Microbenchmark of the per-request overhead of the error mapping, logging and
+timing middlewares of app/main.py.
+
+Runs the app with three middleware stacks, all keeping the response cache, CORS
+and metrics middlewares:
+
+- none: without error mapping, logging and timing, as the floor
+- base_http: the error wrapper the app registered with @app.middleware("http")
+  before app/middleware.py, which runs on Starlette's BaseHTTPMiddleware
+- asgi: ErrorMappingMiddleware and RequestLoggingMiddleware, as the app runs now
+
+and sends the same requests one at a time to GET / and to
+POST /capability-assessments/aggregates for a seeded ACC model, alternating the
+stacks every round so that they share the same conditions. The logging of the
+app is disabled, so the log lines are not timed. Run it from the backend folder:
+
+    python benchmarks/middleware.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import httpx
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from app import models
+from app.database import get_db
+from app.main import app
+from app.middleware import ErrorMappingMiddleware, RequestLoggingMiddleware
+from app.routers.security import get_read_db
+from scripts.generate_data import generate
+
+ROUNDS = 10
+
+
+async def log_request_validation_error(request: Request, call_next):
+    "The error wrapper of app/main.py before the ASGI middlewares, for comparison"
+    try:
+        response = await call_next(request)
+        return response
+    except ValidationError as error:
+        logging.error("Validation error: %s", error.json())
+        return JSONResponse(status_code=422, content={"detail": error.errors()})
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logging.error("Unexpected error: %s", str(error))
+        return JSONResponse(
+            status_code=500, content={"detail": "Internal server error"}
+        )
+
+
+def get_middleware_stacks():
+    "Return the middlewares of the app for every stack compared"
+    others = [
+        middleware for middleware in app.user_middleware
+        if middleware.cls not in (ErrorMappingMiddleware, RequestLoggingMiddleware)
+    ]
+    return {
+        "none": others,
+        "base_http": [Middleware(BaseHTTPMiddleware, dispatch=log_request_validation_error),
+                      *others],
+        "asgi": list(app.user_middleware),
+    }
+
+
+def use_middleware_stack(middleware):
+    "Make the app build its middleware stack again from the given middlewares"
+    app.user_middleware = middleware
+    app.middleware_stack = None
+
+
+def seed_acc_model(database_url):
+    "Seed an ACC model with 100 capability assessments and return their IDs"
+    engine = create_engine(database_url)
+    models.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db_session:
+        generate(db_session, argparse.Namespace(
+            acc_models=1, components=5, capabilities=4, attributes=5, users=10,
+            density=0.5, edits=1, history_days=1, password="password",
+            rollup=False, seed=1))
+        assessment_ids = list(db_session.scalars(
+            select(models.CapabilityAssessment.id).order_by(models.CapabilityAssessment.id)))
+    return engine, session_factory, assessment_ids
+
+
+async def time_requests(client, request, num_requests):
+    "Send the request num_requests times in a row and return the latencies in µs"
+    method, url, kwargs = request
+    latencies = []
+    for _ in range(num_requests):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def run_endpoint(client, request, stacks, num_requests):
+    "Time the request with every stack, a share of the requests per round"
+    latencies = {name: [] for name in stacks}
+    per_round = max(1, num_requests // ROUNDS)
+    for name, middleware in stacks.items():
+        use_middleware_stack(middleware)
+        await time_requests(client, request, per_round)
+    for _ in range(ROUNDS):
+        for name, middleware in stacks.items():
+            use_middleware_stack(middleware)
+            latencies[name] += await time_requests(client, request, per_round)
+    return latencies
+
+
+def print_results(endpoint, latencies):
+    "Print the latencies of every stack and their overhead over the none stack"
+    floor = statistics.mean(latencies["none"])
+    print(f"{endpoint}:\n  {'stack':<12}{'mean µs':>10}{'p50 µs':>10}{'overhead µs':>14}")
+    for name, values in latencies.items():
+        mean = statistics.mean(values)
+        print(f"  {name:<12}{mean:>10.1f}{statistics.median(values):>10.1f}"
+              f"{mean - floor:>14.1f}")
+
+
+async def run(args, session_factory, assessment_ids):
+    "Time both endpoints with every stack"
+    def get_session():
+        db_session = session_factory()
+        try:
+            yield db_session
+        finally:
+            db_session.close()
+
+    stacks = get_middleware_stacks()
+    app.dependency_overrides[get_db] = get_session
+    app.dependency_overrides[get_read_db] = get_session
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for endpoint, request, num_requests in (
+                    ("GET /", ("GET", "/", {}), args.requests),
+                    ("POST /capability-assessments/aggregates",
+                     ("POST", "/capability-assessments/aggregates", {"json": assessment_ids}),
+                     args.aggregates_requests),
+            ):
+                print_results(endpoint, await run_endpoint(client, request, stacks, num_requests))
+    finally:
+        use_middleware_stack(stacks["asgi"])
+        app.dependency_overrides.clear()
+
+
+def main():
+    "Seed the database and time the middleware stacks"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Requests to GET / per stack")
+    parser.add_argument("--aggregates-requests", type=int, default=500,
+                        help="Requests to /capability-assessments/aggregates per stack")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine, session_factory, assessment_ids = seed_acc_model(
+            f"sqlite:///{os.path.join(directory, 'middleware.db')}")
+        logging.disable(logging.CRITICAL)
+        asyncio.run(run(args, session_factory, assessment_ids))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
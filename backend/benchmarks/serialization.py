@@ -0,0 +1,158 @@
+"""
+Benchmark of the CPU spent serializing a large /capability-assessments/ratings/batch/
+response.
+
+Seeds an in-memory SQLite database with one user rating every capability
+assessment of an ACC model, then times the endpoint and, separately, the ways of
+turning the same ORM rows into a JSON response:
+
+- response_model: returning the rows from an endpoint with a response_model, the
+  path the endpoint used before model_list_response
+- validated twice: validating the rows into schemas first, as the crud functions
+  do, then returning them from an endpoint with a response_model
+- model_list_response: validating and dumping the rows in a single pass
+- stdlib json: jsonable_encoder and json.dumps, for reference
+
+Run it from the backend folder:
+
+    python benchmarks/serialization.py --ratings 10000
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import models, schemas
+from app.crud import ratings as rating_crud
+from app.main import app
+from app.routers.security import get_read_db
+from app.serialization import model_list_response
+
+RATINGS = ["Stable", "Acceptable", "Low impact", "Critical Concern", "Not Applicable"]
+
+
+def seed(db_session, num_ratings):
+    "Create an ACC model with num_ratings capability assessments, all rated by one user"
+    user = models.User(username="bench", email="bench@example.com", hashed_password="x")
+    acc_model = models.ACCModel(name="Serialization benchmark")
+    component = models.Component(name="Component", acc_model=acc_model)
+    num_attributes = 100
+    attributes = [models.Attribute(name=f"Attribute {counter}") for counter in range(num_attributes)]
+    db_session.add_all([user, acc_model, component, *attributes])
+    assessments = []
+    for capability_counter in range(-(-num_ratings // num_attributes)):
+        capability = models.Capability(name=f"Capability {capability_counter}", component=component)
+        assessments.extend(
+            models.CapabilityAssessment(capability=capability, attribute=attribute)
+            for attribute in attributes
+        )
+    assessments = assessments[:num_ratings]
+    db_session.add_all(assessments)
+    db_session.flush()
+    db_session.add_all(
+        models.Rating(
+            capability_assessment_id=assessment.id,
+            user_id=user.id,
+            rating=RATINGS[counter % len(RATINGS)],
+            comments=f"Comment {counter}",
+        )
+        for counter, assessment in enumerate(assessments)
+    )
+    db_session.commit()
+    return user.id, [assessment.id for assessment in assessments]
+
+
+def build_serialization_app(rows):
+    "Return an app serving the same rows through each serialization path"
+    bench_app = FastAPI()
+
+    @bench_app.get("/response_model", response_model=List[schemas.RatingRead])
+    def response_model():
+        return rows
+
+    @bench_app.get("/validated_twice", response_model=List[schemas.RatingRead])
+    def validated_twice():
+        return [schemas.RatingRead.model_validate(row) for row in rows]
+
+    @bench_app.get("/model_list_response", response_model=List[schemas.RatingRead])
+    def single_pass():
+        return model_list_response(schemas.RatingRead, rows)
+
+    @bench_app.get("/stdlib_json")
+    def stdlib_json():
+        items = [schemas.RatingRead.model_validate(row) for row in rows]
+        return json.loads(json.dumps(jsonable_encoder(items)))
+
+    return bench_app
+
+
+def time_requests(send, repeat):
+    "Return the median CPU and wall milliseconds of the requests made by send"
+    cpu_times, wall_times = [], []
+    body = send()
+    for _ in range(repeat):
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        send()
+        cpu_times.append((time.process_time() - cpu_started) * 1000)
+        wall_times.append((time.perf_counter() - wall_started) * 1000)
+    return statistics.median(cpu_times), statistics.median(wall_times), len(body.content)
+
+
+def main():
+    "Seed the database and print the timings of every serialization path"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--ratings", type=int, default=10000,
+                        help="Number of ratings in the response")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="Number of timed requests per path")
+    args = parser.parse_args()
+    # The app logs every request, which would be timed along with the serialization
+    logging.disable(logging.INFO)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    db_session = sessionmaker(bind=engine)()
+    user_id, assessment_ids = seed(db_session, args.ratings)
+    rows = rating_crud.get_ratings_for_user_and_capability_assessments(
+        db_session, user_id=user_id, capability_assessment_ids=assessment_ids)
+
+    print(f"{'path':<36}{'cpu ms':>10}{'wall ms':>10}{'bytes':>12}")
+    with TestClient(build_serialization_app(rows)) as client:
+        for path in ("response_model", "validated_twice", "model_list_response", "stdlib_json"):
+            cpu_ms, wall_ms, size = time_requests(lambda path=path: client.get(f"/{path}"),
+                                                  args.repeat)
+            print(f"{path:<36}{cpu_ms:>10.1f}{wall_ms:>10.1f}{size:>12}")
+
+    app.dependency_overrides[get_read_db] = lambda: db_session
+    try:
+        with TestClient(app) as client:
+            cpu_ms, wall_ms, size = time_requests(
+                lambda: client.post(
+                    f"/capability-assessments/ratings/batch/?user_id={user_id}",
+                    json=assessment_ids,
+                ),
+                args.repeat,
+            )
+            print(f"{'POST ratings/batch/ (with query)':<36}{cpu_ms:>10.1f}{wall_ms:>10.1f}{size:>12}")
+    finally:
+        app.dependency_overrides.clear()
+        db_session.close()
+
+
+if __name__ == "__main__":
+    main()
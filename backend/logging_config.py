@@ -1,58 +1,199 @@
 """
 Logging configuration for the application.
+
+Records are put on a queue by the threads logging them and written to the console
+and the log file by a background listener thread, so requests never wait for the
+disk. The pipeline is configured from the environment:
+
+- LOG_LEVEL: level of the root logger (INFO)
+- LOG_LEVELS: levels of single loggers, e.g. "app.crud=DEBUG,sqlalchemy.engine=WARNING"
+- LOG_FORMAT: "text" or "json", one JSON object per line (text)
+- LOG_FILE: path of the log file, empty to only log to the console (app.log)
+- LOG_MAX_BYTES and LOG_BACKUP_COUNT: size at which the log file is rotated and
+  the number of rotated files kept (10 MB and 5)
+- LOG_MAX_ITEMS and LOG_MAX_MESSAGE_LENGTH: collections logged as arguments are cut
+  to their first LOG_MAX_ITEMS items and messages to LOG_MAX_MESSAGE_LENGTH
+  characters (20 and 2000)
 """
 
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "multipart=WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_FILE = os.getenv("LOG_FILE", os.path.join(BASE_DIR, "app.log"))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", "20"))
+LOG_MAX_MESSAGE_LENGTH = int(os.getenv("LOG_MAX_MESSAGE_LENGTH", "2000"))
+
+CONSOLE_FORMAT = (
+    "%(asctime)s loglevel=%(levelname)-6s "
+    "logger=%(name)s %(funcName)s() L%(lineno)-4d "
+    "%(message)s"
+)
+FILE_FORMAT = CONSOLE_FORMAT + "   call_trace=%(pathname)s L%(lineno)-4d"
+
+_listener = None
+
+
+def parse_log_levels(log_levels: str) -> Dict[str, str]:
+    """
+    Returns the levels of the loggers listed as "name=LEVEL" pairs separated by commas.
+    """
+    levels = {}
+    for pair in log_levels.split(","):
+        if "=" in pair:
+            name, level = pair.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class TruncatedCollection:
+    "Stands in for a large collection logged as an argument, showing its first items"
+
+    def __init__(self, collection, max_items: int):
+        self.type_name = type(collection).__name__
+        self.size = len(collection)
+        items = collection.items() if isinstance(collection, dict) else collection
+        self.first_items = [item for _, item in zip(range(max_items), items)]
+
+    def __repr__(self):
+        return f"<{self.type_name} of {self.size} items, first {self.first_items!r}>"
+
+    __str__ = __repr__
+
+
+def truncate_args(args, max_items: int):
+    """
+    Returns the arguments of a log record with the collections longer than
+    max_items replaced by a TruncatedCollection.
+    """
+    def truncate(arg):
+        if isinstance(arg, (list, tuple, set, frozenset, dict)) and len(arg) > max_items:
+            return TruncatedCollection(arg, max_items)
+        return arg
+
+    if isinstance(args, dict):
+        return {key: truncate(value) for key, value in args.items()}
+    return tuple(truncate(arg) for arg in args)
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Puts the records on the queue with their message rendered, after cutting
+    large collection arguments and long messages.
+    """
+
+    def __init__(self, log_queue, max_items: int, max_message_length: int):
+        super().__init__(log_queue)
+        self.max_items = max_items
+        self.max_message_length = max_message_length
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args:
+            record.args = truncate_args(record.args, self.max_items)
+        message = record.getMessage()
+        if len(message) > self.max_message_length:
+            message = (f"{message[:self.max_message_length]}... "
+                       f"[truncated {len(message) - self.max_message_length} characters]")
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = message
+        record.message = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    "Formats the records as one JSON object per line"
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def stop_logging():
+    """
+    Stops the listener thread after it wrote the records still on the queue.
+    """
+    global _listener  # pylint: disable=global-statement
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
 
 
 def setup_logging():
     """
-    Set up logging configuration - configures the root logger with console and file handlers,
-    sets their formatters, log levels, and adds them to the root logger.
+    Set up logging configuration - configures the root logger with a queue handler
+    whose listener thread writes the records to the console and the rotating log file,
+    and sets the levels of the root and the configured loggers.
     """
+    global _listener  # pylint: disable=global-statement
     try:
-        # Define the base directory and log file path
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        log_file_path = os.path.join(base_dir, "app.log")
+        stop_logging()
+
+        if LOG_FORMAT == "json":
+            console_formatter = file_formatter = JsonFormatter()
+        else:
+            console_formatter = logging.Formatter(CONSOLE_FORMAT)
+            file_formatter = logging.Formatter(FILE_FORMAT)
+
+        c_handler = logging.StreamHandler()
+        c_handler.setFormatter(console_formatter)
+        handlers = [c_handler]
+
+        if LOG_FILE:
+            f_handler = RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+            f_handler.setFormatter(file_formatter)
+            handlers.append(f_handler)
+
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, *handlers)
+        _listener.start()
 
         # Configure the root logger
         logger = logging.getLogger()
-        logger.setLevel(logging.DEBUG)
-
+        logger.setLevel(LOG_LEVEL)
         if logger.hasHandlers():
             logger.handlers.clear()
+        logger.addHandler(
+            TruncatingQueueHandler(log_queue, LOG_MAX_ITEMS, LOG_MAX_MESSAGE_LENGTH))
 
-        # Create console handler with a normal formatter
-        c_handler = logging.StreamHandler()
-        console_format = (
-            "%(asctime)s loglevel=%(levelname)-6s "
-            "logger=%(name)s %(funcName)s() L%(lineno)-4d "
-            "%(message)s"
-        )
-        c_format = logging.Formatter(console_format)
-        c_handler.setFormatter(c_format)
-        c_handler.setLevel(logging.DEBUG)
-
-        # Create file handler with a detailed formatter
-        f_handler = logging.FileHandler(log_file_path)
-        log_format = (
-            "%(asctime)s loglevel=%(levelname)-6s "
-            "logger=%(name)s %(funcName)s() L%(lineno)-4d "
-            "%(message)s   call_trace=%(pathname)s L%(lineno)-4d"
-        )
-        f_format = logging.Formatter(log_format)
-        f_handler.setFormatter(f_format)
-        f_handler.setLevel(logging.DEBUG)
-
-        # Add handlers to the root logger
-        logger.addHandler(c_handler)
-        logger.addHandler(f_handler)
-
-        # Suppress debug logs from the multipart library
-        logging.getLogger("multipart").setLevel(logging.WARNING)
+        for name, level in parse_log_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
 
         return logger
     except Exception as error:
         print(f"Failed to configure logging: {error}")
-        raise
\ No newline at end of file
+        raise
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,254 @@
+"""
+Generates a large synthetic dataset for scale testing, writing straight to the
+database pointed to by DATABASE_URL with bulk inserts.
+
+Every run adds its ACC models, components, capabilities, capability assessments and
+users next to the existing data. Each user rates a share of the capability
+assessments given by --density, and every rating has a history of --edits changes
+spread over the last --history-days days, its final value being the last change.
+The rating stats are rebuilt afterwards. Run it from the backend folder after
+applying the migrations:
+
+    python scripts/generate_data.py
+    python scripts/generate_data.py --acc-models 2 --components 50 --capabilities 20 \\
+        --attributes 20 --users 250 --density 0.5 --edits 10 --history-days 365
+
+The second command writes about 500k ratings and 5M rating_history rows. The
+generated users log in with the password given by --password.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from sqlalchemy import func, select, text
+from app import models
+from app.crud import ratings as rating_crud
+from app.crud import snapshots as snapshot_crud
+from app.database import SessionLocal
+from app.constants import RATING_MAPPING
+from app.routers.capabilities_assessments import get_rating_label
+from app.routers.security import get_password_hash
+
+RATINGS = list(RATING_MAPPING)
+CHUNK_SIZE = 10000
+
+
+def get_next_id(db_session, model) -> int:
+    "Return the first free primary key of the table of a model"
+    return (db_session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def insert_rows(db_session, model, rows) -> int:
+    "Insert the rows in chunks of CHUNK_SIZE, committing each, and return their count"
+    table = model.__table__
+    started = time.perf_counter()
+    inserted = 0
+    rows = iter(rows)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        db_session.execute(table.insert(), chunk)
+        db_session.commit()
+        inserted += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {inserted} rows into {table.name} in {elapsed:.1f}s "
+          f"({inserted / max(elapsed, 1e-9):.0f} rows/s)")
+    return inserted
+
+
+def reset_sequences(db_session, *tables):
+    "Move the Postgres id sequences past the ids written explicitly"
+    if db_session.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db_session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+    db_session.commit()
+
+
+def generate_ratings(args, rng, user_ids, assessment_ids, first_rating_id, first_history_id):  # pylint: disable=too-many-arguments
+    """
+    Yields the ratings and their history rows, as ("rating", row) and
+    ("history", row) pairs, for a share of args.density of every user's assessments.
+    """
+    now = datetime.now().replace(microsecond=0)
+    history_seconds = args.history_days * 24 * 3600
+    rating_id, history_id = first_rating_id, first_history_id
+    for user_id in user_ids:
+        for assessment_id in assessment_ids:
+            if rng.random() >= args.density:
+                continue
+            offsets = sorted(rng.randrange(history_seconds) for _ in range(args.edits))
+            for offset in reversed(offsets):
+                value = rng.choice(RATINGS)
+                yield "history", {
+                    "id": history_id,
+                    "rating": value,
+                    "comments": None,
+                    "user_id": user_id,
+                    "capability_assessment_id": assessment_id,
+                    "change_timestamp": now - timedelta(seconds=offset),
+                }
+                history_id += 1
+            yield "rating", {
+                "id": rating_id,
+                "rating": value,
+                "comments": None,
+                "user_id": user_id,
+                "capability_assessment_id": assessment_id,
+                "timestamp": now - timedelta(seconds=offsets[0]),
+            }
+            rating_id += 1
+
+
+def insert_ratings(db_session, rating_rows):
+    "Insert the ratings and history rows yielded by generate_ratings"
+    started = time.perf_counter()
+    counts = {"rating": 0, "history": 0}
+    chunks = {"rating": [], "history": []}
+    tables = {"rating": models.Rating.__table__, "history": models.RatingHistory.__table__}
+    for kind, row in rating_rows:
+        chunk = chunks[kind]
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            db_session.execute(tables[kind].insert(), chunk)
+            db_session.commit()
+            counts[kind] += len(chunk)
+            chunk.clear()
+    for kind, chunk in chunks.items():
+        if chunk:
+            db_session.execute(tables[kind].insert(), chunk)
+            counts[kind] += len(chunk)
+    db_session.commit()
+    elapsed = time.perf_counter() - started
+    total = counts["rating"] + counts["history"]
+    print(f"Inserted {counts['rating']} ratings and {counts['history']} rating_history rows "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+def generate(db_session, args):  # pylint: disable=too-many-locals
+    "Write the ACC models, users and ratings described by the arguments"
+    rng = random.Random(args.seed)
+    run_tag = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    first_acc_model_id = get_next_id(db_session, models.ACCModel)
+    acc_model_ids = list(range(first_acc_model_id, first_acc_model_id + args.acc_models))
+    insert_rows(db_session, models.ACCModel, (
+        {"id": acc_model_id, "name": f"Generated model {run_tag} {counter}",
+         "description": "Generated for scale testing",
+         "created_at": datetime.now(), "updated_at": datetime.now()}
+        for counter, acc_model_id in enumerate(acc_model_ids)
+    ))
+
+    first_attribute_id = get_next_id(db_session, models.Attribute)
+    attribute_ids = list(range(first_attribute_id, first_attribute_id + args.attributes))
+    insert_rows(db_session, models.Attribute, (
+        {"id": attribute_id, "name": f"Generated attribute {run_tag} {counter}"}
+        for counter, attribute_id in enumerate(attribute_ids)
+    ))
+
+    next_component_id = get_next_id(db_session, models.Component)
+    components = []
+    for acc_model_id in acc_model_ids:
+        for counter in range(args.components):
+            components.append({"id": next_component_id, "acc_model_id": acc_model_id,
+                               "name": f"Component {counter}"})
+            next_component_id += 1
+    insert_rows(db_session, models.Component, components)
+
+    next_capability_id = get_next_id(db_session, models.Capability)
+    capabilities = []
+    for component in components:
+        for counter in range(args.capabilities):
+            capabilities.append({"id": next_capability_id, "component_id": component["id"],
+                                 "name": f"Capability {component['name']}-{counter}"})
+            next_capability_id += 1
+    insert_rows(db_session, models.Capability, capabilities)
+
+    first_assessment_id = get_next_id(db_session, models.CapabilityAssessment)
+    assessment_ids = list(range(
+        first_assessment_id, first_assessment_id + len(capabilities) * len(attribute_ids)))
+    insert_rows(db_session, models.CapabilityAssessment, (
+        {"id": assessment_id, "capability_id": capability["id"], "attribute_id": attribute_id}
+        for assessment_id, (capability, attribute_id) in zip(
+            assessment_ids,
+            ((capability, attribute_id)
+             for capability in capabilities for attribute_id in attribute_ids),
+        )
+    ))
+
+    hashed_password = get_password_hash(args.password)
+    first_user_id = get_next_id(db_session, models.User)
+    user_ids = list(range(first_user_id, first_user_id + args.users))
+    insert_rows(db_session, models.User, (
+        {"id": user_id, "username": f"gen_{run_tag}_{counter}",
+         "email": f"gen_{run_tag}_{counter}@example.com", "hashed_password": hashed_password}
+        for counter, user_id in enumerate(user_ids)
+    ))
+
+    insert_ratings(db_session, generate_ratings(
+        args, rng, user_ids, assessment_ids,
+        get_next_id(db_session, models.Rating), get_next_id(db_session, models.RatingHistory),
+    ))
+
+    reset_sequences(db_session, "acc_models", "attributes", "components", "capabilities",
+                    "capability_assessments", "users", "ratings", "rating_history")
+
+    started = time.perf_counter()
+    rebuilt = rating_crud.rebuild_rating_stats(db_session)
+    print(f"Rebuilt the rating stats of {rebuilt} capability assessments "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    if args.rollup:
+        started = time.perf_counter()
+        assessment_ids = snapshot_crud.rollup_daily_assessment_snapshots(
+            db_session, RATING_MAPPING, get_rating_label)
+        print(f"Rolled up the snapshots of {len(assessment_ids)} capability assessments "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    print(f"Generated ACC models {acc_model_ids} with users gen_{run_tag}_0 "
+          f"to gen_{run_tag}_{args.users - 1}")
+
+
+def main():
+    "Parse the size of the dataset and generate it"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--acc-models", type=int, default=1, help="Number of ACC models")
+    parser.add_argument("--components", type=int, default=10,
+                        help="Components per ACC model")
+    parser.add_argument("--capabilities", type=int, default=10,
+                        help="Capabilities per component")
+    parser.add_argument("--attributes", type=int, default=10,
+                        help="Attributes, each assessed for every capability")
+    parser.add_argument("--users", type=int, default=20, help="Number of users rating")
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="Share of the capability assessments each user rates")
+    parser.add_argument("--edits", type=int, default=3,
+                        help="Rating history rows per rating")
+    parser.add_argument("--history-days", type=int, default=30,
+                        help="Number of days the rating history is spread over")
+    parser.add_argument("--password", default="password",
+                        help="Password of the generated users")
+    parser.add_argument("--rollup", action="store_true",
+                        help="Roll the rating history up into the daily snapshots")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random generator")
+    args = parser.parse_args()
+    if args.edits < 1:
+        parser.error("--edits must be at least 1")
+    if args.history_days < 1:
+        parser.error("--history-days must be at least 1")
+
+    with SessionLocal() as db_session:
+        generate(db_session, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Rebuilds and verifies the assessment_rating_stats table from the ratings table.
+
+The stats are kept up to date by every rating change. Use this script to backfill
+them, or to check them after changing ratings outside of the API. Run it from the
+backend folder:
+
+    python scripts/rebuild_rating_stats.py
+    python scripts/rebuild_rating_stats.py --verify-only
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from app.crud import ratings as rating_crud
+from app.database import SessionLocal
+
+
+def main():
+    "Rebuild the rating stats unless asked only to verify them, then verify them"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--verify-only", action="store_true",
+                        help="only compare the stats with the ratings table")
+    args = parser.parse_args()
+
+    with SessionLocal() as db_session:
+        if not args.verify_only:
+            rebuilt = rating_crud.rebuild_rating_stats(db_session)
+            print(f"Rebuilt the rating stats of {rebuilt} capability assessments")
+
+        mismatches = rating_crud.verify_rating_stats(db_session)
+    if mismatches:
+        print(f"Rating stats do not match the ratings of capability assessments: {mismatches}")
+        sys.exit(1)
+    print("Rating stats match the ratings table")
+
+
+if __name__ == "__main__":
+    main()
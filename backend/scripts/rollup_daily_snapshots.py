@@ -0,0 +1,40 @@
+"""
+Rolls up the rating history into the daily_assessment_snapshot table.
+
+Only the capability assessments with rating history added since the last run are
+processed, so the script can run as often as needed, e.g. every few minutes from cron.
+The historical endpoints read the snapshots up to the first change of each assessment
+that is not rolled up yet. Run it from the backend folder:
+
+    python scripts/rollup_daily_snapshots.py
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from app.crud import snapshots as snapshot_crud
+from app.database import SessionLocal
+from app.constants import RATING_MAPPING
+from app.routers.capabilities_assessments import get_rating_label
+
+
+def main():
+    "Roll up the capability assessments with new rating history"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.parse_args()
+
+    with SessionLocal() as db_session:
+        assessment_ids = snapshot_crud.rollup_daily_assessment_snapshots(
+            db_session, RATING_MAPPING, get_rating_label)
+    if assessment_ids:
+        print(f"Rolled up the snapshots of {len(assessment_ids)} capability assessments")
+    else:
+        print("The daily snapshots are up to date")
+
+
+if __name__ == "__main__":
+    main()
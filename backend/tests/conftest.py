@@ -0,0 +1,159 @@
+"""
+Pytest configuration and shared fixtures for the backend tests.
+
+The tests run the FastAPI app in-process against an in-memory SQLite database,
+so they do not need a running server or a Postgres instance.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "backend-tests-secret-key-0123456789abcdef")
+
+# pylint: disable=wrong-import-position
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import database, models
+from app.database import get_db
+from app.main import app
+from app.routers.security import create_access_token, get_read_db
+from app.response_cache import RESPONSE_CACHE
+from app.user_cache import USER_CACHE
+
+
+class QueryCounter:
+    "Counts the SQL statements sent to the database while it is active"
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany): # pylint: disable=too-many-arguments
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        "Number of statements counted so far"
+        return len(self.statements)
+
+    def reset(self):
+        "Forget the statements counted so far"
+        self.statements.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    "Start every test without the users and responses cached by the previous ones"
+    USER_CACHE.clear()
+    RESPONSE_CACHE.clear()
+    yield
+    USER_CACHE.clear()
+    RESPONSE_CACHE.clear()
+
+
+@pytest.fixture
+def db_engine():
+    "Return an engine bound to a fresh in-memory SQLite database"
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    models.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):  # pylint: disable=redefined-outer-name
+    "Return a database session bound to the test engine"
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine, db_session, monkeypatch):  # pylint: disable=redefined-outer-name
+    "Return a test client whose requests and user lookups use the test database"
+    monkeypatch.setattr(database, "SessionLocal",
+                        sessionmaker(autocommit=False, autoflush=False, bind=db_engine))
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_read_db] = lambda: db_session
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_counter(db_engine):  # pylint: disable=redefined-outer-name
+    "Count the SQL statements executed against the test engine"
+    counter = QueryCounter()
+    event.listen(db_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(db_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def query_budget(query_counter):  # pylint: disable=redefined-outer-name
+    """
+    Return a context manager failing the test when the statements run in its
+    block exceed the given budget, listing them in the failure.
+    """
+    @contextmanager
+    def check_budget(max_statements):
+        query_counter.reset()
+        yield query_counter
+        assert query_counter.count <= max_statements, (
+            f"{query_counter.count} statements ran, over the budget of {max_statements}:\n"
+            + "\n".join(query_counter.statements)
+        )
+
+    return check_budget
+
+
+@pytest.fixture
+def test_user(db_session):  # pylint: disable=redefined-outer-name
+    "Create a user to authenticate the requests with"
+    user = models.User(
+        username="tester", email="tester@example.com", hashed_password="not-a-real-hash"
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(test_user):  # pylint: disable=redefined-outer-name
+    "Return the authorization headers for the test user"
+    token = create_access_token(data={"sub": test_user.username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_acc_model(db_session, num_components=3, num_capabilities=3, num_attributes=3):  # pylint: disable=redefined-outer-name
+    "Create an ACC model with the given number of components, capabilities and attributes"
+    acc_model = models.ACCModel(name="Newsletter App", description="Seeded ACC model")
+    db_session.add(acc_model)
+    attributes = [
+        models.Attribute(name=f"Attribute {counter}") for counter in range(num_attributes)
+    ]
+    db_session.add_all(attributes)
+    for component_counter in range(num_components):
+        component = models.Component(name=f"Component {component_counter}", acc_model=acc_model)
+        db_session.add(component)
+        for capability_counter in range(num_capabilities):
+            capability = models.Capability(
+                name=f"Capability {component_counter}-{capability_counter}",
+                component=component,
+            )
+            db_session.add(capability)
+            for attribute in attributes:
+                db_session.add(
+                    models.CapabilityAssessment(capability=capability, attribute=attribute)
+                )
+    db_session.commit()
+    return acc_model
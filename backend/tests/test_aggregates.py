@@ -0,0 +1,69 @@
+"""
+Tests for the grouped aggregates of POST /capability-assessments/aggregates.
+"""
+
+import random
+from statistics import mean
+from app import models, schemas
+from app.crud import ratings as rating_crud
+from app.constants import RATING_MAPPING
+from app.routers.capabilities_assessments import get_rating_label
+from conftest import seed_acc_model
+
+
+def compute_aggregate(ratings):
+    "Average the ratings of one assessment the way the per-assessment endpoint did"
+    if not ratings:
+        return {"average_rating": None}
+    numeric_ratings = [RATING_MAPPING[rating] for rating in ratings if RATING_MAPPING[rating] > 0]
+    average_rating = mean(numeric_ratings) if numeric_ratings else None
+    return {"average_rating": average_rating, "rating_label": get_rating_label(average_rating)}
+
+
+def test_grouped_aggregates_match_per_assessment_averages(client, db_session):
+    "Mixed ratings, Not Applicable only and unrated assessments average as one by one"
+    acc_model = seed_acc_model(db_session, num_components=2, num_capabilities=2, num_attributes=3)
+    assessment_ids = sorted(
+        assessment.id
+        for component in acc_model.components
+        for capability in component.capabilities
+        for assessment in capability.assessments
+    )
+    users = [
+        models.User(username=f"rater{counter}", email=f"rater{counter}@example.com",
+                    hashed_password="not-a-real-hash")
+        for counter in range(4)
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+
+    rng = random.Random(1)
+    labels = list(RATING_MAPPING)
+    ratings = {assessment_id: [] for assessment_id in assessment_ids}
+    # The first assessment stays unrated and the second is only rated Not Applicable
+    ratings[assessment_ids[1]] = ["Not Applicable", "Not Applicable"]
+    for assessment_id in assessment_ids[2:]:
+        ratings[assessment_id] = [rng.choice(labels) for _ in users[:rng.randint(1, len(users))]]
+    ratings[assessment_ids[2]] = ["Stable", "Not Applicable", "Critical Concern"]
+    for assessment_id, labels_given in ratings.items():
+        for user, label in zip(users, labels_given):
+            rating_crud.create_rating(
+                db_session,
+                schemas.RatingCreate(capability_assessment_id=assessment_id, rating=label),
+                user.id,
+            )
+
+    response = client.post("/capability-assessments/aggregates", json=assessment_ids)
+
+    assert response.status_code == 200
+    expected = [
+        {"capability_assessment_id": assessment_id, **compute_aggregate(ratings[assessment_id])}
+        for assessment_id in assessment_ids
+    ]
+    assert response.json() == expected
+    assert expected[1] == {"capability_assessment_id": assessment_ids[1],
+                           "average_rating": None, "rating_label": None}
+    assert expected[2]["average_rating"] == 2.5
+    for assessment_id, aggregate in zip(assessment_ids, expected):
+        single = client.get(f"/capability-assessments/{assessment_id}/aggregate").json()
+        assert single["average_rating"] == aggregate["average_rating"]
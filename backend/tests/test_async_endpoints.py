@@ -0,0 +1,130 @@
+"""
+Tests for the async routers served when the app runs with ASYNC_DATABASE=true.
+
+The async endpoints run against an aiosqlite engine on a SQLite file shared with a
+sync engine, and must answer like their sync versions.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app import models
+from app.database import get_async_db
+from app.routers import acc_models, async_acc_models, async_capabilities_assessments
+from app.routers.capabilities_assessments import get_ratings_aggregates
+from conftest import seed_acc_model
+
+
+@pytest.fixture
+def file_session(tmp_path):
+    "Return a sync session on a SQLite file that the async engine also opens"
+    database_path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{database_path}")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.info["database_path"] = database_path
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def async_client(file_session):  # pylint: disable=redefined-outer-name
+    "Return a test client for an app serving only the async routers"
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{file_session.info['database_path']}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_async_db():
+        async with async_session() as database_session:
+            yield database_session
+
+    async_app = FastAPI()
+    async_app.include_router(async_acc_models.router)
+    async_app.include_router(async_capabilities_assessments.router)
+    async_app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def file_user(file_session):  # pylint: disable=redefined-outer-name
+    "Create a user to authenticate the requests with"
+    user = models.User(
+        username="tester", email="tester@example.com", hashed_password="not-a-real-hash"
+    )
+    file_session.add(user)
+    file_session.commit()
+    return user
+
+
+def test_async_batch_upsert_matches_sync_aggregates(
+        async_client, file_session, file_user, auth_headers):  # pylint: disable=redefined-outer-name,unused-argument
+    "Async upserts write ratings, history and stats that the sync aggregates read"
+    seed_acc_model(file_session, num_components=1, num_capabilities=1, num_attributes=3)
+    first_id, second_id, third_id = [
+        assessment.id for assessment in
+        file_session.query(models.CapabilityAssessment).order_by(models.CapabilityAssessment.id)
+    ]
+
+    response = async_client.post(
+        "/capability-assessments/batch/",
+        json={"ratings": [
+            {"capability_assessment_id": first_id, "rating": "Stable"},
+            {"capability_assessment_id": second_id, "rating": "Low impact"},
+            {"capability_assessment_id": 9999, "rating": "Stable"},
+        ]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["errors"] == {"9999": "Capability Assessment not found"}
+
+    response = async_client.post(
+        f"/capability-assessments/{first_id}/",
+        json={"capability_assessment_id": first_id, "rating": "Acceptable"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["rating"] == "Acceptable"
+
+    file_session.expire_all()
+    assert file_session.query(models.Rating).count() == 2
+    assert file_session.query(models.RatingHistory).count() == 3
+
+    ids = [first_id, second_id, third_id]
+    response = async_client.post("/capability-assessments/aggregates", json=ids)
+    assert response.status_code == 200
+    assert response.json() == get_ratings_aggregates(file_session, ids)
+
+    response = async_client.get(f"/capability-assessments/{first_id}/aggregate")
+    assert response.json() == {"capability_assessment_id": first_id, "average_rating": 3.0}
+
+
+def test_async_matrix_matches_sync_matrix(
+        async_client, file_session, file_user, auth_headers):  # pylint: disable=redefined-outer-name
+    "The async matrix endpoint returns the same matrix as the sync one"
+    acc_model = seed_acc_model(file_session, num_components=2, num_capabilities=2, num_attributes=2)
+    assessment = file_session.query(models.CapabilityAssessment).first()
+    file_session.add(models.Rating(
+        rating="Stable", user_id=file_user.id, capability_assessment_id=assessment.id))
+    file_session.commit()
+
+    response = async_client.get(
+        f"/acc-models/{acc_model.id}/matrix",
+        params={"include_aggregates": True, "include_ratings": True},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    sync_matrix = acc_models.read_acc_model_matrix(
+        acc_model.id, include_aggregates=True, include_ratings=True,
+        db_session=file_session, current_user=file_user)
+    sync_body = acc_models.schemas.ACCModelMatrix.model_validate(
+        sync_matrix, from_attributes=True).model_dump(mode="json")
+    assert response.json() == sync_body
+
+    assert async_client.get("/acc-models/9999/matrix").status_code == 404
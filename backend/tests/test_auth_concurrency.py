@@ -0,0 +1,72 @@
+"""
+Tests that logging in does not block the event loop for the other requests.
+"""
+
+import asyncio
+import time
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.database import get_db
+from app.main import app
+from app.routers.security import get_password_hash, verify_password
+
+PASSWORD = "correct horse battery staple"
+LOGINS = 6
+PROBE_INTERVAL = 0.01
+
+
+@pytest.fixture
+def session_per_request(db_engine):
+    "Give every request its own session on the test engine, like get_db does"
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def get_test_db():
+        database_session = session_factory()
+        try:
+            yield database_session
+        finally:
+            database_session.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield session_factory
+    app.dependency_overrides.clear()
+
+
+async def login_burst_with_probes():
+    "Send a burst of logins and probe the root endpoint until they are all answered"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        logins = [
+            asyncio.create_task(client.post(
+                "/token", data={"username": "hasher", "password": PASSWORD}))
+            for _ in range(LOGINS)
+        ]
+        probe_latencies = []
+        while not all(login.done() for login in logins):
+            # The sleep is timed too, as a blocked loop would not wake up from it on time
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            response = await client.get("/")
+            probe_latencies.append(time.perf_counter() - started - PROBE_INTERVAL)
+            assert response.status_code == 200
+        return [login.result() for login in logins], probe_latencies
+
+
+def test_login_burst_does_not_stall_other_requests(session_per_request):  # pylint: disable=redefined-outer-name
+    "Requests served during a burst of logins wait far less than one bcrypt verification"
+    hashed_password = get_password_hash(PASSWORD)
+    with session_per_request() as db_session:
+        db_session.add(models.User(
+            username="hasher", email="hasher@example.com", hashed_password=hashed_password))
+        db_session.commit()
+    started = time.perf_counter()
+    verify_password(PASSWORD, hashed_password)
+    verify_seconds = time.perf_counter() - started
+
+    login_responses, probe_latencies = asyncio.run(login_burst_with_probes())
+
+    assert [response.status_code for response in login_responses] == [200] * LOGINS
+    assert len(probe_latencies) > 1
+    assert max(probe_latencies) < verify_seconds / 2
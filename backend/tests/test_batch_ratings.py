@@ -0,0 +1,82 @@
+"""
+Tests for the POST /capability-assessments/batch/ endpoint.
+"""
+
+import pytest
+from app import models
+from conftest import seed_acc_model
+
+
+def get_assessment_ids(db_session):
+    "Return the IDs of all capability assessments"
+    return [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+
+
+def test_batch_creates_updates_and_reports_missing_ids(
+        client, db_session, test_user, auth_headers):
+    "New ratings are created, existing ones updated and unknown IDs reported"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=3)
+    first_id, second_id, third_id = get_assessment_ids(db_session)
+    db_session.add(models.Rating(
+        rating="Stable", user_id=test_user.id, capability_assessment_id=first_id))
+    db_session.commit()
+
+    response = client.post(
+        "/capability-assessments/batch/",
+        json={"ratings": [
+            {"capability_assessment_id": first_id, "rating": "Acceptable"},
+            {"capability_assessment_id": second_id, "rating": "Low impact"},
+            {"capability_assessment_id": 9999, "rating": "Stable"},
+            {"capability_assessment_id": third_id, "rating": "Critical Concern"},
+        ]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [
+        (rating["capability_assessment_id"], rating["rating"]) for rating in body["ratings"]
+    ] == [(first_id, "Acceptable"), (second_id, "Low impact"), (third_id, "Critical Concern")]
+    assert body["errors"] == {"9999": "Capability Assessment not found"}
+
+    ratings = db_session.query(models.Rating).filter_by(user_id=test_user.id).all()
+    assert len(ratings) == 3
+    history = db_session.query(models.RatingHistory).order_by(models.RatingHistory.id).all()
+    assert [(entry.capability_assessment_id, entry.rating) for entry in history] == [
+        (first_id, "Stable"), (second_id, "Low impact"), (third_id, "Critical Concern")
+    ]
+
+
+@pytest.mark.parametrize("num_attributes", [2, 20])
+def test_batch_query_count_is_constant(
+        client, db_session, query_counter, test_user, auth_headers, num_attributes):
+    "A batch runs the same number of statements however many ratings it holds"
+    seed_acc_model(
+        db_session, num_components=1, num_capabilities=1, num_attributes=num_attributes)
+    assessment_ids = get_assessment_ids(db_session)
+    # Half of the ratings already exist and will be updated
+    for assessment_id in assessment_ids[::2]:
+        db_session.add(models.Rating(
+            rating="Stable", user_id=test_user.id, capability_assessment_id=assessment_id))
+    db_session.commit()
+    query_counter.reset()
+
+    response = client.post(
+        "/capability-assessments/batch/",
+        json={"ratings": [
+            {"capability_assessment_id": assessment_id, "rating": "Acceptable"}
+            for assessment_id in assessment_ids
+        ]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["ratings"]) == num_attributes
+    # user lookup, assessment lookup, existing ratings lookup,
+    # rating inserts, history inserts, rating updates and rating stats upsert
+    assert query_counter.count == 7
@@ -0,0 +1,128 @@
+"""
+Tests for the daily_assessment_snapshot rollup and the historical endpoints reading it.
+"""
+
+from datetime import datetime
+from app import models, schemas
+from app.crud import ratings as rating_crud
+from app.crud import snapshots as snapshot_crud
+from app.constants import RATING_MAPPING
+from app.routers.capabilities_assessments import get_rating_label
+from conftest import seed_acc_model
+
+GRAPH_PARAMS = {"start_date": "2024-03-01T10:00:00", "end_date": "2024-03-02T10:00:00"}
+TIME_SERIES_DATES = ["2024-02-28T00:00:00", "2024-03-01T12:00:00", "2024-03-02T10:00:00",
+                     "2024-03-05T00:00:00"]
+
+
+def add_rating(db_session, user_id, assessment_id, rating, timestamp):
+    "Create or update a rating of a user at the given time"
+    rating_crud.upsert_ratings_for_user(db_session, [schemas.RatingCreate(
+        capability_assessment_id=assessment_id, rating=rating, timestamp=timestamp)], user_id)
+
+
+def seed_snapshot_ratings(db_session, test_user):
+    "Seed two assessments rated by two users over two days, returning their IDs and users"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    first_id, second_id = [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+    other_user = models.User(
+        username="other", email="other@example.com", hashed_password="not-a-real-hash")
+    db_session.add(other_user)
+    db_session.commit()
+    add_rating(db_session, test_user.id, first_id, "Stable", datetime(2024, 3, 1, 9))
+    add_rating(db_session, other_user.id, first_id, "Low impact", datetime(2024, 3, 1, 11))
+    add_rating(db_session, other_user.id, second_id, "Not Applicable", datetime(2024, 3, 2, 8))
+    return first_id, second_id, other_user
+
+
+def get_historical_responses(client, assessment_ids):
+    "Fetch the historical endpoints on the day, as of and time series modes"
+    return [
+        client.post("/capability-assessments/historical-graph-data",
+                    params=GRAPH_PARAMS, json=assessment_ids).json(),
+        client.post("/capability-assessments/historical-graph-data",
+                    params={**GRAPH_PARAMS, "as_of": True}, json=assessment_ids).json(),
+        client.post("/capability-assessments/historical-time-series",
+                    json={"capability_assessment_ids": assessment_ids,
+                          "dates": TIME_SERIES_DATES}).json(),
+    ]
+
+
+def test_rollup_processes_only_new_assessments_and_matches_raw_history(
+        client, db_session, test_user):
+    "The endpoints return the same data from the snapshots as from the rating history"
+    first_id, second_id, _ = seed_snapshot_ratings(db_session, test_user)
+    raw_responses = get_historical_responses(client, [first_id, second_id])
+    assert set(snapshot_crud.get_unrolled_change_starts(db_session, [first_id, second_id])) == {
+        first_id, second_id}
+
+    assert snapshot_crud.rollup_daily_assessment_snapshots(
+        db_session, RATING_MAPPING, get_rating_label) == [first_id, second_id]
+    assert not snapshot_crud.get_unrolled_change_starts(db_session, [first_id, second_id])
+    snapshot_responses = get_historical_responses(client, [first_id, second_id])
+    assert snapshot_responses == raw_responses
+    assert [entry["average_rating"] for entry in snapshot_responses[0]["start_date"]] == [
+        3.0, None]
+    assert snapshot_responses[2]["average_ratings"] == [
+        [None, 3.0, 3.0, 3.0], [None, None, 0.0, 0.0]]
+
+    add_rating(db_session, test_user.id, second_id, "Acceptable", datetime(2024, 3, 2, 9))
+    assert snapshot_crud.rollup_daily_assessment_snapshots(
+        db_session, RATING_MAPPING, get_rating_label) == [second_id]
+    snapshot = db_session.get(
+        models.DailyAssessmentSnapshot, (datetime(2024, 3, 2).date(), second_id))
+    assert (snapshot.average_rating, snapshot.rating_label, snapshot.rating_count) == (
+        1.5, "Low impact", 2)
+    assert (snapshot.as_of_average_rating, snapshot.as_of_rating_count) == (1.5, 2)
+    assert not snapshot_crud.rollup_daily_assessment_snapshots(
+        db_session, RATING_MAPPING, get_rating_label)
+
+
+def test_changes_after_the_rollup_are_read_from_the_history(
+        client, db_session, test_user, query_counter):
+    "The dates before a change not rolled up come from the snapshots, the later ones do not"
+    first_id, second_id, other_user = seed_snapshot_ratings(db_session, test_user)
+    snapshot_crud.rollup_daily_assessment_snapshots(db_session, RATING_MAPPING, get_rating_label)
+    add_rating(db_session, other_user.id, first_id, "Critical Concern", datetime(2024, 3, 2, 9))
+
+    assert snapshot_crud.get_unrolled_change_starts(db_session, [first_id, second_id]) == {
+        first_id: datetime(2024, 3, 1, 11)}
+    query_counter.reset()
+    response = client.post(
+        "/capability-assessments/historical-time-series",
+        json={"capability_assessment_ids": [first_id, second_id], "dates": TIME_SERIES_DATES})
+    assert response.json()["average_ratings"] == [
+        [None, 3.0, 2.5, 2.5], [None, None, 0.0, 0.0]]
+    # changes not rolled up, snapshots, ratings over time and assessment names
+    assert query_counter.count == 4
+
+    snapshot_responses = get_historical_responses(client, [first_id, second_id])
+    db_session.query(models.DailyAssessmentSnapshot).delete()
+    db_session.commit()
+    assert snapshot_responses == get_historical_responses(client, [first_id, second_id])
+
+
+def test_dates_between_the_changes_of_a_day_are_read_from_the_history(
+        client, db_session, test_user):
+    "A date between two changes of a snapshot day is not answered by the end of day state"
+    first_id, second_id, _ = seed_snapshot_ratings(db_session, test_user)
+    snapshot_crud.rollup_daily_assessment_snapshots(db_session, RATING_MAPPING, get_rating_label)
+    unrolled_change_starts = snapshot_crud.get_unrolled_change_starts(
+        db_session, [first_id, second_id])
+
+    dates = [datetime(2024, 3, 1, 8), datetime(2024, 3, 1, 10), datetime(2024, 3, 1, 12)]
+    averages, missing = snapshot_crud.get_snapshot_ratings_as_of(
+        db_session, [first_id, second_id], dates, unrolled_change_starts)
+    assert averages == {(2, first_id): 3.0}
+    assert missing == {(1, first_id)}
+
+    response = client.post(
+        "/capability-assessments/historical-time-series",
+        json={"capability_assessment_ids": [first_id, second_id],
+              "dates": [date.isoformat() for date in dates]})
+    assert response.json()["average_ratings"] == [[None, 4.0, 3.0], [None, None, None]]
@@ -0,0 +1,146 @@
+"""
+Tests for the CSV and NDJSON exports of the ratings and rating history.
+"""
+
+import csv
+import io
+import json
+import threading
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from app import database, models
+from app.main import app
+from app.routers import exports
+from app.routers.security import create_access_token
+from conftest import seed_acc_model
+
+
+def seed_rating_history(db_session, user):
+    "Seed two ACC models, the first with three changes of a rating of the user"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    other_acc_model = seed_acc_model(
+        db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment = acc_model.components[0].capabilities[0].assessments[0]
+    other_assessment = other_acc_model.components[0].capabilities[0].assessments[0]
+    for rating, change_timestamp in [
+        ("Stable", datetime(2024, 1, 10)),
+        ("Acceptable", datetime(2024, 3, 1, 12)),
+        ("Low impact", datetime(2024, 4, 1)),
+    ]:
+        db_session.add(models.RatingHistory(
+            rating=rating, comments="Checked, twice", user_id=user.id,
+            capability_assessment_id=assessment.id, change_timestamp=change_timestamp))
+    db_session.add_all([
+        models.Rating(rating="Low impact", comments="Checked, twice", user_id=user.id,
+                      capability_assessment_id=assessment.id,
+                      timestamp=datetime(2024, 4, 1)),
+        models.Rating(rating="Stable", user_id=user.id,
+                      capability_assessment_id=other_assessment.id,
+                      timestamp=datetime(2024, 4, 1)),
+        models.RatingHistory(rating="Stable", user_id=user.id,
+                             capability_assessment_id=other_assessment.id,
+                             change_timestamp=datetime(2024, 4, 1)),
+    ])
+    db_session.commit()
+    return acc_model
+
+
+def test_ratings_are_exported_as_csv(client, db_session, test_user, auth_headers):
+    "The ratings of the ACC model are exported with the names of their entities"
+    acc_model = seed_rating_history(db_session, test_user)
+
+    response = client.get(f"/exports/acc-models/{acc_model.id}/ratings", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == (
+        f'attachment; filename="acc-model-{acc_model.id}-ratings.csv"')
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["rating_id", "component", "capability", "attribute", "username",
+                       "rating", "comments", "timestamp"]
+    assert rows[1][1:] == ["Component 0", "Capability 0-0", "Attribute 0", "tester",
+                           "Low impact", "Checked, twice", "2024-04-01T00:00:00"]
+    assert len(rows) == 2
+
+
+def test_rating_history_is_exported_as_ndjson_within_the_date_range(
+        client, db_session, test_user, auth_headers, monkeypatch):
+    "The changes from start_date up to end_date are exported in order, one per line"
+    acc_model = seed_rating_history(db_session, test_user)
+    monkeypatch.setattr(exports, "EXPORT_CHUNK_ROWS", 1)
+
+    response = client.get(
+        f"/exports/acc-models/{acc_model.id}/rating-history",
+        params={"format": "ndjson", "start_date": "2024-01-10T00:00:00",
+                "end_date": "2024-04-01T00:00:00"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert [(entry["rating"], entry["change_timestamp"]) for entry in entries] == [
+        ("Stable", "2024-01-10T00:00:00"), ("Acceptable", "2024-03-01T12:00:00")]
+    assert entries[0]["component"] == "Component 0"
+    assert entries[0]["username"] == "tester"
+
+
+def test_exports_are_validated(client, db_session, test_user, auth_headers):
+    "Exports require authentication, an existing ACC model and a non empty date range"
+    acc_model = seed_rating_history(db_session, test_user)
+    url = f"/exports/acc-models/{acc_model.id}/rating-history"
+
+    assert client.get(url).status_code == 401
+    assert client.get("/exports/acc-models/999/ratings", headers=auth_headers).status_code == 404
+    assert client.get(url, params={"format": "xml"}, headers=auth_headers).status_code == 422
+    assert client.get(url, params={"start_date": "2024-04-01", "end_date": "2024-01-01"},
+                      headers=auth_headers).status_code == 400
+
+
+def test_exports_beyond_the_limit_are_rejected(
+        client, db_session, test_user, auth_headers, monkeypatch):
+    "An export is rejected with a 503 error while the export slots are taken"
+    acc_model = seed_rating_history(db_session, test_user)
+    monkeypatch.setattr(exports, "EXPORT_SLOTS", threading.BoundedSemaphore(1))
+    url = f"/exports/acc-models/{acc_model.id}/ratings"
+
+    exports.EXPORT_SLOTS.acquire()
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+
+    exports.EXPORT_SLOTS.release()
+    assert client.get(url, headers=auth_headers).status_code == 200
+    assert client.get(url, headers=auth_headers).status_code == 200
+
+
+def test_exports_hold_a_single_connection(tmp_path, monkeypatch):
+    "The user lookup returns its connection before the export checks one out"
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'exports.db'}",
+        poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=1,
+    )
+    models.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db_session:
+        user = models.User(
+            username="tester", email="tester@example.com", hashed_password="not-a-real-hash")
+        db_session.add(user)
+        db_session.commit()
+        acc_model_id = seed_rating_history(db_session, user).id
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "read_engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tester'})}"}
+
+    with TestClient(app) as client:
+        response = client.get(f"/exports/acc-models/{acc_model_id}/rating-history",
+                              headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 4
+    assert engine.pool.checkedout() == 0
+    engine.dispose()
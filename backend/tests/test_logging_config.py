@@ -0,0 +1,66 @@
+"""
+Tests for the queue based logging pipeline.
+"""
+
+import json
+import logging
+import queue
+import pytest
+import logging_config
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    "Log to a temporary file in JSON and restore the configuration of the app afterwards"
+    path = tmp_path / "app.log"
+    monkeypatch.setattr(logging_config, "LOG_FILE", str(path))
+    monkeypatch.setattr(logging_config, "LOG_FORMAT", "json")
+    monkeypatch.setattr(logging_config, "LOG_LEVELS", "tests.quiet=WARNING")
+    logging_config.setup_logging()
+    yield path
+    logging_config.stop_logging()
+    monkeypatch.undo()
+    logging_config.setup_logging()
+
+
+def test_records_are_written_as_json_by_the_listener(log_file):  # pylint: disable=redefined-outer-name
+    "The listener writes one JSON object per record, dropping those below the logger level"
+    logging.getLogger("tests.loud").info("Rated %s capabilities", 3)
+    logging.getLogger("tests.quiet").info("Not written")
+    try:
+        raise ValueError("Broken rating")
+    except ValueError:
+        logging.getLogger("tests.loud").exception("Rating failed")
+    logging_config.stop_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [entry["message"] for entry in entries] == ["Rated 3 capabilities", "Rating failed"]
+    assert entries[0]["logger"] == "tests.loud"
+    assert entries[0]["level"] == "INFO"
+    assert "ValueError: Broken rating" in entries[1]["exception"]
+
+
+def test_large_arguments_and_messages_are_truncated():
+    "Collections are cut to their first items and messages to the maximum length"
+    log_queue = queue.SimpleQueue()
+    handler = logging_config.TruncatingQueueHandler(log_queue, max_items=3, max_message_length=80)
+    logger = logging.getLogger("tests.truncation")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("Ratings %s", list(range(10000)))
+        logger.warning("x" * 100)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert log_queue.get_nowait().getMessage() == (
+        "Ratings <list of 10000 items, first [0, 1, 2]>")
+    assert log_queue.get_nowait().getMessage() == (
+        "x" * 80 + "... [truncated 20 characters]")
+
+
+def test_parse_log_levels():
+    "Pairs are split on commas and levels upper cased"
+    assert logging_config.parse_log_levels("app.crud=debug, sqlalchemy.engine=WARNING,") == {
+        "app.crud": "DEBUG", "sqlalchemy.engine": "WARNING"}
@@ -0,0 +1,70 @@
+"""
+Tests for the request and database metrics served by GET /metrics.
+"""
+
+import re
+import pytest
+from app.metrics import REQUEST_METRICS
+from conftest import seed_acc_model
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    "Start every test without the requests recorded by the previous ones"
+    REQUEST_METRICS.clear()
+    yield
+    REQUEST_METRICS.clear()
+
+
+def get_sample(metrics: str, name: str, labels: str) -> float:
+    "Return the value of the sample with the given name and labels"
+    match = re.search(rf"^{re.escape(name + '{' + labels + '}')} (\S+)$", metrics, re.MULTILINE)
+    assert match, f"{name}{{{labels}}} not found"
+    return float(match.group(1))
+
+
+def test_requests_are_counted_per_route_template(client, db_session):
+    "Requests are grouped by route template with their status, latency and statements"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    for assessment in acc_model.components[0].capabilities[0].assessments:
+        assert client.get(f"/capability-assessments/{assessment.id}/aggregate").status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    metrics = response.text
+
+    route = 'method="GET",route="/capability-assessments/{capability_assessment_id}/aggregate"'
+    assert get_sample(metrics, "http_requests_total", route + ',status="200"') == 2
+    assert get_sample(metrics, "http_request_duration_seconds_count", route) == 2
+    assert get_sample(metrics, "http_request_duration_seconds_bucket", route + ',le="+Inf"') == 2
+    assert get_sample(metrics, "http_request_db_statements_sum", route) >= 2
+    assert get_sample(metrics, "http_request_db_statements_bucket", route + ',le="0"') == 0
+    assert get_sample(metrics, "http_request_db_duration_seconds_sum", route) > 0
+    assert get_sample(
+        metrics, "http_requests_total", 'method="GET",route="unmatched",status="404"') == 1
+    # The scrape itself is the only request in flight
+    assert get_sample(metrics, "http_requests_in_flight", 'method="GET"') == 1
+
+
+def test_statements_outside_requests_are_not_counted(client, db_session):
+    "Only the statements run while serving a request are recorded"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+
+    metrics = client.get("/metrics").text
+
+    assert "http_request_db_statements_sum" not in metrics
+
+
+def test_cached_responses_are_counted_under_their_route(client, db_session):
+    "Responses served by the response cache keep the route template of their endpoint"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    for _ in range(2):
+        assert client.get(f"/components/acc_model/{acc_model.id}").status_code == 200
+
+    metrics = client.get("/metrics").text
+
+    route = 'method="GET",route="/components/acc_model/{acc_model_id}"'
+    assert get_sample(metrics, "http_requests_total", route + ',status="200"') == 2
+    assert get_sample(metrics, "http_request_db_statements_bucket", route + ',le="0"') == 1
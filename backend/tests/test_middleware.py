@@ -0,0 +1,69 @@
+"""
+Tests for the error mapping and request logging middlewares.
+"""
+
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app import schemas
+from app.middleware import ErrorMappingMiddleware, RequestLoggingMiddleware
+
+
+@pytest.fixture
+def failing_client():
+    "Return a test client of an app whose endpoints raise behind both middlewares"
+    failing_app = FastAPI()
+    failing_app.add_middleware(ErrorMappingMiddleware)
+    failing_app.add_middleware(RequestLoggingMiddleware)
+
+    @failing_app.get("/validation-error")
+    def raise_validation_error():
+        return schemas.RatingCreate(capability_assessment_id="not a number", rating="Stable")
+
+    @failing_app.get("/unexpected-error")
+    def raise_unexpected_error():
+        raise RuntimeError("Broken rating")
+
+    @failing_app.get("/broken-stream")
+    def stream_then_fail():
+        def chunks():
+            yield b"first chunk"
+            raise RuntimeError("Broken stream")
+        return StreamingResponse(chunks())
+
+    with TestClient(failing_app) as test_client:
+        yield test_client
+
+
+def test_errors_are_mapped_to_json_responses(failing_client, caplog):  # pylint: disable=redefined-outer-name
+    "Validation errors are answered with a 422 listing them, other errors with a 500"
+    with caplog.at_level(logging.INFO, logger="app.middleware"):
+        validation_response = failing_client.get("/validation-error")
+        unexpected_response = failing_client.get("/unexpected-error")
+
+    assert validation_response.status_code == 422
+    assert validation_response.json()["detail"][0]["loc"] == ["capability_assessment_id"]
+    assert unexpected_response.status_code == 500
+    assert unexpected_response.json() == {"detail": "Internal server error"}
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("GET /validation-error 422 ") for message in messages)
+    assert any(message.startswith("GET /unexpected-error 500 ") for message in messages)
+
+
+def test_errors_after_the_response_started_are_raised(failing_client):  # pylint: disable=redefined-outer-name
+    "A streaming response failing midway cannot be replaced by an error response"
+    with pytest.raises(RuntimeError, match="Broken stream"):
+        failing_client.get("/broken-stream")
+
+
+def test_requests_are_logged_and_timed(client, caplog):
+    "Every request is logged with its status and duration, reported in Server-Timing"
+    with caplog.at_level(logging.INFO, logger="app.middleware"):
+        response = client.get("/")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("app;dur=")
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.middleware"]
+    assert messages[-1].startswith("GET / 200 ")
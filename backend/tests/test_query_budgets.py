@@ -0,0 +1,151 @@
+"""
+Query budgets of the endpoints of every router in app/routers.
+
+Each request is made against a small and a larger ACC model and must stay within
+the same number of statements for both, so that a query per row (N+1) fails here
+instead of slowing production down. Requests authenticated with auth_headers
+include the lookup of the user, which is cached afterwards.
+"""
+
+import logging
+import pytest
+from app import metrics, models
+from app.metrics import RequestDbStats, check_db_stats
+from conftest import seed_acc_model
+
+SIZES = [(1, 1, 2), (3, 4, 5)]
+
+
+def get_assessment_ids(acc_model):
+    "Return the IDs of every capability assessment of an ACC model"
+    return [
+        assessment.id
+        for component in acc_model.components
+        for capability in component.capabilities
+        for assessment in capability.assessments
+    ]
+
+
+def rate_everything(db_session, acc_model, user):
+    "Rate every capability assessment of an ACC model as the given user"
+    db_session.add_all(
+        models.Rating(capability_assessment_id=assessment_id, user_id=user.id, rating="Stable")
+        for assessment_id in get_assessment_ids(acc_model)
+    )
+    db_session.commit()
+
+
+@pytest.fixture(params=SIZES, ids=["small", "large"])
+def rated_acc_model(request, db_session, test_user):
+    "Return an ACC model of the requested size whose assessments the test user rated"
+    num_components, num_capabilities, num_attributes = request.param
+    acc_model = seed_acc_model(db_session, num_components=num_components,
+                               num_capabilities=num_capabilities, num_attributes=num_attributes)
+    rate_everything(db_session, acc_model, test_user)
+    return acc_model
+
+
+@pytest.mark.parametrize("path, budget", [
+    ("/acc-models/", 1),
+    ("/acc-models/{acc_model_id}", 1),
+    ("/acc-models/{acc_model_id}/matrix", 5),
+    ("/components/", 1),
+    ("/components/acc_model/{acc_model_id}", 1),
+    ("/components/id/{component_id}", 1),
+    ("/capabilities/", 1),
+    ("/capabilities/component/{component_id}", 1),
+    ("/capabilities/{capability_id}", 1),
+    ("/attributes/", 1),
+    ("/attributes/{attribute_id}", 1),
+    ("/rating-options/", 0),
+    ("/users/", 1),
+    ("/users/{user_id}", 1),
+    ("/capability-assessments/?capability_id={capability_id}&attribute_id={attribute_id}", 1),
+    ("/capability-assessments/{capability_assessment_id}/", 2),
+    ("/capability-assessments/{capability_assessment_id}/user/{user_id}/", 1),
+    ("/capability-assessments/{capability_assessment_id}/aggregate", 1),
+])
+def test_get_endpoint_budgets(client, query_budget, rated_acc_model, test_user, path, budget):  # pylint: disable=redefined-outer-name,too-many-arguments
+    "The read endpoints run a fixed number of statements"
+    component = rated_acc_model.components[-1]
+    capability = component.capabilities[-1]
+    assessment = capability.assessments[-1]
+    url = path.format(
+        acc_model_id=rated_acc_model.id, component_id=component.id,
+        capability_id=capability.id, attribute_id=assessment.attribute_id,
+        capability_assessment_id=assessment.id, user_id=test_user.id,
+    )
+
+    with query_budget(budget):
+        response = client.get(url)
+
+    assert response.status_code == 200
+
+
+def test_post_endpoint_budgets(client, query_budget, rated_acc_model, test_user, auth_headers):  # pylint: disable=redefined-outer-name
+    "The batch endpoints run a fixed number of statements however many IDs they get"
+    assessment_ids = get_assessment_ids(rated_acc_model)
+    capability_ids = [
+        capability.id
+        for component in rated_acc_model.components
+        for capability in component.capabilities
+    ]
+    attribute_ids = sorted({
+        assessment.attribute_id
+        for component in rated_acc_model.components
+        for capability in component.capabilities
+        for assessment in capability.assessments
+    })
+    requests = [
+        ("/capability-assessments/aggregates", {"json": assessment_ids}, 1),
+        (f"/capability-assessments/ratings/batch/?user_id={test_user.id}",
+         {"json": assessment_ids}, 1),
+        ("/capability-assessments/bulk/ids",
+         {"json": {"capability_ids": capability_ids, "attribute_ids": attribute_ids}}, 1),
+        ("/capability-assessments/historical-time-series",
+         {"json": {"capability_assessment_ids": assessment_ids,
+                   "start_date": "2024-01-01T00:00:00", "end_date": "2024-01-07T00:00:00"}},
+         4),
+        ("/capability-assessments/batch/",
+         {"json": {"ratings": [{"capability_assessment_id": assessment_id, "rating": "Acceptable"}
+                               for assessment_id in assessment_ids]},
+          "headers": auth_headers},
+         6),
+    ]
+
+    for url, kwargs, budget in requests:
+        with query_budget(budget):
+            response = client.post(url, **kwargs)
+        assert response.status_code == 200, url
+
+
+def test_db_stats_header(client, db_session, monkeypatch):
+    "DB_STATS_HEADER reports the statements and database time of the request"
+    seed_acc_model(db_session, num_components=2, num_capabilities=1, num_attributes=1)
+    monkeypatch.setattr(metrics, "DB_STATS_HEADER", True)
+
+    response = client.get("/components/")
+
+    assert response.headers["x-db-statements"] == "1"
+    assert float(response.headers["x-db-time-ms"]) > 0
+
+
+def test_repeated_statements_are_reported(caplog, monkeypatch):
+    "Requests over the thresholds log a warning naming the repeated statement"
+    monkeypatch.setattr(metrics, "DB_STATEMENT_WARNING_THRESHOLD", 5)
+    monkeypatch.setattr(metrics, "DB_REPEATED_STATEMENT_THRESHOLD", 3)
+    db_stats = RequestDbStats()
+    db_stats.statements = 6
+    db_stats.statement_counts = {
+        "SELECT components.name\nFROM components WHERE components.id = ?": 4,
+        "SELECT acc_models.id FROM acc_models": 2,
+    }
+
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        check_db_stats("GET", "/components/", db_stats)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0].startswith("GET /components/ ran 6 statements")
+    assert messages[1] == (
+        "GET /components/ ran the same statement 4 times, possibly once per row (N+1): "
+        "SELECT components.name FROM components WHERE components.id = ?")
@@ -0,0 +1,62 @@
+"""
+Regression tests for the number of SQL statements run by the listing endpoints.
+
+Each endpoint must run a fixed number of statements, however many rows it returns.
+"""
+
+import pytest
+from conftest import seed_acc_model
+
+
+@pytest.mark.parametrize("num_components", [1, 5])
+def test_read_all_components_query_count(client, db_session, query_counter, num_components):
+    "GET /components/ loads the ACC model names in the same query"
+    seed_acc_model(db_session, num_components=num_components)
+    query_counter.reset()
+
+    response = client.get("/components/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == num_components
+    assert query_counter.count == 1
+
+
+@pytest.mark.parametrize("num_components", [1, 5])
+def test_read_components_by_acc_model_query_count(
+        client, db_session, query_counter, num_components):
+    "GET /components/acc_model/{id} loads the ACC model names in the same query"
+    acc_model_id = seed_acc_model(db_session, num_components=num_components).id
+    query_counter.reset()
+
+    response = client.get(f"/components/acc_model/{acc_model_id}")
+
+    assert response.status_code == 200
+    assert len(response.json()) == num_components
+    assert query_counter.count == 1
+
+
+def test_read_component_query_count(client, db_session, query_counter):
+    "GET /components/id/{id} loads the ACC model name in the same query"
+    acc_model = seed_acc_model(db_session, num_components=1)
+    component_id = acc_model.components[0].id
+    query_counter.reset()
+
+    response = client.get(f"/components/id/{component_id}")
+
+    assert response.status_code == 200
+    assert query_counter.count == 1
+
+
+@pytest.mark.parametrize("num_capabilities", [1, 5])
+def test_read_capabilities_by_component_query_count(
+        client, db_session, query_counter, num_capabilities):
+    "GET /capabilities/component/{id} loads the component name in the same query"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=num_capabilities)
+    component_id = acc_model.components[0].id
+    query_counter.reset()
+
+    response = client.get(f"/capabilities/component/{component_id}")
+
+    assert response.status_code == 200
+    assert len(response.json()) == num_capabilities
+    assert query_counter.count == 1
@@ -0,0 +1,210 @@
+"""
+Tests for the historical rating lookups.
+"""
+
+from datetime import datetime
+from app import models, schemas
+from app.crud import ratings as rating_crud
+from conftest import seed_acc_model
+
+
+def test_history_for_date_covers_the_whole_day(db_session, test_user):
+    "The latest change of the target day is returned, changes on other days are not"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    for rating, change_timestamp in [
+        ("Stable", datetime(2024, 5, 1, 23, 59, 59)),
+        ("Acceptable", datetime(2024, 5, 2, 0, 0, 0)),
+        ("Low impact", datetime(2024, 5, 2, 23, 59, 59, 999999)),
+        ("Critical Concern", datetime(2024, 5, 3, 0, 0, 0)),
+    ]:
+        db_session.add(models.RatingHistory(
+            rating=rating, user_id=test_user.id, capability_assessment_id=assessment_id,
+            change_timestamp=change_timestamp))
+    db_session.commit()
+
+    history = rating_crud.get_ratings_history_for_date(
+        db_session, [assessment_id], datetime(2024, 5, 2, 15, 30))
+
+    assert [entry.rating for entry in history] == ["Low impact"]
+    assert not rating_crud.get_ratings_history_for_date(
+        db_session, [assessment_id], datetime(2024, 5, 4))
+
+
+def test_history_as_of_returns_latest_change_of_each_user(client, db_session, test_user):
+    "Each user's latest change at or before the timestamp is returned, whatever its day"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    first_id, second_id = [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+    other_user = models.User(
+        username="other", email="other@example.com", hashed_password="not-a-real-hash")
+    db_session.add(other_user)
+    db_session.commit()
+    for user_id, assessment_id, rating, change_timestamp in [
+        (test_user.id, first_id, "Stable", datetime(2024, 1, 10)),
+        (test_user.id, first_id, "Acceptable", datetime(2024, 3, 1, 12)),
+        (test_user.id, first_id, "Critical Concern", datetime(2024, 3, 1, 12, 0, 1)),
+        (other_user.id, first_id, "Low impact", datetime(2024, 2, 1)),
+        (other_user.id, second_id, "Stable", datetime(2024, 4, 1)),
+    ]:
+        db_session.add(models.RatingHistory(
+            rating=rating, user_id=user_id, capability_assessment_id=assessment_id,
+            change_timestamp=change_timestamp))
+    db_session.commit()
+
+    history = rating_crud.get_ratings_history_as_of(
+        db_session, [first_id, second_id], datetime(2024, 3, 1, 12))
+    assert sorted((entry.user_id, entry.rating) for entry in history) == sorted([
+        (test_user.id, "Acceptable"), (other_user.id, "Low impact")])
+
+    response = client.post(
+        "/capability-assessments/historical-graph-data",
+        params={"start_date": "2024-01-15T00:00:00", "end_date": "2024-05-01T00:00:00",
+                "as_of": True},
+        json=[first_id, second_id],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["average_rating"] for entry in body["start_date"]] == [4, None]
+    assert [entry["average_rating"] for entry in body["end_date"]] == [1.5, 4]
+
+
+def test_history_as_of_includes_the_current_ratings(client, db_session, test_user):
+    "Ratings created and then updated through the write path are seen as of any later date"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    first_id, second_id = [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+    db_rating = rating_crud.create_rating(db_session, schemas.RatingCreate(
+        capability_assessment_id=first_id, rating="Stable",
+        timestamp=datetime(2024, 1, 1)), test_user.id)
+    rating_crud.update_rating(db_session, db_rating, schemas.RatingCreate(
+        capability_assessment_id=first_id, rating="Critical Concern",
+        timestamp=datetime(2024, 1, 6)))
+    for rating, timestamp in [("Stable", datetime(2024, 1, 1)),
+                              ("Low impact", datetime(2024, 1, 6))]:
+        rating_crud.upsert_ratings_for_user(db_session, [schemas.RatingCreate(
+            capability_assessment_id=second_id, rating=rating, timestamp=timestamp)],
+            test_user.id)
+
+    history = rating_crud.get_ratings_history_as_of(
+        db_session, [first_id, second_id], datetime(2024, 1, 10))
+    assert sorted((entry.capability_assessment_id, entry.rating) for entry in history) == [
+        (first_id, "Critical Concern"), (second_id, "Low impact")]
+    history = rating_crud.get_ratings_history_as_of(
+        db_session, [first_id, second_id], datetime(2024, 1, 5))
+    assert sorted((entry.capability_assessment_id, entry.rating) for entry in history) == [
+        (first_id, "Stable"), (second_id, "Stable")]
+
+    response = client.post(
+        "/capability-assessments/historical-graph-data",
+        params={"start_date": "2024-01-05T00:00:00", "end_date": "2024-01-10T00:00:00",
+                "as_of": True},
+        json=[first_id, second_id],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["average_rating"] for entry in body["start_date"]] == [4, 4]
+    assert [entry["average_rating"] for entry in body["end_date"]] == [1, 2]
+
+    response = client.post(
+        "/capability-assessments/historical-ratings",
+        params={"target_date": "2024-01-10T00:00:00", "as_of": True}, json=[second_id])
+    assert response.status_code == 200
+    current_rating = db_session.query(models.Rating).filter_by(
+        capability_assessment_id=second_id).one()
+    assert [(entry["id"], entry["rating_id"], entry["rating"]) for entry in response.json()] == [
+        (None, current_rating.id, "Low impact")]
+
+
+def test_time_series_averages_every_date_in_one_query(
+        client, db_session, test_user, query_counter):
+    "Each date of the series shows the average of the latest ratings at that date"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    first_id, second_id = [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+    other_user = models.User(
+        username="other", email="other@example.com", hashed_password="not-a-real-hash")
+    db_session.add(other_user)
+    db_session.commit()
+    for user_id, assessment_id, rating, change_timestamp in [
+        (test_user.id, first_id, "Stable", datetime(2024, 1, 1, 9)),
+        (other_user.id, first_id, "Low impact", datetime(2024, 1, 2, 9)),
+        (test_user.id, first_id, "Critical Concern", datetime(2024, 1, 9, 9)),
+        (other_user.id, second_id, "Acceptable", datetime(2024, 1, 10, 9)),
+    ]:
+        db_session.add(models.RatingHistory(
+            rating=rating, user_id=user_id, capability_assessment_id=assessment_id,
+            change_timestamp=change_timestamp))
+    db_session.commit()
+    query_counter.reset()
+
+    response = client.post(
+        "/capability-assessments/historical-time-series",
+        json={"capability_assessment_ids": [first_id, second_id],
+              "start_date": "2023-12-31T12:00:00", "end_date": "2024-01-14T12:00:00",
+              "step": "weekly"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dates"] == [
+        "2023-12-31T12:00:00", "2024-01-07T12:00:00", "2024-01-14T12:00:00"]
+    assert body["capability_names"] == ["Capability 0-0", "Capability 0-0"]
+    assert body["attribute_names"] == ["Attribute 0", "Attribute 1"]
+    assert body["average_ratings"] == [[None, 3.0, 1.5], [None, None, 3.0]]
+    assert body["rating_labels"] == [
+        [None, "Acceptable", "Low impact"], [None, None, "Acceptable"]]
+    # changes not rolled up, snapshots, ratings over time and assessment names
+    assert query_counter.count <= 4
+
+
+def test_time_series_includes_the_current_ratings(client, db_session, test_user):
+    "Ratings written through the batch upsert show their latest value at later dates"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    other_user = models.User(
+        username="other", email="other@example.com", hashed_password="not-a-real-hash")
+    db_session.add(other_user)
+    db_session.commit()
+    for user_id, rating, timestamp in [
+        (test_user.id, "Stable", datetime(2024, 1, 1)),
+        (other_user.id, "Acceptable", datetime(2024, 1, 2)),
+        (test_user.id, "Critical Concern", datetime(2024, 1, 6)),
+        (test_user.id, "Low impact", datetime(2024, 1, 12)),
+    ]:
+        rating_crud.upsert_ratings_for_user(db_session, [schemas.RatingCreate(
+            capability_assessment_id=assessment_id, rating=rating, timestamp=timestamp)],
+            user_id)
+
+    response = client.post(
+        "/capability-assessments/historical-time-series",
+        json={"capability_assessment_ids": [assessment_id],
+              "start_date": "2023-12-31T00:00:00", "end_date": "2024-01-14T00:00:00",
+              "step": "weekly"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["average_ratings"] == [[None, 2.0, 2.5]]
+
+
+def test_time_series_rejects_too_many_dates(client):
+    "A range with more dates than allowed is rejected"
+    response = client.post(
+        "/capability-assessments/historical-time-series",
+        json={"capability_assessment_ids": [1],
+              "start_date": "2020-01-01T00:00:00", "end_date": "2024-01-01T00:00:00"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,96 @@
+"""
+Tests for the assessment_rating_stats table and the aggregate endpoints reading it.
+"""
+
+from app import models, schemas
+from app.crud import ratings as rating_crud
+from conftest import seed_acc_model
+
+
+def test_stats_follow_every_rating_change(client, db_session, test_user, auth_headers):
+    "Creating, updating and deleting ratings keeps the stats equal to a rebuild"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    first_id, second_id = [
+        assessment.id
+        for assessment in db_session.query(models.CapabilityAssessment)
+        .order_by(models.CapabilityAssessment.id)
+        .all()
+    ]
+    other_user = models.User(
+        username="other", email="other@example.com", hashed_password="not-a-real-hash")
+    db_session.add(other_user)
+    db_session.commit()
+
+    client.post(
+        "/capability-assessments/batch/",
+        json={"ratings": [
+            {"capability_assessment_id": first_id, "rating": "Stable"},
+            {"capability_assessment_id": second_id, "rating": "Not Applicable"},
+        ]},
+        headers=auth_headers,
+    )
+    rating_crud.create_rating(
+        db_session,
+        schemas.RatingCreate(capability_assessment_id=first_id, rating="Critical Concern"),
+        other_user.id,
+    )
+    client.post(
+        f"/capability-assessments/{second_id}/",
+        json={"capability_assessment_id": second_id, "rating": "Acceptable"},
+        headers=auth_headers,
+    )
+    other_rating = rating_crud.get_rating_by_user_and_assessment(
+        db_session, other_user.id, first_id)
+    rating_crud.update_rating(
+        db_session, other_rating,
+        schemas.RatingCreate(capability_assessment_id=first_id, rating="Low impact"))
+
+    first_stats = db_session.get(models.AssessmentRatingStats, first_id)
+    db_session.refresh(first_stats)
+    assert (first_stats.rating_count, first_stats.rating_sum,
+            first_stats.stable_count, first_stats.low_impact_count,
+            first_stats.critical_concern_count) == (2, 6, 1, 1, 0)
+    assert not rating_crud.verify_rating_stats(db_session)
+
+    rating_crud.delete_rating(db_session, other_rating.id)
+    assert not rating_crud.verify_rating_stats(db_session)
+
+    response = client.post(
+        "/capability-assessments/aggregates", json=[first_id, second_id, 9999])
+    assert response.json() == [
+        {"capability_assessment_id": first_id, "average_rating": 4.0,
+         "rating_label": "Stable"},
+        {"capability_assessment_id": second_id, "average_rating": 3.0,
+         "rating_label": "Acceptable"},
+        {"capability_assessment_id": 9999, "average_rating": None},
+    ]
+
+
+def test_single_aggregate_leaves_out_not_applicable(client, db_session, test_user):
+    "Not Applicable ratings count as ratings but not towards the average"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    rating_crud.create_rating(
+        db_session,
+        schemas.RatingCreate(capability_assessment_id=assessment_id, rating="Not Applicable"),
+        test_user.id,
+    )
+
+    response = client.get(f"/capability-assessments/{assessment_id}/aggregate")
+
+    assert response.json() == {"capability_assessment_id": assessment_id, "average_rating": None}
+    stats = db_session.get(models.AssessmentRatingStats, assessment_id)
+    assert (stats.rating_count, stats.not_applicable_count) == (1, 1)
+
+
+def test_rebuild_restores_stats(db_session, test_user):
+    "The rebuild recomputes stats that drifted from the ratings table"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    db_session.add(models.Rating(
+        rating="Acceptable", user_id=test_user.id, capability_assessment_id=assessment_id))
+    db_session.commit()
+
+    assert rating_crud.verify_rating_stats(db_session) == [assessment_id]
+    assert rating_crud.rebuild_rating_stats(db_session) == 1
+    assert not rating_crud.verify_rating_stats(db_session)
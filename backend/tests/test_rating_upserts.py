@@ -0,0 +1,58 @@
+"""
+Tests for the unique (user, capability assessment) rating index and the upsert retry.
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app import models
+from app.crud import ratings as rating_crud
+from conftest import seed_acc_model
+
+
+def test_duplicate_rating_is_rejected(db_session, test_user):
+    "A user cannot hold two ratings for the same capability assessment"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    for rating in ("Stable", "Acceptable"):
+        db_session.add(models.Rating(
+            rating=rating, user_id=test_user.id, capability_assessment_id=assessment_id))
+
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
+
+
+def test_concurrently_created_rating_is_updated(
+        client, db_session, test_user, auth_headers, monkeypatch):
+    "A rating created after the existing ratings were read is updated on retry"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+    assessment_id = db_session.query(models.CapabilityAssessment).first().id
+    # Committed by a concurrent request after this request looked for existing ratings
+    db_session.add(models.Rating(
+        rating="Stable", user_id=test_user.id, capability_assessment_id=assessment_id))
+    db_session.commit()
+
+    get_ratings_for_update = rating_crud._get_ratings_for_update
+    lookups = []
+
+    def stale_get_ratings_for_update(*args, **kwargs):
+        lookups.append(args)
+        if len(lookups) == 1:
+            return []
+        return get_ratings_for_update(*args, **kwargs)
+
+    monkeypatch.setattr(rating_crud, "_get_ratings_for_update", stale_get_ratings_for_update)
+
+    response = client.post(
+        f"/capability-assessments/{assessment_id}/",
+        json={"capability_assessment_id": assessment_id, "rating": "Acceptable"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rating"] == "Acceptable"
+    assert len(lookups) == 2
+    ratings = db_session.query(models.Rating).filter_by(user_id=test_user.id).all()
+    assert [rating.rating for rating in ratings] == ["Acceptable"]
+    history = db_session.query(models.RatingHistory).all()
+    assert [entry.rating for entry in history] == ["Stable"]
@@ -0,0 +1,133 @@
+"""
+Tests for routing the read-only endpoints to DATABASE_READ_URL.
+
+Two SQLite files stand in for the primary and the replica. Nothing replicates
+between them, so every response shows which database served it.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app import database, models
+from app.main import app
+from app.response_cache import RESPONSE_CACHE
+from app.routers import async_acc_models, async_capabilities_assessments
+from app.routers.security import create_access_token
+from conftest import seed_acc_model
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    "Point the app to a primary and a replica database holding the same ACC model"
+    sessions = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        models.Base.metadata.create_all(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        sessions[name] = session_factory
+        with session_factory() as db_session:
+            db_session.add(models.User(
+                username="tester", email="tester@example.com", hashed_password="not-a-real-hash"))
+            seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+            db_session.add(models.Attribute(name=f"Only on the {name}"))
+            db_session.commit()
+        monkeypatch.setattr(database, "engine" if name == "primary" else "read_engine", engine)
+        monkeypatch.setattr(
+            database, "SessionLocal" if name == "primary" else "ReadSessionLocal", session_factory)
+
+    database.RECENT_WRITERS.clear()
+    yield sessions
+    database.RECENT_WRITERS.clear()
+    for session_factory in sessions.values():
+        session_factory.kw["bind"].dispose()
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(databases):  # pylint: disable=redefined-outer-name
+    "Anonymous reads are served by the replica while writes land on the primary"
+    sessions = databases
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tester'})}"}
+    with TestClient(app) as client:
+        assert client.get("/attributes/3").json()["name"] == "Only on the replica"
+
+        response = client.post("/attributes/", json={"name": "New attribute"}, headers=headers)
+        assert response.status_code == 200
+
+    with sessions["primary"]() as db_session:
+        assert db_session.query(models.Attribute).filter_by(name="New attribute").count() == 1
+    with sessions["replica"]() as db_session:
+        assert db_session.query(models.Attribute).filter_by(name="New attribute").count() == 0
+
+
+def test_rating_submitters_read_their_writes_from_the_primary(databases, monkeypatch):  # pylint: disable=redefined-outer-name,unused-argument
+    "After a rating submit, the user reads from the primary until the window ends"
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tester'})}"}
+    with TestClient(app) as client:
+        assessment_id = client.get("/acc-models/1/matrix").json()[
+            "capability_assessments"][0]["capability_assessment_id"]
+
+        response = client.post(
+            "/capability-assessments/batch/",
+            json={"ratings": [{"capability_assessment_id": assessment_id, "rating": "Stable"}]},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+        def read_average(request_headers):
+            return client.post(
+                "/capability-assessments/aggregates", json=[assessment_id], headers=request_headers
+            ).json()[0]["average_rating"]
+
+        assert read_average(headers) == 4.0
+        assert read_average({}) is None
+
+        monkeypatch.setattr(database.RECENT_WRITERS, "window_seconds", 0)
+        assert read_average(headers) is None
+
+
+def test_cached_responses_are_built_from_the_primary(databases):  # pylint: disable=redefined-outer-name,unused-argument
+    "The responses of the cache misses are read from the primary, then served from the cache"
+    with TestClient(app) as client:
+        names = [attribute["name"] for attribute in client.get("/attributes/").json()]
+        assert "Only on the primary" in names
+        assert "Only on the replica" not in names
+
+        assert client.get("/attributes/").json() == client.get("/attributes/").json()
+        assert RESPONSE_CACHE.stats()["hits"] == 2
+
+
+def test_async_reads_follow_the_replica_routing(databases, monkeypatch):  # pylint: disable=redefined-outer-name
+    "The async aggregates are read from the replica, except by the users who just rated"
+    for name, engine_name, session_name in (
+            ("primary", "async_engine", "AsyncSessionLocal"),
+            ("replica", "async_read_engine", "AsyncReadSessionLocal")):
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{databases[name].kw['bind'].url.database}", poolclass=NullPool)
+        monkeypatch.setattr(database, engine_name, async_engine)
+        monkeypatch.setattr(database, session_name, async_sessionmaker(
+            bind=async_engine, autoflush=False, expire_on_commit=False))
+    async_app = FastAPI()
+    async_app.include_router(async_acc_models.router)
+    async_app.include_router(async_capabilities_assessments.router)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'tester'})}"}
+
+    with TestClient(async_app) as client:
+        assessment_id = client.get("/acc-models/1/matrix").json()[
+            "capability_assessments"][0]["capability_assessment_id"]
+        response = client.post(
+            "/capability-assessments/batch/",
+            json={"ratings": [{"capability_assessment_id": assessment_id, "rating": "Stable"}]},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+        def read_average(request_headers):
+            return client.post(
+                "/capability-assessments/aggregates", json=[assessment_id], headers=request_headers
+            ).json()[0]["average_rating"]
+
+        assert read_average(headers) == 4.0
+        assert read_average({}) is None
@@ -0,0 +1,76 @@
+"""
+Tests for the ETag and response caching of the taxonomy endpoints.
+"""
+
+from app.response_cache import RESPONSE_CACHE, etag_matches
+from conftest import seed_acc_model
+
+
+def test_unchanged_responses_are_served_without_queries(client, db_session, query_counter):
+    "Revalidations get a 304 and repeated requests the cached bytes, neither querying"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=3)
+    query_counter.reset()
+
+    first = client.get("/attributes/")
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+    assert query_counter.count > 0
+    query_counter.reset()
+
+    revalidated = client.get("/attributes/", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+    repeated = client.get("/attributes/")
+    assert repeated.status_code == 200
+    assert repeated.headers["etag"] == etag
+    assert repeated.content == first.content
+    assert query_counter.count == 0
+    assert RESPONSE_CACHE.stats() == {"size": 1, "hits": 1, "not_modified": 1, "misses": 1}
+
+
+def test_writes_change_the_etag(client, db_session, auth_headers):
+    "Creating an attribute invalidates the cached list of attributes"
+    seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    etag = client.get("/attributes/").headers["etag"]
+
+    response = client.post("/attributes/", json={"name": "Secure"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    refreshed = client.get("/attributes/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert "Secure" in [attribute["name"] for attribute in refreshed.json()]
+
+
+def test_deleting_a_component_invalidates_its_capabilities(client, db_session, auth_headers):
+    "The capabilities deleted along with their component are not served from the cache"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=2, num_attributes=1)
+    component_id = acc_model.components[0].id
+    assert len(client.get(f"/capabilities/component/{component_id}").json()) == 2
+
+    response = client.delete(f"/components/{component_id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.get(f"/capabilities/component/{component_id}").json() == []
+
+
+def test_uncached_endpoints_have_no_etag(client, db_session):
+    "Only the taxonomy endpoints are cached"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=1)
+
+    response = client.get(f"/acc-models/{acc_model.id}/matrix")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_etag_matching():
+    "If-None-Match uses weak comparison and accepts lists and *"
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"xyz", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"xyz"', '"abc"')
+    assert not etag_matches(None, '"abc"')
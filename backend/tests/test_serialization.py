@@ -0,0 +1,52 @@
+"""
+Tests for the single pass serialization of the large list endpoints.
+"""
+
+from typing import List
+from pydantic import TypeAdapter
+from app import models, schemas
+from app.serialization import model_list_response
+from conftest import seed_acc_model
+
+
+def test_model_list_response_matches_the_response_model(db_session, test_user):
+    "The single pass writes the same JSON as validating the rows and dumping them"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=2, num_attributes=2)
+    for assessment in acc_model.components[0].capabilities[0].assessments:
+        db_session.add(models.Rating(
+            capability_assessment_id=assessment.id, user_id=test_user.id,
+            rating="Stable", comments="Looks good"))
+    db_session.commit()
+    rows = db_session.query(models.Rating).all()
+
+    response = model_list_response(schemas.RatingRead, rows)
+
+    expected = TypeAdapter(List[schemas.RatingRead])
+    assert response.media_type == "application/json"
+    assert response.body == expected.dump_json(
+        [schemas.RatingRead.model_validate(row) for row in rows])
+
+
+def test_ratings_batch_returns_the_ratings_of_the_user(client, db_session, test_user):
+    "The ratings batch endpoint serializes the ORM rows of the user"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=3)
+    assessment_ids = [
+        assessment.id for assessment in acc_model.components[0].capabilities[0].assessments
+    ]
+    db_session.add_all(
+        models.Rating(capability_assessment_id=assessment_id, user_id=test_user.id,
+                      rating="Acceptable")
+        for assessment_id in assessment_ids
+    )
+    db_session.commit()
+
+    response = client.post(
+        f"/capability-assessments/ratings/batch/?user_id={test_user.id}", json=assessment_ids)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    ratings = response.json()
+    assert sorted(rating["capability_assessment_id"] for rating in ratings) == assessment_ids
+    assert {rating["rating"] for rating in ratings} == {"Acceptable"}
+    assert all(set(rating) == {"id", "user_id", "capability_assessment_id", "rating",
+                               "comments", "timestamp"} for rating in ratings)
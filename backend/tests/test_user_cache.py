@@ -0,0 +1,81 @@
+"""
+Tests for the cache of the users authenticated by their token.
+"""
+
+from sqlalchemy import inspect
+from app import schemas
+from app.crud import users as user_crud
+from app.user_cache import USER_CACHE, UserCache
+from conftest import seed_acc_model
+
+
+def post_batch(client, auth_headers, assessment_ids):
+    "Submit a rating for every given capability assessment"
+    return client.post(
+        "/capability-assessments/batch/",
+        json={"ratings": [
+            {"capability_assessment_id": assessment_id, "rating": "Stable"}
+            for assessment_id in assessment_ids
+        ]},
+        headers=auth_headers,
+    )
+
+
+def test_repeated_batches_skip_the_user_lookup(
+        client, db_session, query_counter, auth_headers):
+    "Only the first request of a user looks it up in the users table"
+    acc_model = seed_acc_model(db_session, num_components=1, num_capabilities=1, num_attributes=2)
+    assessment_ids = [
+        assessment.id
+        for assessment in acc_model.components[0].capabilities[0].assessments
+    ]
+    query_counter.reset()
+
+    assert post_batch(client, auth_headers, assessment_ids).status_code == 200
+    assert any("FROM users" in statement for statement in query_counter.statements)
+    query_counter.reset()
+
+    assert post_batch(client, auth_headers, assessment_ids).status_code == 200
+    assert not any("FROM users" in statement for statement in query_counter.statements)
+    assert USER_CACHE.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_user_lookup_leaves_the_request_session_alone(client, test_user, auth_headers):
+    "The objects loaded in the session of the request are not expired by the lookup"
+    assert test_user.username == "tester"
+
+    assert client.get("/users/users/me/", headers=auth_headers).status_code == 200
+    assert USER_CACHE.stats()["misses"] == 1
+    assert not inspect(test_user).expired_attributes
+
+
+def test_deleting_a_user_invalidates_its_entry(client, db_session, test_user, auth_headers):
+    "A deleted user is no longer authenticated by its cached entry"
+    assert client.get("/users/users/me/", headers=auth_headers).status_code == 200
+    assert USER_CACHE.stats()["size"] == 1
+
+    user_crud.delete_user(db_session, user_id=test_user.id)
+
+    assert USER_CACHE.stats()["size"] == 0
+    assert client.get("/users/users/me/", headers=auth_headers).status_code == 401
+
+
+def test_entries_expire_and_least_recently_used_are_evicted():
+    "Entries expire after the TTL and the cache keeps at most max_size of them"
+    now = [0.0]
+    cache = UserCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    users = {
+        name: schemas.UserRead(id=counter, username=name, email=f"{name}@example.com")
+        for counter, name in enumerate(["alice", "bob", "carol"])
+    }
+    cache.put("alice", users["alice"])
+    cache.put("Bob", users["bob"])
+    assert cache.get("ALICE") == users["alice"]
+
+    cache.put("carol", users["carol"])
+    assert cache.get("bob") is None
+    assert cache.get("alice") == users["alice"]
+
+    now[0] = 10.0
+    assert cache.get("carol") is None
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 2}
@@ -255,10 +255,10 @@ export const fetchCapabilityAssessment = async (capabilityAssessmentId) => {
 };
 
 
-export const fetchHistoricalGraphData = async (capabilityAssessmentIds, startDate, endDate) => {
+export const fetchHistoricalGraphData = async (capabilityAssessmentIds, startDate, endDate, asOf = false) => {
   try {
     const response = await axios.post(
-      `${API_BASE_URL}/capability-assessments/historical-graph-data?start_date=${startDate}&end_date=${endDate}`,
+      `${API_BASE_URL}/capability-assessments/historical-graph-data?start_date=${startDate}&end_date=${endDate}&as_of=${asOf}`,
       capabilityAssessmentIds
     );
     return response.data;
@@ -0,0 +1,28 @@
+"""
+Configuration for the API load test of utils/api_load_test.py
+"""
+# pylint: disable=invalid-name
+import os
+from conf import base_url_conf
+
+api_base_url = base_url_conf.api_base_url
+
+# Credentials of the virtual users, a {n} in the username giving each its own account
+username = os.environ.get('load_test_username')
+password = os.environ.get('load_test_password')
+num_accounts = 1
+
+# ACC model whose matrix the virtual users load and rate
+acc_model_id = os.environ.get('load_test_acc_model_id')
+
+# Load shape
+num_users = 10
+ramp_up_seconds = 10
+think_time_seconds = (1, 3)
+iterations = 5
+duration_seconds = None
+timeout_seconds = 30
+
+# Ratings submitted per batch, picked from the rating options of the backend
+ratings_per_batch = 20
+rating_options = ["Stable", "Acceptable", "Low impact", "Critical Concern", "Not Applicable"]
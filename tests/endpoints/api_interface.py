@@ -2,8 +2,10 @@
 A composed Interface for all the Endpoint abstraction objects:
 * ACC Model API Endpoints
 The APIPlayer Object interacts only to the Interface to access the Endpoint
+The AsyncAPIPlayer Object interacts with the same endpoints through AsyncAPIInterface
 """
 
+from .async_base_api import AsyncBaseAPI
 from .create_acc_model_endpoints import AccAPIEndpoints
 from .user_api_endpoints import UserAPIEndpoints
 
@@ -13,3 +15,12 @@ class APIInterface(AccAPIEndpoints,UserAPIEndpoints):
     def __init__(self, url):
         "Initialize the Interface"
         self.base_url = url
+
+
+class AsyncAPIInterface(AsyncBaseAPI, AccAPIEndpoints):
+    "The ACC model endpoints sending their requests through httpx, to be awaited"
+
+    def __init__(self, url, timeout=30.0):
+        "Initialize the Interface"
+        super().__init__(timeout=timeout)
+        self.base_url = url
@@ -0,0 +1,77 @@
+"""
+AsyncAPIPlayer class does the following:
+a) plays the steps of a user journey through AsyncAPIInterface, one player per virtual user
+b) times every step into a LatencyHistogram shared by the players of a load test
+c) maintains the state of the virtual user: its bearer token and ACC model matrix
+"""
+
+import time
+from .api_interface import AsyncAPIInterface
+
+
+class AsyncAPIPlayer:
+    "The class that maintains the state of a virtual user"
+
+    def __init__(self, url, histogram, timeout=30.0):
+        "constructor"
+        self.api_obj = AsyncAPIInterface(url=url, timeout=timeout)
+        self.histogram = histogram
+        self.auth_details = None
+        self.assessment_ids = []
+
+
+    def set_header_details(self):
+        "make header details"
+        if self.auth_details:
+            return {'Authorization': self.auth_details}
+        return {'content-type': 'application/json'}
+
+
+    async def timed(self, step, request):
+        "Await the request of a step and record its latency and outcome"
+        started = time.perf_counter()
+        response = await request
+        success = response is not None and response.status_code < 400
+        self.histogram.record(step, time.perf_counter() - started, success=success)
+        return response if success else None
+
+
+    async def login(self, username, password):
+        "Logs in and keeps the bearer token, returning whether it succeeded"
+        response = await self.timed('login', self.api_obj.login(username, password))
+        if response is None:
+            return False
+        self.auth_details = f"Bearer {response.json()['access_token']}"
+        return True
+
+
+    async def load_matrix(self, acc_model_id):
+        "Loads the matrix of an ACC model with the ratings of the user and keeps its assessments"
+        response = await self.timed('load_matrix', self.api_obj.get_acc_model_matrix(
+            acc_model_id, headers=self.set_header_details(), include_ratings=True))
+        if response is None:
+            return []
+        self.assessment_ids = [
+            assessment['capability_assessment_id']
+            for assessment in response.json()['capability_assessments']
+        ]
+        return self.assessment_ids
+
+
+    async def submit_batch_ratings(self, ratings):
+        "Submits the ratings, a list of capability_assessment_id and rating dicts"
+        response = await self.timed('submit_batch_ratings', self.api_obj.submit_batch_ratings(
+            data={'ratings': ratings}, headers=self.set_header_details()))
+        return response
+
+
+    async def view_aggregates(self):
+        "Fetches the aggregated ratings of the assessments of the loaded matrix"
+        response = await self.timed('view_aggregates', self.api_obj.get_aggregates(
+            self.assessment_ids, headers=self.set_header_details()))
+        return response
+
+
+    async def close(self):
+        "Closes the connections of the virtual user"
+        await self.api_obj.close()
@@ -0,0 +1,56 @@
+"""
+A wrapper around httpx to make Restful API calls without blocking the event loop
+
+It offers the get, post, delete and put methods of BaseAPI as coroutines, so the
+endpoint classes written against BaseAPI can be reused as they are: their methods
+return the coroutine of the request, which the caller awaits.
+"""
+
+import httpx
+
+class AsyncBaseAPI:
+    "Main base class for httpx based scripts, each instance having its own connections"
+    base_url = None
+
+    def __init__(self, timeout=30.0, max_connections=10):
+        "Open a client with its own connection pool"
+        self.session_object = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections))
+
+    async def request(self, method, url, headers=None, **kwargs):
+        "Send a request, returning None when it could not be sent"
+        headers = headers if headers else {}
+        response = None
+        try:
+            response = await self.session_object.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as http_err:
+            print(f"{method} request failed: {http_err}")
+        except httpx.ConnectError:
+            print(f"\033[1;31mFailed to connect to {url}. Check if the API server is up.\033[1;m")
+        except httpx.HTTPError as err:
+            print(f"\033[1;31mAn error occurred: {err}\033[1;m")
+        return response
+
+    async def get(self, url, headers=None):
+        "Get request"
+        return await self.request("GET", url, headers=headers)
+
+    # pylint: disable=too-many-arguments
+    async def post(self, url, params=None, data=None, json=None, headers=None):
+        "Post request"
+        return await self.request("POST", url, headers=headers,
+                                  params=params, data=data, json=json)
+
+    async def delete(self, url, headers=None):
+        "Delete request"
+        return await self.request("DELETE", url, headers=headers)
+
+    async def put(self, url, json=None, headers=None):
+        "Put request"
+        return await self.request("PUT", url, headers=headers, json=json)
+
+    async def close(self):
+        "Close the connections of the client"
+        await self.session_object.aclose()
@@ -53,6 +53,35 @@ class AccAPIEndpoints(BaseAPI):
         return response
 
     
+    def login(self, username, password):
+        "Fetches an access token for the given credentials"
+        url = self.acc_url('/token')
+        response = self.post(url, data={'username': username, 'password': password})
+        return response
+
+
+    def get_acc_model_matrix(self, acc_model_id, headers, include_ratings=False):
+        "Fetches the components, capabilities, attributes and assessments of an ACC model"
+        url = self.acc_url(f'/acc-models/{acc_model_id}/matrix'
+                           f'?include_ratings={str(include_ratings).lower()}')
+        response = self.get(url, headers=headers)
+        return response
+
+
+    def submit_batch_ratings(self, data, headers):
+        "Adds or updates the ratings of several capability assessments"
+        url = self.acc_url('/capability-assessments/batch/')
+        response = self.post(url, json=data, headers=headers)
+        return response
+
+
+    def get_aggregates(self, assessment_ids, headers):
+        "Fetches the aggregated ratings of the given capability assessments"
+        url = self.acc_url('/capability-assessments/aggregates')
+        response = self.post(url, json=assessment_ids, headers=headers)
+        return response
+
+
     def delete_acc_model(self, acc_model_id, headers):
         "Deletes an ACC model"
         url = self.acc_url(f'/acc-models/{acc_model_id}')
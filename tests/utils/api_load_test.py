@@ -0,0 +1,136 @@
+"""
+Load tests the ACC model API by replaying the journey of a user with concurrent
+virtual users, each an AsyncAPIPlayer with its own connections:
+1. Log in
+2. Load the matrix of an ACC model with the ratings of the user
+3. Submit a batch of ratings for a random sample of its capability assessments
+4. View the aggregated ratings of the ACC model
+
+The virtual users start one after another over the ramp-up period, wait a random
+think time between the steps and repeat the journey for the given iterations or
+duration. The latency percentiles and histogram of every step are printed at the
+end, and the script exits with 1 when a request failed.
+
+From the tests folder, run the following command against a local or staging stack,
+e.g. with the users generated by backend/scripts/generate_data.py:
+python utils/api_load_test.py --url http://127.0.0.1:8000 --acc-model-id 1 \
+    --username "gen_20240101000000_{n}" --accounts 50 --password password \
+    --users 50 --ramp-up 30 --think-time 1 3 --iterations 10
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from conf import api_load_test_conf as conf                # pylint: disable=wrong-import-position
+from endpoints.async_api_player import AsyncAPIPlayer      # pylint: disable=wrong-import-position
+from utils.latency_histogram import LatencyHistogram       # pylint: disable=wrong-import-position
+
+
+async def think(rng, args):
+    "Wait a random think time"
+    await asyncio.sleep(rng.uniform(*args.think_time))
+
+
+async def run_journey(player, rng, username, args):
+    "Play the journey of a user once, stopping at the first failed step"
+    if not await player.login(username, args.password):
+        return
+    await think(rng, args)
+    assessment_ids = await player.load_matrix(args.acc_model_id)
+    if not assessment_ids:
+        return
+    await think(rng, args)
+    ratings = [
+        {'capability_assessment_id': assessment_id, 'rating': rng.choice(conf.rating_options)}
+        for assessment_id in rng.sample(assessment_ids,
+                                        min(args.ratings_per_batch, len(assessment_ids)))
+    ]
+    await player.submit_batch_ratings(ratings)
+    await think(rng, args)
+    await player.view_aggregates()
+
+
+async def run_virtual_user(index, args, histogram, deadline):
+    "Start a virtual user after its ramp-up delay and repeat the journey"
+    await asyncio.sleep(index * args.ramp_up / args.users)
+    rng = random.Random(args.seed + index)
+    username = args.username.format(n=index % args.accounts)
+    player = AsyncAPIPlayer(args.url, histogram, timeout=args.timeout)
+    try:
+        iteration = 0
+        while iteration < args.iterations and (deadline is None or time.monotonic() < deadline):
+            await run_journey(player, rng, username, args)
+            iteration += 1
+    finally:
+        await player.close()
+
+
+async def run_load_test(args):
+    "Run every virtual user and return the latency histogram of the steps"
+    histogram = LatencyHistogram()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    await asyncio.gather(*(run_virtual_user(index, args, histogram, deadline)
+                           for index in range(args.users)))
+    return histogram
+
+
+def parse_args():
+    "Parse the load shape, the target and the credentials"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--url", default=conf.api_base_url, help="Base URL of the API")
+    parser.add_argument("--acc-model-id", type=int, default=conf.acc_model_id,
+                        help="ACC model the virtual users rate")
+    parser.add_argument("--username", default=conf.username,
+                        help="Username of the virtual users, {n} being replaced by the account number")
+    parser.add_argument("--password", default=conf.password, help="Password of the virtual users")
+    parser.add_argument("--accounts", type=int, default=conf.num_accounts,
+                        help="Accounts the virtual users are spread over through {n}")
+    parser.add_argument("--users", type=int, default=conf.num_users,
+                        help="Number of concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=conf.ramp_up_seconds,
+                        help="Seconds over which the virtual users are started")
+    parser.add_argument("--think-time", type=float, nargs=2, metavar=("MIN", "MAX"),
+                        default=conf.think_time_seconds,
+                        help="Range of the seconds waited between the steps")
+    parser.add_argument("--iterations", type=int, default=conf.iterations,
+                        help="Journeys played by every virtual user")
+    parser.add_argument("--duration", type=float, default=conf.duration_seconds,
+                        help="Stop starting journeys after these seconds")
+    parser.add_argument("--ratings-per-batch", type=int, default=conf.ratings_per_batch,
+                        help="Ratings submitted in every batch")
+    parser.add_argument("--timeout", type=float, default=conf.timeout_seconds,
+                        help="Seconds after which a request fails")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random generators")
+    args = parser.parse_args()
+    if args.acc_model_id is None or not args.username or not args.password:
+        parser.error("--acc-model-id, --username and --password are required, or set "
+                     "load_test_acc_model_id, load_test_username and load_test_password")
+    if args.users < 1 or args.accounts < 1:
+        parser.error("--users and --accounts must be at least 1")
+    return args
+
+
+def main():
+    "Run the load test and print the results of every step"
+    args = parse_args()
+    print(f"Running {args.users} virtual users against {args.url}")
+    started = time.perf_counter()
+    histogram = asyncio.run(run_load_test(args))
+    elapsed = time.perf_counter() - started
+    if not histogram.latencies:
+        print("No request was sent")
+        return 1
+    requests = sum(len(latencies) for latencies in histogram.latencies.values())
+    errors = sum(histogram.errors.values())
+    print(f"\nSent {requests} requests in {elapsed:.1f}s ({requests / elapsed:.1f} req/s), "
+          f"{errors} failed\n")
+    print(histogram.report())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Collects the latencies of named steps and summarizes them as percentiles and
+bucketed histograms, for the load tests of utils/api_load_test.py
+"""
+
+import math
+
+DEFAULT_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    "Latencies and errors of every step, in the order the steps were first seen"
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        "constructor"
+        self.buckets_ms = tuple(buckets_ms)
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, step, seconds, success=True):
+        "Record a request of a step, taking seconds to complete"
+        self.latencies.setdefault(step, []).append(seconds * 1000)
+        self.errors.setdefault(step, 0)
+        if not success:
+            self.errors[step] += 1
+
+    @staticmethod
+    def percentile(sorted_values, quantile):
+        "Return the nearest rank value at the given quantile of sorted values"
+        rank = max(1, math.ceil(len(sorted_values) * quantile))
+        return sorted_values[rank - 1]
+
+    def summary(self, step):
+        "Return the request count, errors and latency percentiles of a step in ms"
+        values = sorted(self.latencies[step])
+        return {
+            'requests': len(values),
+            'errors': self.errors[step],
+            'p50_ms': round(self.percentile(values, 0.5), 1),
+            'p95_ms': round(self.percentile(values, 0.95), 1),
+            'p99_ms': round(self.percentile(values, 0.99), 1),
+            'max_ms': round(values[-1], 1),
+        }
+
+    def bucket_counts(self, step):
+        "Return the label and count of every bucket of a step, the last one unbounded"
+        counts = [0] * (len(self.buckets_ms) + 1)
+        for value in self.latencies[step]:
+            index = next((index for index, bound in enumerate(self.buckets_ms)
+                          if value <= bound), len(self.buckets_ms))
+            counts[index] += 1
+        labels = [f"<= {bound} ms" for bound in self.buckets_ms]
+        labels.append(f"> {self.buckets_ms[-1]} ms")
+        return list(zip(labels, counts))
+
+    def report(self, bar_width=40):
+        "Return the summary table and the histogram of every step as text"
+        lines = [f"{'step':<24}{'requests':>9}{'errors':>8}{'p50 ms':>9}"
+                 f"{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for step in self.latencies:
+            result = self.summary(step)
+            lines.append(f"{step:<24}{result['requests']:>9}{result['errors']:>8}"
+                         f"{result['p50_ms']:>9}{result['p95_ms']:>9}"
+                         f"{result['p99_ms']:>9}{result['max_ms']:>9}")
+        for step in self.latencies:
+            lines.append(f"\n{step} latency histogram:")
+            bucket_counts = self.bucket_counts(step)
+            highest = max(count for _, count in bucket_counts)
+            for label, count in bucket_counts:
+                bar = '#' * math.ceil(count * bar_width / highest) if count else ''
+                lines.append(f"  {label:>12} {count:>7} {bar}")
+        return "\n".join(lines)